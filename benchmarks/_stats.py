@@ -0,0 +1,130 @@
+"""ベンチマーク共通の統計・プロセス計測ユーティリティ"""
+
+from __future__ import annotations
+
+import gc
+import math
+import os
+import statistics
+import sys
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """線形補間によるパーセンタイル（qは0〜100）"""
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    """サンプルの要約統計（件数・平均・標準偏差・最小・最大・p50/p95/p99）"""
+    if not samples:
+        return {"n": 0}
+    return {
+        "n": len(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+# プロセス計測（Linuxの/procを使用。それ以外ではNone）
+
+_PROC = Path("/proc")
+
+
+def _ppid(pid: int) -> int | None:
+    try:
+        stat = (_PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # 2番目のフィールド（comm）は括弧内に空白を含みうる
+    return int(stat.rsplit(")", 1)[1].split()[1])
+
+
+def descendant_pids(pid: int | None = None) -> list[int] | None:
+    """子孫プロセスのPID一覧（/procがない環境ではNone）"""
+    if not _PROC.is_dir():
+        return None
+    root = os.getpid() if pid is None else pid
+    children: dict[int, list[int]] = {}
+    for entry in _PROC.iterdir():
+        if entry.name.isdigit():
+            parent = _ppid(int(entry.name))
+            if parent is not None:
+                children.setdefault(parent, []).append(int(entry.name))
+    result: list[int] = []
+    stack = [root]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def rss_bytes(pid: int | None = None) -> int | None:
+    """プロセスの現在のRSS（バイト）"""
+    status = _PROC / str(os.getpid() if pid is None else pid) / "status"
+    try:
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None and sys.platform != "win32":
+        import resource
+
+        # /procがない環境では最大RSSで代用（macOSはバイト、Linuxはキロバイト）
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    return None
+
+
+def measure_memory(fn: Callable[[], Any]) -> dict[str, Any]:
+    """関数実行時のメモリ使用量を測定する
+
+    tracemallocでPythonヒープのピーク（実行中の最大割り当て）と保持量（戻り値を
+    保持したままの増分）を測定し、別パスでRSSの増分を測定します。
+    tracemalloc自体のオーバーヘッドを含めないよう、RSSはトレースなしで測定します。
+
+    Returns:
+        peak_bytes, retained_bytes, rss_delta_bytes（/procがない環境ではNone）
+    """
+    gc.collect()
+    rss_before = rss_bytes()
+    kept = fn()
+    gc.collect()
+    rss_after = rss_bytes()
+    del kept
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        kept = fn()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        del kept
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak - baseline,
+        "retained_bytes": current - baseline,
+        "rss_delta_bytes": rss_after - rss_before
+        if rss_before is not None and rss_after is not None
+        else None,
+    }
@@ -4,15 +4,35 @@
 
 実行方法:
     uv run python benchmarks/benchmark_custom_tools.py
+
+    # 実際のCLIの代わりに偽のCLIを使用（ネットワーク・ログイン不要）
+    uv run python benchmarks/benchmark_custom_tools.py --fake-cli
 """
 
+import argparse
 import asyncio
-import sys
+import tempfile
 import time
+from pathlib import Path
 from typing import Any
 
+from _stats import measure_memory
+from benchmark_memory import model_construction
+from results import metric, result, write_results
 from pydantic_ai import Agent
 from pydantic_claude_cli import ClaudeCodeCLIModel
+from pydantic_claude_cli.fake_cli import write_launcher
+
+# 偽のCLIの応答スクリプト（addツールを1回呼び出す）
+FAKE_CLI_SCRIPT: dict[str, Any] = {
+    "latency": {"distribution": "lognormal", "mean": 0.05, "sigma": 0.3},
+    "responses": [
+        {
+            "tool_calls": [{"name": "add", "arguments": {"x": 5, "y": 3}}],
+            "text": "The answer is {results}",
+        }
+    ],
+}
 
 
 def benchmark_tool_extraction() -> dict[str, Any]:
@@ -74,6 +94,7 @@ def benchmark_tool_extraction() -> dict[str, Any]:
         "avg_ms": avg_time * 1000,
         "min_ms": min_time * 1000,
         "max_ms": max_time * 1000,
+        "samples_seconds": timings,
         "success": len([r for r in results if r is not None]) == 5,
     }
 
@@ -119,44 +140,34 @@ def benchmark_mcp_server_creation() -> dict[str, Any]:
         "avg_ms": avg_time * 1000,
         "min_ms": min_time * 1000,
         "max_ms": max_time * 1000,
+        "samples_seconds": timings,
         "success": server["type"] == "sdk",
     }
 
 
 def benchmark_memory_usage() -> dict[str, Any]:
-    """メモリ使用量を測定"""
-    model = ClaudeCodeCLIModel("claude-haiku-4-5")
-    agent = Agent(model)
-    model.set_agent_toolsets(agent._function_toolset)
+    """メモリ使用量を測定（モデル + エージェント作成、tracemalloc/RSS）
 
-    # 3個のツールを定義
-    @agent.tool_plain
-    def mem_tool_1(x: int) -> int:
-        return x + 1
-
-    @agent.tool_plain
-    def mem_tool_2(x: int) -> int:
-        return x + 2
-
-    @agent.tool_plain
-    def mem_tool_3(x: int) -> int:
-        return x + 3
-
-    model_size = sys.getsizeof(model)
-    agent_size = sys.getsizeof(agent)
+    詳細なシナリオは benchmarks/benchmark_memory.py を参照。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = measure_memory(model_construction(write_launcher(Path(tmp) / "claude")))
 
     return {
         "test": "memory_usage",
-        "model_size_bytes": model_size,
-        "agent_size_bytes": agent_size,
-        "model_size_mb": model_size / (1024 * 1024),
-        "agent_size_mb": agent_size / (1024 * 1024),
+        **stats,
+        "peak_mb": stats["peak_bytes"] / (1024 * 1024),
+        "retained_mb": stats["retained_bytes"] / (1024 * 1024),
     }
 
 
-async def benchmark_end_to_end() -> dict[str, Any]:
-    """E2Eパフォーマンスを測定"""
-    model = ClaudeCodeCLIModel("claude-haiku-4-5")
+async def benchmark_end_to_end(cli_path: str | Path | None = None) -> dict[str, Any]:
+    """E2Eパフォーマンスを測定
+
+    Args:
+        cli_path: 使用するCLI（偽のCLIを含む）。Noneの場合は実際のCLIを検索する
+    """
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", cli_path=cli_path)
     agent = Agent(model)
     model.set_agent_toolsets(agent._function_toolset)
 
@@ -176,8 +187,13 @@ async def benchmark_end_to_end() -> dict[str, Any]:
     }
 
 
-def main() -> None:
-    """ベンチマークを実行"""
+def main(fake_cli: bool = False, json_path: str | None = None) -> None:
+    """ベンチマークを実行
+
+    Args:
+        fake_cli: Trueの場合、E2Eで偽のCLIを使用する
+        json_path: 指定した場合、結果をJSONファイルに保存する
+    """
     print("=" * 70)
     print("pydantic-claude-cli パフォーマンスベンチマーク")
     print("=" * 70)
@@ -202,20 +218,25 @@ def main() -> None:
     print()
 
     # メモリ使用量
-    print("【3】メモリ使用量")
+    print("【3】メモリ使用量（モデル + エージェント作成）")
     result3 = benchmark_memory_usage()
+    print(f"  ピーク: {result3['peak_bytes']:,} bytes ({result3['peak_mb']:.3f} MB)")
     print(
-        f"  Model: {result3['model_size_bytes']:,} bytes ({result3['model_size_mb']:.3f} MB)"
-    )
-    print(
-        f"  Agent: {result3['agent_size_bytes']:,} bytes ({result3['agent_size_mb']:.3f} MB)"
+        f"  保持:   {result3['retained_bytes']:,} bytes ({result3['retained_mb']:.3f} MB)"
     )
     print()
 
     # E2E
-    print("【4】E2Eパフォーマンス（カスタムツール使用）")
+    print(
+        "【4】E2Eパフォーマンス（カスタムツール使用"
+        + ("、偽のCLI）" if fake_cli else "）")
+    )
     print("  実行中...")
-    result4 = asyncio.run(benchmark_end_to_end())
+    with tempfile.TemporaryDirectory() as tmp:
+        cli_path = (
+            write_launcher(Path(tmp) / "claude", FAKE_CLI_SCRIPT) if fake_cli else None
+        )
+        result4 = asyncio.run(benchmark_end_to_end(cli_path))
     print(f"  実行時間: {result4['elapsed_seconds']:.2f}秒")
     print(f"  成功: {result4['success']}")
     print()
@@ -228,7 +249,7 @@ def main() -> None:
     print(f"ツール抽出:        {result1['avg_ms']:.3f}ms（5ツール）")
     print(f"MCPサーバー作成:   {result2['avg_ms']:.3f}ms（5ツール）")
     print(
-        f"メモリ使用量:      Model {result3['model_size_mb']:.3f}MB, Agent {result3['agent_size_mb']:.3f}MB"
+        f"メモリ使用量:      ピーク {result3['peak_mb']:.3f}MB, 保持 {result3['retained_mb']:.3f}MB"
     )
     print(f"E2E実行時間:       {result4['elapsed_seconds']:.2f}秒")
     print()
@@ -236,10 +257,50 @@ def main() -> None:
     print("✅ ベンチマーク完了")
     print("=" * 70)
 
+    if json_path:
+        path = write_results(
+            json_path,
+            [
+                result(
+                    "tool_extraction",
+                    {"time": metric(unit="s", samples=result1["samples_seconds"])},
+                    num_tools=result1["num_tools"],
+                ),
+                result(
+                    "mcp_server_creation",
+                    {"time": metric(unit="s", samples=result2["samples_seconds"])},
+                    num_tools=result2["num_tools"],
+                ),
+                result(
+                    "model_construction_memory",
+                    {
+                        "peak": metric(unit="bytes", value=result3["peak_bytes"]),
+                        "retained": metric(
+                            unit="bytes", value=result3["retained_bytes"]
+                        ),
+                    },
+                ),
+                result(
+                    "end_to_end_with_tool",
+                    {"time": metric(unit="s", value=result4["elapsed_seconds"])},
+                    fake_cli=fake_cli,
+                ),
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
 
 if __name__ == "__main__":
     try:
-        main()
+        parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+        parser.add_argument(
+            "--fake-cli",
+            action="store_true",
+            help="E2Eで実際のCLIの代わりに偽のCLIを使用する",
+        )
+        parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+        args = parser.parse_args()
+        main(fake_cli=args.fake_cli, json_path=args.json)
     except KeyboardInterrupt:
         print("\n\n中断されました")
     except Exception as e:
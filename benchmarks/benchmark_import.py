@@ -0,0 +1,193 @@
+"""インポート時間のベンチマーク
+
+新しいPythonプロセスで`-X importtime`を使ってインポート時間を測定し、予算（`--budget-ms`）を
+超えた場合は終了コード1を返します。CIでパッケージのインポートが重くなる変更を検出するために
+使用します。
+
+シナリオ:
+    - package: `import pydantic_claude_cli`（重い依存は遅延インポート）
+    - builtin_tools: `from pydantic_claude_cli import BuiltinTools`
+    - model: `from pydantic_claude_cli import ClaudeCodeCLIModel`（SDK・pydantic-aiを含む）
+
+予算の判定はpackageとbuiltin_toolsのシナリオに対して行います。
+
+実行方法:
+    uv run python benchmarks/benchmark_import.py [--repeats 10] [--budget-ms 50] [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from typing import Any
+
+from _stats import summarize
+from results import metric, result, write_results
+
+SCENARIOS: dict[str, str] = {
+    "package": "import pydantic_claude_cli",
+    "builtin_tools": "from pydantic_claude_cli import BuiltinTools",
+    "model": "from pydantic_claude_cli import ClaudeCodeCLIModel",
+}
+
+# 予算の対象となるシナリオ
+BUDGETED = ("package", "builtin_tools")
+
+# 読み込まれてはならない重い依存（packageシナリオ）
+HEAVY_MODULES = ("claude_code_sdk", "mcp", "pydantic_ai")
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str, int]]:
+    """`-X importtime`の出力を(深さ, モジュール名, 累積μs)のリストに変換"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        name = name[1:].rstrip()
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((depth, name.strip(), int(cumulative_us)))
+    return entries
+
+
+def breakdown(entries: list[tuple[int, str, int]]) -> list[tuple[str, int]]:
+    """インタープリタ起動後にインポートされたモジュールの内訳（モジュール名, 累積μs）
+
+    パッケージ自身の行はその直接の子に展開します。`-X importtime`は子が親より先に
+    出力されるため、パッケージの行から遡って子を集めます。
+    """
+    start = max(
+        (
+            i + 1
+            for i, (depth, name, _) in enumerate(entries)
+            if (depth, name) == (0, "site")
+        ),
+        default=0,
+    )
+    result: list[tuple[str, int]] = []
+    for i in range(start, len(entries)):
+        depth, name, cumulative = entries[i]
+        if depth != 0:
+            continue
+        if name.partition(".")[0] != "pydantic_claude_cli":
+            result.append((name, cumulative))
+            continue
+        for child_depth, child, child_cumulative in reversed(entries[:i]):
+            if child_depth == 0:
+                break
+            if child_depth == 1:
+                result.append((child, child_cumulative))
+    return result
+
+
+def measure(statement: str) -> dict[str, Any]:
+    """新しいプロセスで1回インポートし、所要時間と内訳を返す
+
+    インタープリタの起動時間（siteなど）を除くため、所要時間はプロセス内で計測します。
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, _, loaded = proc.stdout.strip().partition(" ")
+    return {
+        "seconds": float(elapsed),
+        "children": breakdown(parse_importtime(proc.stderr)),
+        "heavy_loaded": loaded.split(",") if loaded else [],
+    }
+
+
+def run_scenario(statement: str, repeats: int) -> dict[str, Any]:
+    """シナリオを繰り返し測定"""
+    runs = [measure(statement) for _ in range(repeats)]
+    samples = [r["seconds"] for r in runs]
+    # 最も中央値に近い回の内訳を表示用に使う
+    median = summarize(samples)["p50"]
+    representative = min(runs, key=lambda r: abs(r["seconds"] - median))
+    return {
+        "samples": samples,
+        "stats": summarize(samples),
+        "top": sorted(representative["children"], key=lambda c: -c[1])[:8],
+        "heavy_loaded": representative["heavy_loaded"],
+    }
+
+
+def main() -> int:
+    """ベンチマークを実行し、終了コードを返す"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms", type=float, default=50.0, help="インポート時間の予算（中央値）"
+    )
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("pydantic-claude-cli インポート時間ベンチマーク")
+    print("=" * 70)
+    print()
+
+    results: dict[str, dict[str, Any]] = {}
+    failures: list[str] = []
+    for name, statement in SCENARIOS.items():
+        r = results[name] = run_scenario(statement, args.repeats)
+        stats = r["stats"]
+        print(f"【{name}】{statement}")
+        print(
+            f"  中央値 {stats['p50'] * 1000:.1f}ms / p95 {stats['p95'] * 1000:.1f}ms"
+            f"（{stats['n']}回）"
+        )
+        print("  累積時間の大きいモジュール:")
+        for module, cumulative in r["top"]:
+            print(f"    {cumulative / 1000:9.1f}ms  {module}")
+        if name in BUDGETED:
+            if stats["p50"] * 1000 > args.budget_ms:
+                failures.append(
+                    f"{name}: {stats['p50'] * 1000:.1f}ms > 予算 {args.budget_ms}ms"
+                )
+            if r["heavy_loaded"]:
+                failures.append(
+                    f"{name}: 重い依存が読み込まれています: {', '.join(r['heavy_loaded'])}"
+                )
+        print()
+
+    if failures:
+        print("❌ 予算を超過しました:")
+        for f in failures:
+            print(f"  - {f}")
+    else:
+        print(f"✅ 予算内です（{args.budget_ms}ms）")
+
+    if args.json:
+        path = write_results(
+            args.json,
+            [
+                result(
+                    f"import_{name}",
+                    {"time": metric(unit="s", samples=r["samples"])},
+                )
+                for name, r in results.items()
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n中断されました")
+        sys.exit(1)
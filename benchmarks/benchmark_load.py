@@ -0,0 +1,268 @@
+"""並行負荷のベンチマーク（ロードジェネレーター）
+
+偽のCLI（pydantic_claude_cli.fake_cli）に対して`agent.run`を並行に実行し、
+スループット、レイテンシのパーセンタイル、CLIプロセス数、RSSの推移を測定します。
+プーリングや同時実行制限などの戦略を定量的に比較するために使用します。
+
+- closed loop: `--concurrency`個のワーカーが、それぞれ前のリクエストの完了後に次を送る
+- open loop: `--rate`（件/秒）のポアソン到着でリクエストを送る。レイテンシは予定到着時刻から
+  計測するため、待ち行列の遅延も含まれる（coordinated omissionを避ける）
+
+実行方法:
+    uv run python benchmarks/benchmark_load.py --mode closed --concurrency 8 --requests 200 \
+        --json load.json
+    uv run python benchmarks/benchmark_load.py --mode open --rate 20 --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from _stats import descendant_pids, rss_bytes, summarize
+from results import metric, result, write_results
+from pydantic_ai import Agent
+from pydantic_claude_cli import ClaudeCodeCLIModel
+from pydantic_claude_cli.fake_cli import write_launcher
+
+
+def build_agent(cli_path: Path) -> Agent:
+    """カスタムツールを1つ持つエージェントを作成"""
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", cli_path=cli_path)
+    agent = Agent(model)
+    model.set_agent_toolsets(agent._function_toolset)
+
+    @agent.tool_plain
+    def add(x: int, y: int) -> int:
+        return x + y
+
+    return agent
+
+
+def fake_cli_script(latency: float, tool_calls: int) -> dict[str, Any]:
+    """偽のCLIの応答スクリプト"""
+    return {
+        "latency": {"distribution": "lognormal", "mean": latency, "sigma": 0.3}
+        if latency > 0
+        else None,
+        "responses": [
+            {
+                "tool_calls": [
+                    {"name": "add", "arguments": {"x": 1, "y": 2}, "repeat": tool_calls}
+                ]
+                if tool_calls
+                else [],
+                "text": "done {results}",
+            }
+        ],
+    }
+
+
+class ResourceSampler:
+    """一定間隔でRSSとプロセス数を記録する"""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples: list[dict[str, Any]] = []
+        self._start = time.perf_counter()
+
+    def sample(self) -> None:
+        children = descendant_pids()
+        child_rss = [rss_bytes(pid) for pid in children or []]
+        self.samples.append(
+            {
+                "t": time.perf_counter() - self._start,
+                "processes": len(children) if children is not None else None,
+                "rss_self": rss_bytes(),
+                "rss_children": sum(r for r in child_rss if r is not None),
+            }
+        )
+
+    async def run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+
+async def run_load(
+    agent: Agent,
+    *,
+    mode: str,
+    requests: int,
+    concurrency: int,
+    rate: float,
+    sample_interval: float,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """負荷を生成して結果を集計"""
+    latencies: list[float] = []
+    errors: list[str] = []
+
+    async def one(scheduled: float) -> None:
+        try:
+            await agent.run("add 1 and 2")
+            latencies.append(time.perf_counter() - scheduled)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    sampler = ResourceSampler(sample_interval)
+    sampler_task = asyncio.create_task(sampler.run())
+    start = time.perf_counter()
+
+    if mode == "closed":
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for _ in remaining:
+                await one(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    else:
+        rng = random.Random(seed)
+        tasks = []
+        scheduled = start
+        for _ in range(requests):
+            scheduled += rng.expovariate(rate)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(scheduled)))
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - start
+    sampler_task.cancel()
+    sampler.sample()
+
+    processes = [s["processes"] for s in sampler.samples if s["processes"] is not None]
+    return {
+        "test": f"load_{mode}",
+        "mode": mode,
+        "requests": requests,
+        "concurrency": concurrency if mode == "closed" else None,
+        "rate": rate if mode == "open" else None,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "errors": len(errors),
+        "error_examples": errors[:3],
+        "latency_seconds": summarize(latencies),
+        "latency_samples": latencies,
+        "peak_processes": max(processes) if processes else None,
+        "peak_rss_self": max((s["rss_self"] or 0) for s in sampler.samples),
+        "peak_rss_children": max(s["rss_children"] for s in sampler.samples),
+        "timeline": sampler.samples,
+    }
+
+
+def print_result(result: dict[str, Any]) -> None:
+    """結果を表示"""
+    mb = 1024 * 1024
+    lat = result["latency_seconds"]
+    print(f"モード:            {result['mode']}")
+    print(f"リクエスト数:      {result['requests']}（エラー {result['errors']}）")
+    print(f"経過時間:          {result['elapsed_seconds']:.2f}秒")
+    print(f"スループット:      {result['throughput_rps']:.2f} req/s")
+    if lat["n"]:
+        print(
+            f"レイテンシ:        p50 {lat['p50'] * 1000:.1f}ms / "
+            f"p95 {lat['p95'] * 1000:.1f}ms / p99 {lat['p99'] * 1000:.1f}ms"
+        )
+    print(f"最大プロセス数:    {result['peak_processes']}")
+    print(
+        f"最大RSS:           本体 {result['peak_rss_self'] / mb:.1f}MB / "
+        f"子プロセス合計 {result['peak_rss_children'] / mb:.1f}MB"
+    )
+    for example in result["error_examples"]:
+        print(f"  エラー例: {example}")
+    print()
+    print("  時刻(s)  プロセス  RSS本体(MB)  RSS子(MB)")
+    timeline = result["timeline"]
+    step = max(1, len(timeline) // 20)
+    for s in timeline[::step]:
+        print(
+            f"  {s['t']:7.2f}  {s['processes'] if s['processes'] is not None else '-':>8}"
+            f"  {(s['rss_self'] or 0) / mb:11.1f}  {s['rss_children'] / mb:9.1f}"
+        )
+
+
+def main() -> None:
+    """ベンチマークを実行"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="closed loopのワーカー数"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="open loopの到着率（件/秒）"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="偽のCLIの応答遅延の中央値（秒）"
+    )
+    parser.add_argument(
+        "--tool-calls", type=int, default=1, help="1リクエストあたりのツール呼び出し数"
+    )
+    parser.add_argument("--sample-interval", type=float, default=0.25)
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("pydantic-claude-cli 並行負荷ベンチマーク（偽のCLI）")
+    print("=" * 70)
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cli_path = write_launcher(
+            Path(tmp) / "claude", fake_cli_script(args.latency, args.tool_calls)
+        )
+        load = asyncio.run(
+            run_load(
+                build_agent(cli_path),
+                mode=args.mode,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                sample_interval=args.sample_interval,
+            )
+        )
+    print_result(load)
+
+    if args.json:
+        path = write_results(
+            args.json,
+            [
+                result(
+                    load["test"],
+                    {
+                        "latency": metric(unit="s", samples=load["latency_samples"]),
+                        "throughput": metric(
+                            unit="req/s",
+                            value=load["throughput_rps"],
+                            direction="higher",
+                        ),
+                        "peak_rss_children": metric(
+                            unit="bytes", value=load["peak_rss_children"]
+                        ),
+                    },
+                    requests=args.requests,
+                    concurrency=load["concurrency"],
+                    rate=load["rate"],
+                    latency=args.latency,
+                    tool_calls=args.tool_calls,
+                ),
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n中断されました")
+        sys.exit(1)
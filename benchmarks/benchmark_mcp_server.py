@@ -0,0 +1,164 @@
+"""MCPサーバーのtools/list・tools/callのベンチマーク
+
+`create_mcp_from_tools()`で作成したSDK MCPサーバーのリクエストハンドラーを直接呼び出し、
+CLIから届く`tools/list`と`tools/call`の処理時間（サーバー側のみ、トランスポートを除く）を
+測定します。
+
+実行方法:
+    uv run python benchmarks/benchmark_mcp_server.py [--tools 500] [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from _stats import summarize
+from mcp import types
+from pydantic_ai.tools import ToolDefinition
+from pydantic_claude_cli.tool_converter import create_mcp_from_tools
+from results import metric, result, write_results
+
+
+def tool_schema(i: int) -> dict[str, Any]:
+    """pydantic-aiが生成するような、enum・ネスト・デフォルト値を含むスキーマ"""
+    return {
+        "$defs": {
+            "Filter": {
+                "properties": {
+                    "field": {"type": "string"},
+                    "value": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+                },
+                "required": ["field"],
+                "type": "object",
+            }
+        },
+        "additionalProperties": False,
+        "properties": {
+            "query": {"type": "string", "description": f"Query for tool {i}"},
+            "mode": {"enum": ["fast", "exact"], "type": "string"},
+            "limit": {"default": 10, "type": "integer"},
+            "filters": {"items": {"$ref": "#/$defs/Filter"}, "type": "array"},
+        },
+        "required": ["query", "mode"],
+        "type": "object",
+    }
+
+
+def build_server(num_tools: int) -> Any:
+    """num_tools個のツールを持つMCPサーバー"""
+
+    def search(
+        query: str, mode: str, limit: int = 10, filters: list[Any] | None = None
+    ) -> str:
+        return f"{query}:{mode}:{limit}"
+
+    tools = [
+        (
+            ToolDefinition(
+                name=f"tool_{i}",
+                description=f"Tool {i}",
+                parameters_json_schema=tool_schema(i),
+            ),
+            search,
+        )
+        for i in range(num_tools)
+    ]
+    return create_mcp_from_tools(tools)["instance"]
+
+
+async def time_async(
+    fn: Callable[[], Awaitable[Any]], repeats: int, warmup: int = 3
+) -> list[float]:
+    """非同期関数の実行時間を測定"""
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(num_tools: int, repeats: int, seed: int = 0) -> dict[str, list[float]]:
+    """サーバー作成・tools/list・tools/callを測定"""
+    start = time.perf_counter()
+    server = build_server(num_tools)
+    creation = time.perf_counter() - start
+
+    list_handler = server.request_handlers[types.ListToolsRequest]
+    call_handler = server.request_handlers[types.CallToolRequest]
+    list_request = types.ListToolsRequest(method="tools/list")
+    rng = random.Random(seed)
+
+    async def call() -> None:
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name=f"tool_{rng.randrange(num_tools)}",
+                arguments={
+                    "query": "q",
+                    "mode": "fast",
+                    "filters": [{"field": "a", "value": None}],
+                },
+            ),
+        )
+        response = await call_handler(request)
+        assert not response.root.isError, response.root.content
+
+    return {
+        "create_server": [creation],
+        "tools_list": await time_async(lambda: list_handler(list_request), repeats),
+        "tools_call": await time_async(call, repeats),
+    }
+
+
+def main() -> None:
+    """ベンチマークを実行"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tools", type=int, default=500, help="ツール数")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"pydantic-claude-cli MCPサーバーベンチマーク（ツール{args.tools}個）")
+    print("=" * 70)
+    print()
+
+    samples = asyncio.run(run(args.tools, args.repeats))
+    print(f"  {'処理':<16}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for name, values in samples.items():
+        stats = summarize(values)
+        print(
+            f"  {name:<16}{stats['p50'] * 1000:>10.3f}"
+            f"{stats['p95'] * 1000:>10.3f}{stats['p99'] * 1000:>10.3f}"
+        )
+
+    if args.json:
+        path = write_results(
+            args.json,
+            [
+                result(
+                    f"mcp_server_{name}",
+                    {"time": metric(unit="s", samples=values)},
+                    num_tools=args.tools,
+                )
+                for name, values in samples.items()
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n中断されました")
+        sys.exit(1)
@@ -0,0 +1,196 @@
+"""メモリ使用量のベンチマーク
+
+tracemalloc（Pythonヒープのピーク・保持量）とRSSの増分で、主要な処理のメモリ使用量を測定します。
+
+シナリオ:
+    - model_construction: ClaudeCodeCLIModel + Agentの作成（ツール3個）
+    - mcp_server_creation: SDK MCPサーバーの作成（ツール50個）
+    - history_conversion_{10,100,1000}: 会話履歴のプロンプト変換
+    - deps_round_trip: 依存性のシリアライズ/デシリアライズ（要素1000個のPydanticモデル）
+
+実行方法:
+    uv run python benchmarks/benchmark_memory.py [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from _stats import measure_memory
+from results import metric, result, write_results
+from pydantic import BaseModel
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.tools import ToolDefinition
+from pydantic_claude_cli import ClaudeCodeCLIModel
+from pydantic_claude_cli.deps_support import deserialize_deps, serialize_deps
+from pydantic_claude_cli.fake_cli import write_launcher
+from pydantic_claude_cli.message_converter import convert_to_claude_prompt
+from pydantic_claude_cli.tool_converter import create_mcp_from_tools
+
+HISTORY_TURNS = (10, 100, 1000)
+
+
+class _Item(BaseModel):
+    id: int
+    name: str
+    tags: list[str]
+
+
+class _Deps(BaseModel):
+    api_key: str
+    items: list[_Item]
+
+
+def model_construction(cli_path: Path) -> Callable[[], Any]:
+    """モデルとエージェントの作成"""
+
+    def run() -> Any:
+        model = ClaudeCodeCLIModel("claude-haiku-4-5", cli_path=cli_path)
+        agent = Agent(model)
+        model.set_agent_toolsets(agent._function_toolset)
+
+        @agent.tool_plain
+        def mem_tool_1(x: int) -> int:
+            return x + 1
+
+        @agent.tool_plain
+        def mem_tool_2(x: int) -> int:
+            return x + 2
+
+        @agent.tool_plain
+        def mem_tool_3(x: int) -> int:
+            return x + 3
+
+        return agent
+
+    return run
+
+
+def mcp_server_creation(num_tools: int = 50) -> Callable[[], Any]:
+    """SDK MCPサーバーの作成"""
+    tools_with_funcs = []
+    for i in range(num_tools):
+
+        def func(x: int, _i: int = i) -> int:
+            return x + _i
+
+        tools_with_funcs.append(
+            (
+                ToolDefinition(
+                    name=f"mcp_tool_{i}",
+                    description=f"Tool {i}",
+                    parameters_json_schema={
+                        "type": "object",
+                        "properties": {"x": {"type": "integer"}},
+                    },
+                ),
+                func,
+            )
+        )
+    return lambda: create_mcp_from_tools(tools_with_funcs)
+
+
+def history(turns: int) -> list[ModelRequest | ModelResponse]:
+    """指定ターン数の会話履歴"""
+    messages: list[ModelRequest | ModelResponse] = []
+    for i in range(turns):
+        messages.append(
+            ModelRequest(parts=[UserPromptPart(content=f"Question {i}: " + "x" * 200)])
+        )
+        messages.append(
+            ModelResponse(parts=[TextPart(content=f"Answer {i}: " + "y" * 400)])
+        )
+    return messages
+
+
+def history_conversion(turns: int) -> Callable[[], Any]:
+    """会話履歴のプロンプト変換"""
+    messages = history(turns)
+    return lambda: convert_to_claude_prompt(messages)
+
+
+def deps_round_trip(num_items: int = 1000) -> Callable[[], Any]:
+    """依存性のシリアライズ/デシリアライズ"""
+    deps = _Deps(
+        api_key="secret",
+        items=[
+            _Item(id=i, name=f"item-{i}", tags=["a", "b", "c"])
+            for i in range(num_items)
+        ],
+    )
+    return lambda: deserialize_deps(serialize_deps(deps), _Deps)
+
+
+def run_scenarios(cli_path: Path) -> list[dict[str, Any]]:
+    """全シナリオを測定"""
+    scenarios: list[tuple[str, Callable[[], Any]]] = [
+        ("model_construction", model_construction(cli_path)),
+        ("mcp_server_creation", mcp_server_creation()),
+        *(
+            (f"history_conversion_{turns}", history_conversion(turns))
+            for turns in HISTORY_TURNS
+        ),
+        ("deps_round_trip", deps_round_trip()),
+    ]
+    return [{"test": name, **measure_memory(fn)} for name, fn in scenarios]
+
+
+def print_results(results: list[dict[str, Any]]) -> None:
+    """結果を表形式で表示"""
+    kb = 1024
+    print(f"  {'シナリオ':<28}{'ピーク(KB)':>12}{'保持(KB)':>12}{'RSS増分(KB)':>14}")
+    for r in results:
+        rss = r["rss_delta_bytes"]
+        print(
+            f"  {r['test']:<30}{r['peak_bytes'] / kb:>12.1f}"
+            f"{r['retained_bytes'] / kb:>12.1f}"
+            f"{(f'{rss / kb:.1f}' if rss is not None else '-'):>14}"
+        )
+
+
+def main() -> None:
+    """ベンチマークを実行"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("pydantic-claude-cli メモリベンチマーク")
+    print("=" * 70)
+    print()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_scenarios(write_launcher(Path(tmp) / "claude"))
+    print_results(results)
+    print()
+    print("ピーク: 実行中のPythonヒープ最大増分 / 保持: 戻り値を保持した状態の増分")
+    print("RSS増分: 初回実行（トレースなし）前後のプロセスRSSの差")
+
+    if args.json:
+        path = write_results(
+            args.json,
+            [
+                result(
+                    r["test"],
+                    {
+                        name: metric(unit="bytes", value=r[f"{name}_bytes"])
+                        for name in ("peak", "retained")
+                    },
+                )
+                for r in results
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n中断されました")
+        sys.exit(1)
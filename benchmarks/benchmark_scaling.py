@@ -0,0 +1,378 @@
+"""スケーリングのベンチマーク
+
+入力サイズを変化させて主要な処理の実行時間を測定し、スケーリング曲線を出力します。
+両対数の傾き（実行時間 ∝ サイズ^k のk）を隣接点間で算出し、k > 1.2 の区間を
+超線形として警告します。
+
+スイープ:
+    - tools:   ツール数 1〜1000（extract_tools_from_agent, create_mcp_from_tools）
+    - schema_width: 1ツールのプロパティ数 1〜500（ネストなし）
+    - schema_depth: 1ツールのネストの深さ 1〜16（各階層のプロパティ5個）
+      （どちらもスキーマに依存する処理: JSON Schema検証器の作成（_build_dispatch）と
+      その検証器での1回の検証、引数の検証器の作成（build_args_validator））
+      jsonschemaの検証器は作成時にスキーマを解析しないため、スキーマの大きさに
+      比例するコストは作成ではなく検証に現れる
+    - history: 会話履歴のターン数 1〜1000（convert_to_claude_prompt）
+    - deps:    依存性の要素数 10〜10000（serialize_deps）
+
+実行方法:
+    uv run python benchmarks/benchmark_scaling.py [--sweep tools] [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import math
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from _stats import summarize
+from claude_code_sdk import SdkMcpTool
+from pydantic import BaseModel
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import FunctionToolset
+from pydantic_claude_cli.deps_support import serialize_deps
+from pydantic_claude_cli.mcp_server_fixed import _build_dispatch
+from pydantic_claude_cli.message_converter import convert_to_claude_prompt
+from pydantic_claude_cli.tool_converter import create_mcp_from_tools
+from pydantic_claude_cli.tool_support import extract_tools_from_agent
+from pydantic_claude_cli.tool_validation import build_args_validator
+from typing_extensions import TypedDict
+from results import metric, result, write_results
+
+# 超線形とみなす両対数の傾き
+SUPERLINEAR_SLOPE = 1.2
+
+TOOL_COUNTS = (1, 10, 100, 300, 1000)
+SCHEMA_WIDTHS = (1, 10, 50, 100, 500)
+SCHEMA_DEPTHS = (1, 2, 4, 8, 16)
+SCHEMA_DEPTH_WIDTH = 5
+HISTORY_TURNS = (1, 10, 100, 300, 1000)
+DEPS_ITEMS = (10, 100, 1000, 10000)
+
+
+def time_call(
+    fn: Callable[[], Any], *, min_repeats: int = 5, min_seconds: float = 0.2
+) -> list[float]:
+    """min_repeats回以上、合計min_seconds以上になるまで実行時間を測定"""
+    fn()  # ウォームアップ
+    samples: list[float] = []
+    total = 0.0
+    while len(samples) < min_repeats or total < min_seconds:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+        if len(samples) >= 1000:
+            break
+    return samples
+
+
+# 入力の生成
+
+
+def _tool(i: int) -> Callable[..., int]:
+    def tool(x: int, y: int = 0) -> int:
+        return x + y + i
+
+    return tool
+
+
+def tools(count: int) -> tuple[ModelRequestParameters, FunctionToolset[Any]]:
+    """count個のツールを持つtoolsetと、対応するリクエストパラメータ"""
+    toolset: FunctionToolset[Any] = FunctionToolset()
+    for i in range(count):
+        toolset.add_function(_tool(i), name=f"tool_{i}", description=f"Tool {i}")
+    params = ModelRequestParameters(
+        function_tools=[
+            ToolDefinition(
+                name=name,
+                description=tool.description,
+                parameters_json_schema=tool.function_schema.json_schema,
+            )
+            for name, tool in toolset.tools.items()
+        ]
+    )
+    return params, toolset
+
+
+def nested_schema(width: int, depth: int) -> dict[str, Any]:
+    """width個のプロパティを持つオブジェクトをdepth段ネストしたスキーマ"""
+    properties: dict[str, Any] = {f"p{i}": {"type": "integer"} for i in range(width)}
+    if depth > 1:
+        properties["child"] = nested_schema(width, depth - 1)
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+def nested_args(width: int, depth: int) -> dict[str, Any]:
+    """nested_schema(width, depth)に適合する引数"""
+    args: dict[str, Any] = {f"p{i}": i for i in range(width)}
+    if depth > 1:
+        args["child"] = nested_args(width, depth - 1)
+    return args
+
+
+def _nested_fields(width: int, depth: int) -> dict[str, Any]:
+    fields: dict[str, Any] = {f"p{i}": int for i in range(width)}
+    if depth > 1:
+        fields["child"] = TypedDict(  # type: ignore[misc]
+            f"Level{depth - 1}", _nested_fields(width, depth - 1)
+        )
+    return fields
+
+
+def nested_function(width: int, depth: int) -> Callable[..., Any]:
+    """nested_schema(width, depth)と同じ引数を受け取るツール関数"""
+
+    def tool(**kwargs: Any) -> int:
+        return len(kwargs)
+
+    annotations = _nested_fields(width, depth)
+    tool.__annotations__ = {**annotations, "return": int}
+    tool.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=tp)
+            for name, tp in annotations.items()
+        ]
+    )
+    return tool
+
+
+def history(turns: int) -> list[ModelRequest | ModelResponse]:
+    """turns往復の会話履歴"""
+    messages: list[ModelRequest | ModelResponse] = []
+    for i in range(turns):
+        messages.append(
+            ModelRequest(parts=[UserPromptPart(content=f"Q{i} " + "x" * 200)])
+        )
+        messages.append(ModelResponse(parts=[TextPart(content=f"A{i} " + "y" * 400)]))
+    return messages
+
+
+class _Item(BaseModel):
+    id: int
+    name: str
+    tags: list[str]
+
+
+class _Deps(BaseModel):
+    items: list[_Item]
+
+
+# スイープ
+
+
+def sweep_tools() -> list[dict[str, Any]]:
+    points = []
+    for count in TOOL_COUNTS:
+        params, toolset = tools(count)
+        extracted, _ = extract_tools_from_agent(params, agent_toolsets=[toolset])
+        points.append(
+            {
+                "target": "extract_tools_from_agent",
+                "size": count,
+                "samples": time_call(
+                    lambda: extract_tools_from_agent(params, agent_toolsets=[toolset])
+                ),
+            }
+        )
+        points.append(
+            {
+                "target": "create_mcp_from_tools",
+                "size": count,
+                "samples": time_call(lambda: create_mcp_from_tools(extracted)),
+            }
+        )
+    return points
+
+
+def _schema_points(
+    shapes: list[tuple[int, int]], size: Callable[[int, int], int]
+) -> list[dict[str, Any]]:
+    points = []
+    for width, depth in shapes:
+        schema = nested_schema(width, depth)
+        sdk_tools = [SdkMcpTool("complex", "complex", schema, _handler)]
+        func = nested_function(width, depth)
+        validator = _build_dispatch(sdk_tools)["complex"].validator
+        args = nested_args(width, depth)
+        shape = f"{width}x{depth}"
+        points.append(
+            {
+                "target": "_build_dispatch",
+                "size": size(width, depth),
+                "shape": shape,
+                "samples": time_call(lambda: _build_dispatch(sdk_tools)),
+            }
+        )
+        points.append(
+            {
+                "target": "jsonschema_validate",
+                "size": size(width, depth),
+                "shape": shape,
+                "samples": time_call(lambda: validator.is_valid(args)),
+            }
+        )
+        points.append(
+            {
+                "target": "build_args_validator",
+                "size": size(width, depth),
+                "shape": shape,
+                # キャッシュを使わず毎回作成する（get_args_validatorは関数ごとに1度だけ）
+                "samples": time_call(lambda: build_args_validator(func)),
+            }
+        )
+    return points
+
+
+async def _handler(args: dict[str, Any]) -> dict[str, Any]:
+    return {"content": []}
+
+
+def sweep_schema_width() -> list[dict[str, Any]]:
+    return _schema_points(
+        [(width, 1) for width in SCHEMA_WIDTHS], lambda width, depth: width
+    )
+
+
+def sweep_schema_depth() -> list[dict[str, Any]]:
+    return _schema_points(
+        [(SCHEMA_DEPTH_WIDTH, depth) for depth in SCHEMA_DEPTHS],
+        lambda width, depth: depth,
+    )
+
+
+def sweep_history() -> list[dict[str, Any]]:
+    points = []
+    for turns in HISTORY_TURNS:
+        messages = history(turns)
+        points.append(
+            {
+                "target": "convert_to_claude_prompt",
+                "size": turns,
+                "samples": time_call(lambda: convert_to_claude_prompt(messages)),
+            }
+        )
+    return points
+
+
+def sweep_deps() -> list[dict[str, Any]]:
+    points = []
+    for count in DEPS_ITEMS:
+        deps = _Deps(
+            items=[_Item(id=i, name=f"item-{i}", tags=["a", "b"]) for i in range(count)]
+        )
+        points.append(
+            {
+                "target": "serialize_deps",
+                "size": count,
+                "samples": time_call(lambda: serialize_deps(deps)),
+            }
+        )
+    return points
+
+
+SWEEPS: dict[str, Callable[[], list[dict[str, Any]]]] = {
+    "tools": sweep_tools,
+    "schema_width": sweep_schema_width,
+    "schema_depth": sweep_schema_depth,
+    "history": sweep_history,
+    "deps": sweep_deps,
+}
+
+
+def slopes(points: list[dict[str, Any]]) -> list[float | None]:
+    """隣接点間の両対数の傾き（先頭はNone）"""
+    result: list[float | None] = [None]
+    for prev, cur in zip(points, points[1:]):
+        t0, t1 = prev["median"], cur["median"]
+        if prev["size"] == cur["size"] or t0 <= 0 or t1 <= 0:
+            result.append(None)
+        else:
+            result.append(math.log(t1 / t0) / math.log(cur["size"] / prev["size"]))
+    return result
+
+
+def print_sweep(name: str, points: list[dict[str, Any]]) -> list[str]:
+    """スイープの結果を表示し、超線形の区間を返す"""
+    warnings = []
+    for target in dict.fromkeys(p["target"] for p in points):
+        series = [p for p in points if p["target"] == target]
+        for p in series:
+            p["median"] = summarize(p["samples"])["p50"]
+        print(f"【{name}】{target}")
+        print(f"  {'サイズ':>8}  {'中央値(ms)':>12}  {'μs/要素':>10}  {'傾き':>6}")
+        for p, k in zip(series, slopes(series)):
+            label = p.get("shape", str(p["size"]))
+            flag = ""
+            if k is not None and k > SUPERLINEAR_SLOPE:
+                flag = "  ⚠ 超線形"
+                warnings.append(f"{name}/{target}: サイズ {label} で傾き {k:.2f}")
+            print(
+                f"  {label:>8}  {p['median'] * 1000:12.3f}  "
+                f"{p['median'] / p['size'] * 1e6:10.2f}  "
+                f"{(f'{k:.2f}' if k is not None else '-'):>6}{flag}"
+            )
+        print()
+    return warnings
+
+
+def main() -> None:
+    """ベンチマークを実行"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sweep",
+        choices=list(SWEEPS),
+        action="append",
+        help="実行するスイープ（複数指定可、省略時はすべて）",
+    )
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存する")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("pydantic-claude-cli スケーリングベンチマーク")
+    print("=" * 70)
+    print()
+
+    all_points: dict[str, list[dict[str, Any]]] = {}
+    warnings: list[str] = []
+    for name in args.sweep or list(SWEEPS):
+        all_points[name] = SWEEPS[name]()
+        warnings += print_sweep(name, all_points[name])
+
+    if warnings:
+        print(f"⚠ 超線形の区間（傾き > {SUPERLINEAR_SLOPE}）:")
+        for w in warnings:
+            print(f"  - {w}")
+    else:
+        print(f"✅ 超線形の区間はありません（傾き ≤ {SUPERLINEAR_SLOPE}）")
+
+    if args.json:
+        path = write_results(
+            args.json,
+            [
+                result(
+                    f"scaling_{name}_{p['target']}",
+                    {"time": metric(unit="s", samples=p["samples"])},
+                    size=p["size"],
+                    **({"shape": p["shape"]} if "shape" in p else {}),
+                )
+                for name, points in all_points.items()
+                for p in points
+            ],
+        )
+        print(f"結果を保存しました: {path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n中断されました")
+        sys.exit(1)
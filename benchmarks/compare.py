@@ -0,0 +1,67 @@
+"""2つのベンチマーク結果を比較し、有意な性能劣化を検出する
+
+劣化が1つでもあれば終了コード1を返すため、CIのゲートとして使用できます。
+
+実行方法:
+    uv run python benchmarks/benchmark_custom_tools.py --fake-cli --json base.json
+    # ... 変更後 ...
+    uv run python benchmarks/benchmark_custom_tools.py --fake-cli --json new.json
+    uv run python benchmarks/compare.py base.json new.json --alpha 0.01 --threshold 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from results import compare_results, load_results
+
+_MARKS = {
+    "regression": "❌",
+    "improvement": "✅",
+    "unchanged": "  ",
+    "insufficient": "· ",
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """比較を実行し、終了コードを返す"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="基準となる結果ファイル")
+    parser.add_argument("new", help="比較対象の結果ファイル")
+    parser.add_argument("--alpha", type=float, default=0.01, help="有意水準")
+    parser.add_argument(
+        "--threshold", type=float, default=0.05, help="無視する相対変化（0.05 = 5%%）"
+    )
+    args = parser.parse_args(argv)
+
+    base = load_results(args.base)
+    new = load_results(args.new)
+    comparisons = compare_results(base, new, alpha=args.alpha, threshold=args.threshold)
+
+    print(
+        f"基準: {base['environment'].get('git_sha')}  "
+        f"比較対象: {new['environment'].get('git_sha')}"
+    )
+    print()
+    for c in comparisons:
+        p = f"p={c.p_value:.4f}" if c.p_value is not None else "p=-"
+        print(
+            f"{_MARKS[c.status]} {c.key}: {c.base:.6g} → {c.new:.6g} {c.unit} "
+            f"({c.change:+.1%}, {p})"
+        )
+
+    regressions = [c for c in comparisons if c.status == "regression"]
+    insufficient = [c for c in comparisons if c.status == "insufficient"]
+    print()
+    print(f"比較 {len(comparisons)}件 / 劣化 {len(regressions)}件")
+    if insufficient:
+        print(
+            f"サンプル不足のため参考値（判定対象外）: {len(insufficient)}件 "
+            "（·印、各ベンチマークの繰り返し回数を増やしてください）"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""ベンチマーク結果のJSON保存と比較
+
+結果ファイルの形式:
+    {
+      "schema_version": 1,
+      "environment": {"python": ..., "platform": ..., "git_sha": ..., "packages": {...}},
+      "results": [
+        {
+          "scenario": "tool_extraction",
+          "params": {"num_tools": 5},
+          "metrics": {
+            "time": {"unit": "s", "direction": "lower", "samples": [...], "stats": {...}}
+          }
+        }
+      ]
+    }
+
+`direction`は値が小さい方が良い（lower）か大きい方が良い（higher）かを表します。
+比較は`benchmarks/compare.py`で行います。
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from _stats import summarize
+
+SCHEMA_VERSION = 1
+
+_PACKAGES = ("pydantic-claude-cli", "pydantic-ai", "pydantic", "claude-code-sdk", "mcp")
+
+
+def git_sha() -> str | None:
+    """リポジトリのコミットSHA（未コミットの変更がある場合は末尾に-dirty）"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{sha}-dirty" if dirty else sha
+
+
+def environment() -> dict[str, Any]:
+    """実行環境の情報"""
+    packages: dict[str, str | None] = {}
+    for name in _PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_sha": git_sha(),
+        "packages": packages,
+    }
+
+
+def metric(
+    *,
+    unit: str,
+    samples: list[float] | None = None,
+    value: float | None = None,
+    direction: str = "lower",
+) -> dict[str, Any]:
+    """メトリクスを作成する（samplesまたはvalueのどちらかを指定）"""
+    if (samples is None) == (value is None):
+        raise ValueError("Specify exactly one of samples or value")
+    result: dict[str, Any] = {"unit": unit, "direction": direction}
+    if samples is not None:
+        result["samples"] = list(samples)
+        result["stats"] = summarize(list(samples))
+    else:
+        result["value"] = value
+    return result
+
+
+def result(
+    scenario: str, metrics: dict[str, dict[str, Any]], **params: Any
+) -> dict[str, Any]:
+    """1シナリオの結果を作成する"""
+    return {"scenario": scenario, "params": params, "metrics": metrics}
+
+
+def write_results(path: str | Path, results: list[dict[str, Any]]) -> Path:
+    """結果をJSONファイルに保存する"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "schema_version": SCHEMA_VERSION,
+        "environment": environment(),
+        "results": results,
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+    return path
+
+
+def load_results(path: str | Path) -> dict[str, Any]:
+    """結果ファイルを読み込む"""
+    data = json.loads(Path(path).read_text())
+    if data.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path}: unsupported schema version {data.get('schema_version')}"
+        )
+    return dict(data)
+
+
+# 比較
+
+
+def mann_whitney_p(a: list[float], b: list[float]) -> float:
+    """Mann-WhitneyのU検定（両側、正規近似・同順位補正あり）のp値
+
+    レイテンシのような非正規分布でも使えるノンパラメトリック検定です。
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    combined = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t**3 - t
+        i = j + 1
+    rank_sum_a = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return 2 * (1 - statistics.NormalDist().cdf(abs(z)))
+
+
+@dataclass
+class Comparison:
+    """1メトリクスの比較結果"""
+
+    key: str
+    unit: str
+    base: float
+    new: float
+    change: float
+    """相対変化（正の値は悪化）"""
+    p_value: float | None
+    status: str
+    """regression / improvement / unchanged / insufficient"""
+
+
+MIN_SAMPLES = 2
+"""検定に必要な1メトリクスあたりのサンプル数（これ未満は参考値として扱う）"""
+
+
+def _center(m: dict[str, Any]) -> float:
+    if "samples" in m:
+        return float(statistics.median(m["samples"]))
+    return float(m["value"])
+
+
+def compare_results(
+    base: dict[str, Any],
+    new: dict[str, Any],
+    *,
+    alpha: float = 0.01,
+    threshold: float = 0.05,
+) -> list[Comparison]:
+    """2つの結果を比較する
+
+    中央値の相対変化がthresholdを超え、かつMann-WhitneyのU検定でp < alphaの場合に
+    有意とみなします。単一値のメトリクスやサンプルがMIN_SAMPLES未満のメトリクスは
+    検定できないため、1回の測定のばらつきを劣化と判定しないよう`insufficient`
+    （参考値）として報告します。
+
+    Args:
+        base: 基準となる結果
+        new: 比較対象の結果
+        alpha: 有意水準
+        threshold: 無視する相対変化の大きさ（0.05 = 5%）
+    """
+
+    def index(data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        entries: dict[str, dict[str, Any]] = {}
+        for r in data["results"]:
+            params = json.dumps(r.get("params", {}), sort_keys=True)
+            for name, m in r["metrics"].items():
+                entries[f"{r['scenario']} {params} {name}"] = m
+        return entries
+
+    base_index = index(base)
+    comparisons = []
+    for key, m_new in index(new).items():
+        m_base = base_index.get(key)
+        if m_base is None:
+            continue
+        b, n = _center(m_base), _center(m_new)
+        sign = -1.0 if m_new.get("direction") == "higher" else 1.0
+        change = sign * (n - b) / abs(b) if b else 0.0
+
+        base_samples = m_base.get("samples", ())
+        new_samples = m_new.get("samples", ())
+        p_value: float | None = None
+        if len(base_samples) < MIN_SAMPLES or len(new_samples) < MIN_SAMPLES:
+            comparisons.append(
+                Comparison(
+                    key, m_new.get("unit", ""), b, n, change, None, "insufficient"
+                )
+            )
+            continue
+        p_value = mann_whitney_p(base_samples, new_samples)
+        significant = abs(change) > threshold and p_value < alpha
+
+        if not significant:
+            status = "unchanged"
+        elif change > 0:
+            status = "regression"
+        else:
+            status = "improvement"
+        comparisons.append(
+            Comparison(key, m_new.get("unit", ""), b, n, change, p_value, status)
+        )
+    return comparisons
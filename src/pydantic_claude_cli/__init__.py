@@ -24,9 +24,12 @@ Requirements:
     - You must be logged in to Claude Code
 """
 
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .builtin_tools import BuiltinTools, ToolPreset
-from .claude_code_cli_agent import ClaudeCodeCLIAgent
-from .emulated_run_context import EmulatedRunContext
 from .exceptions import (
     ClaudeCLINotFoundError,
     ClaudeCLIProcessError,
@@ -34,8 +37,52 @@ from .exceptions import (
     PydanticClaudeCLIError,
     ToolIntegrationError,
 )
-from .model import ClaudeCodeCLIModel
-from .provider import ClaudeCodeCLIProvider
+
+if TYPE_CHECKING:
+    from .capabilities import CLICapabilities
+    from .claude_code_cli_agent import ClaudeCodeCLIAgent
+    from .emulated_run_context import EmulatedRunContext
+    from .model import ClaudeCodeCLIModel
+    from .provider import ClaudeCodeCLIProvider
+    from .recording import MessageRecorder, MessageReplayer
+    from .response_cache import ResponseCache, ResponseCacheStats
+    from .tool_cache import ToolCacheStats, ToolResultCache
+    from .tool_options import ToolOptions
+    from .tool_stats import ToolCallStats, ToolStatsRegistry
+
+# Attributes that pull in heavy dependencies (claude_code_sdk, mcp, pydantic_ai)
+# are imported on first access (PEP 562), so that importing the package for
+# BuiltinTools or the exceptions stays cheap.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "ClaudeCodeCLIModel": ".model",
+    "ClaudeCodeCLIProvider": ".provider",
+    "CLICapabilities": ".capabilities",
+    "ResponseCache": ".response_cache",
+    "ResponseCacheStats": ".response_cache",
+    "ToolOptions": ".tool_options",
+    "ToolResultCache": ".tool_cache",
+    "ToolCacheStats": ".tool_cache",
+    "ToolStatsRegistry": ".tool_stats",
+    "ToolCallStats": ".tool_stats",
+    "MessageRecorder": ".recording",
+    "MessageReplayer": ".recording",
+    "ClaudeCodeCLIAgent": ".claude_code_cli_agent",
+    "EmulatedRunContext": ".emulated_run_context",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __version__ = "0.1.0"
 
@@ -43,9 +90,21 @@ __all__ = [
     # Main exports
     "ClaudeCodeCLIModel",
     "ClaudeCodeCLIProvider",
+    "CLICapabilities",
+    # Response cache
+    "ResponseCache",
+    "ResponseCacheStats",
+    # Record/replay
+    "MessageRecorder",
+    "MessageReplayer",
     # Tool utilities
     "BuiltinTools",
     "ToolPreset",
+    "ToolOptions",
+    "ToolResultCache",
+    "ToolCacheStats",
+    "ToolStatsRegistry",
+    "ToolCallStats",
     # Experimental: Milestone 3 (Dependency injection support)
     "ClaudeCodeCLIAgent",
     "EmulatedRunContext",
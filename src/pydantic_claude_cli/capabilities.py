@@ -0,0 +1,196 @@
+"""CLIのバージョンと対応フラグの検出
+
+`claude --version`と`claude --help`を1度だけ実行し、CLIのバージョンと対応しているフラグを
+取得します。結果はバイナリのパス・inode・mtimeをキーにプロセス内（とオプションでディスク）に
+キャッシュされるため、リクエストごとに試行錯誤でCLIを起動する必要がありません。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIProvider
+
+    provider = ClaudeCodeCLIProvider()
+    caps = provider.capabilities
+    print(caps.version, caps.supports("--strict-mcp-config"))
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+__all__ = ("CLICapabilities", "probe_cli_capabilities")
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 10.0
+"""各プローブ（--version / --help）のタイムアウト秒数"""
+
+FAILED_PROBE_TTL = 60.0
+"""起動に失敗・タイムアウトしたプローブの結果を再利用する秒数"""
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+# ヘルプのオプション行（"  -p, --print" や "  --allowedTools, --allowed-tools <tools...>"）
+_OPTION_LINE_RE = re.compile(r"^\s+-")
+_FLAG_RE = re.compile(r"(?<![\w-])--[A-Za-z][\w-]*")
+
+# (パス, inode, mtime) -> 検出結果
+_probe_cache: dict[tuple[str, int, int], CLICapabilities] = {}
+# (パス, inode, mtime) -> (期限, 失敗したプローブの結果)
+_failed_probes: dict[tuple[str, int, int], tuple[float, CLICapabilities]] = {}
+_probe_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CLICapabilities:
+    """CLIのバージョンと対応フラグ"""
+
+    version: str | None
+    """`--version`の出力（取得できなかった場合はNone）"""
+    flags: frozenset[str] = field(default_factory=frozenset)
+    """`--help`に記載された長いオプション（例: "--mcp-config"）"""
+
+    @property
+    def version_info(self) -> tuple[int, int, int] | None:
+        """バージョン番号のタプル（例: (2, 1, 0)）"""
+        if self.version is None:
+            return None
+        match = _VERSION_RE.search(self.version)
+        if match is None:
+            return None
+        major, minor, patch = (int(g) for g in match.groups())
+        return major, minor, patch
+
+    def supports(self, flag: str) -> bool:
+        """フラグに対応しているか（先頭の"--"は省略可）"""
+        return ("--" + flag.lstrip("-")) in self.flags
+
+    def at_least(self, *version: int) -> bool:
+        """バージョンが指定以上か（不明な場合はFalse）"""
+        info = self.version_info
+        return info is not None and info >= version
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに保存できる形式に変換"""
+        return {"version": self.version, "flags": sorted(self.flags)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CLICapabilities:
+        """to_dict()の形式から復元"""
+        version = data.get("version")
+        return cls(
+            version=str(version) if version is not None else None,
+            flags=frozenset(str(f) for f in data.get("flags", [])),
+        )
+
+
+def parse_help_flags(help_text: str) -> frozenset[str]:
+    """`--help`の出力からオプション名を抽出"""
+    flags: set[str] = set()
+    for line in help_text.splitlines():
+        if _OPTION_LINE_RE.match(line):
+            # 説明文中のフラグ（"add --strict-mcp-config to ..."）を拾わないよう、
+            # 説明の前（連続した空白まで）だけを見る
+            head = re.split(r"\s{2,}", line.strip(), maxsplit=1)[0]
+            flags.update(_FLAG_RE.findall(head))
+    return frozenset(flags)
+
+
+def _run(cli_path: str, arg: str, timeout: float) -> str | None:
+    """CLIを起動して標準出力を返す
+
+    起動できない・タイムアウトした場合はNone、0以外で終了した場合は空文字を返します。
+    """
+    try:
+        proc = subprocess.run(
+            [cli_path, arg],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            stdin=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug("CLI probe %s %s failed: %s", cli_path, arg, e)
+        return None
+    if proc.returncode != 0:
+        logger.debug("CLI probe %s %s exited with %d", cli_path, arg, proc.returncode)
+        return ""
+    return proc.stdout
+
+
+def probe_cli_capabilities(
+    cli_path: str,
+    *,
+    fingerprint: tuple[int, int] | None = None,
+    timeout: float = PROBE_TIMEOUT,
+) -> CLICapabilities:
+    """CLIを起動してバージョンと対応フラグを取得する
+
+    fingerprint（inode, mtime）を指定すると、同じバイナリに対する結果をプロセス内で
+    キャッシュします。プローブに失敗した項目は空（version=None, flags=空）になります。
+    起動に失敗・タイムアウトしたプローブの結果はキャッシュせず、`FAILED_PROBE_TTL`秒の
+    間だけ再利用します（一時的な失敗を固定しないため）。
+
+    Args:
+        cli_path: CLIの実行ファイル
+        fingerprint: バイナリの(inode, mtime_ns)
+        timeout: 各プローブのタイムアウト秒数
+    """
+    key = (cli_path, *fingerprint) if fingerprint is not None else None
+    if key is not None:
+        if (cached := _probe_cache.get(key)) is not None:
+            return cached
+        failed = _failed_probes.get(key)
+        if failed is not None and failed[0] > time.monotonic():
+            return failed[1]
+
+    version_output = _run(cli_path, "--version", timeout)
+    help_output = _run(cli_path, "--help", timeout)
+    capabilities = CLICapabilities(
+        version=(version_output or "").strip() or None,
+        flags=parse_help_flags(help_output) if help_output else frozenset(),
+    )
+    logger.debug(
+        "Probed CLI %s: version=%s, %d flags",
+        cli_path,
+        capabilities.version,
+        len(capabilities.flags),
+    )
+    if key is not None:
+        with _probe_lock:
+            if version_output is None or help_output is None:
+                _failed_probes[key] = (
+                    time.monotonic() + FAILED_PROBE_TTL,
+                    capabilities,
+                )
+            else:
+                _failed_probes.pop(key, None)
+                _probe_cache[key] = capabilities
+    return capabilities
+
+
+def cached_capabilities(
+    cli_path: str, fingerprint: tuple[int, int]
+) -> CLICapabilities | None:
+    """プロセス内キャッシュにある検出結果（なければNone、失敗したプローブは含まない）"""
+    return _probe_cache.get((cli_path, *fingerprint))
+
+
+def store_capabilities(
+    cli_path: str, fingerprint: tuple[int, int], capabilities: CLICapabilities
+) -> None:
+    """検出結果をプロセス内キャッシュに登録（ディスクキャッシュからの復元用）"""
+    with _probe_lock:
+        _probe_cache[(cli_path, *fingerprint)] = capabilities
+
+
+def clear_capabilities_cache() -> None:
+    """プロセス内の検出結果のキャッシュを破棄"""
+    with _probe_lock:
+        _probe_cache.clear()
+        _failed_probes.clear()
@@ -0,0 +1,526 @@
+"""Claude Code CLIの代替実行ファイル（オフラインのベンチマーク・テスト用）
+
+実際のCLIと同じstream-jsonプロトコルを話す偽の`claude`コマンドです。
+ネットワークやログインなしで、ClaudeCodeCLIModelのエンドツーエンドのスループットを
+測定できます。`cli_path`で指定して使用します。
+
+- スクリプトに従った応答（プロンプトの正規表現で選択、または順番に循環）
+- 応答までの遅延を確率分布で指定（constant/uniform/normal/lognormal/exponential）
+- SDK MCPサーバーへのツール呼び出し（initialize → tools/list → tools/call）
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel
+    from pydantic_claude_cli.fake_cli import write_launcher
+
+    cli = write_launcher(
+        "/tmp/fake-claude",
+        script={
+            "latency": {"distribution": "lognormal", "mean": 0.05, "sigma": 0.5},
+            "responses": [
+                {"tool_calls": [{"name": "add", "arguments": {"x": 1, "y": 2}}],
+                 "text": "The answer is {results}"},
+            ],
+        },
+    )
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", cli_path=cli)
+    ```
+
+スクリプトは`--fake-script`（JSON文字列またはファイルパス）か、
+環境変数`FAKE_CLAUDE_SCRIPT`で指定します。パッケージをインストールすると
+`fake-claude`コマンドとしても利用できます。
+
+スクリプトの形式:
+    - `latency`: 各アシスタントターンの前に入れる遅延（秒）の分布
+    - `seed`: 遅延の乱数シード
+    - `responses`: 応答のリスト。各応答のキー:
+        - `match`: プロンプトに対する正規表現（省略時は`match`のない応答を順番に使用）
+        - `text`: 最終応答のテキスト。`{prompt}`と`{results}`（ツール結果）を置換する
+        - `thinking`: 思考ブロックのテキスト
+        - `tool_calls`: `{"name", "arguments", "repeat"}`のリスト（MCPツール名）
+        - `latency`: この応答だけに適用する遅延の分布
+        - `is_error`: Trueの場合、エラーのresultメッセージを返す
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shlex
+import stat
+import sys
+import time
+import uuid
+from collections import deque
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, Any
+
+__all__ = ("FakeClaudeCLI", "main", "sample_latency", "write_launcher")
+
+SCRIPT_ENV_VAR = "FAKE_CLAUDE_SCRIPT"
+"""スクリプトを指定する環境変数"""
+
+VERSION = "0.0.0 (Fake Claude Code)"
+
+# `--help`の出力（CLIの対応フラグの検出用）。偽のCLIは--mcp-config以外のMCP設定を
+# 読まないため、--strict-mcp-configは常に満たされている
+HELP = """Usage: fake-claude [options]
+
+Options:
+  --fake-script <path>       Response script (JSON)
+  --input-format <format>    Input format (only "stream-json")
+  --output-format <format>   Output format (always "stream-json")
+  --mcp-config <json>        MCP servers (type "sdk" only)
+  --strict-mcp-config        Only use MCP servers from --mcp-config
+  --model <model>            Model name reported in messages
+  -p, --print                Accepted and ignored
+  --verbose                  Accepted and ignored
+  -v, --version              Output the version number
+  -h, --help                 Display help
+"""
+
+_DEFAULT_RESPONSE: dict[str, Any] = {"text": "OK"}
+
+
+def sample_latency(spec: dict[str, Any] | float | None, rng: random.Random) -> float:
+    """遅延の分布から1サンプルを取得する
+
+    Args:
+        spec: 分布の指定。数値の場合は固定値、Noneの場合は0
+            - `{"distribution": "constant", "value": s}`
+            - `{"distribution": "uniform", "low": s, "high": s}`
+            - `{"distribution": "normal", "mean": s, "stddev": s}`
+            - `{"distribution": "lognormal", "mean": s, "sigma": σ}`（meanは中央値）
+            - `{"distribution": "exponential", "mean": s}`
+        rng: 乱数生成器
+
+    Returns:
+        遅延（秒、0以上）
+
+    Raises:
+        ValueError: 未知の分布の場合
+    """
+    if spec is None:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return max(0.0, float(spec))
+
+    distribution = spec.get("distribution", "constant")
+    if distribution == "constant":
+        value = float(spec.get("value", 0.0))
+    elif distribution == "uniform":
+        value = rng.uniform(float(spec["low"]), float(spec["high"]))
+    elif distribution == "normal":
+        value = rng.gauss(float(spec["mean"]), float(spec.get("stddev", 0.0)))
+    elif distribution == "lognormal":
+        median = float(spec["mean"])
+        value = (
+            rng.lognormvariate(math.log(median), float(spec.get("sigma", 0.0)))
+            if median > 0
+            else 0.0
+        )
+    elif distribution == "exponential":
+        mean = float(spec["mean"])
+        value = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+    else:
+        raise ValueError(f"Unknown latency distribution: {distribution}")
+    return max(0.0, value)
+
+
+def load_script(value: str | None) -> dict[str, Any]:
+    """スクリプトを読み込む
+
+    Args:
+        value: JSON文字列またはJSONファイルのパス。Noneの場合は空のスクリプト
+    """
+    if not value:
+        return {}
+    if value.lstrip().startswith("{"):
+        return dict(json.loads(value))
+    return dict(json.loads(Path(value).read_text(encoding="utf-8")))
+
+
+class FakeClaudeCLI:
+    """stream-jsonプロトコルを話す偽のCLI"""
+
+    def __init__(
+        self,
+        script: dict[str, Any],
+        *,
+        model: str = "claude-fake",
+        mcp_servers: Sequence[str] = (),
+        stdin: IO[str] | None = None,
+        stdout: IO[str] | None = None,
+    ) -> None:
+        """偽のCLIを初期化する
+
+        Args:
+            script: 応答スクリプト
+            model: `--model`で指定されたモデル名
+            mcp_servers: SDK MCPサーバー名（`--mcp-config`のtype=sdkのもの）
+            stdin: 入力ストリーム（省略時はsys.stdin）
+            stdout: 出力ストリーム（省略時はsys.stdout）
+        """
+        self.script = script
+        self.model = model
+        self.mcp_servers = list(mcp_servers)
+        self.session_id = str(uuid.uuid4())
+        self._stdin = stdin if stdin is not None else sys.stdin
+        self._stdout = stdout if stdout is not None else sys.stdout
+        self._pending: deque[dict[str, Any]] = deque()
+        self._rng = random.Random(script.get("seed"))
+        self._mcp_tools: dict[str, list[str]] | None = None
+        self._cycle_index = 0
+
+    def run(self) -> None:
+        """標準入力が閉じるまでメッセージを処理する"""
+        while (message := self._read()) is not None:
+            msg_type = message.get("type")
+            if msg_type == "control_request":
+                self._answer_control_request(message)
+            elif msg_type == "user":
+                self._handle_user_message(message)
+
+    # 入出力
+
+    def _read(self) -> dict[str, Any] | None:
+        if self._pending:
+            return self._pending.popleft()
+        return self._read_raw()
+
+    def _read_raw(self) -> dict[str, Any] | None:
+        for line in self._stdin:
+            if line.strip():
+                return dict(json.loads(line))
+        return None
+
+    def _emit(self, message: dict[str, Any]) -> None:
+        self._stdout.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self._stdout.flush()
+
+    def _answer_control_request(self, message: dict[str, Any]) -> None:
+        subtype = message.get("request", {}).get("subtype")
+        response: dict[str, Any] = {}
+        if subtype == "initialize":
+            response = {"commands": [], "output_style": "default"}
+        self._emit(
+            {
+                "type": "control_response",
+                "response": {
+                    "subtype": "success",
+                    "request_id": message.get("request_id"),
+                    "response": response,
+                },
+            }
+        )
+
+    def _mcp_request(
+        self, server: str, method: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """SDK MCPサーバーにリクエストを送り、応答を待つ"""
+        request_id = str(uuid.uuid4())
+        mcp_message: dict[str, Any] = {"jsonrpc": "2.0", "id": 1, "method": method}
+        if params is not None:
+            mcp_message["params"] = params
+        self._emit(
+            {
+                "type": "control_request",
+                "request_id": request_id,
+                "request": {
+                    "subtype": "mcp_message",
+                    "server_name": server,
+                    "message": mcp_message,
+                },
+            }
+        )
+        while (message := self._read_raw()) is not None:
+            if message.get("type") == "control_response":
+                response = message.get("response", {})
+                if response.get("request_id") == request_id:
+                    if response.get("subtype") == "error":
+                        return {"error": {"message": response.get("error", "")}}
+                    return dict(response.get("response", {}).get("mcp_response", {}))
+            elif message.get("type") == "control_request":
+                self._answer_control_request(message)
+            else:
+                self._pending.append(message)
+        raise EOFError("stdin closed while waiting for MCP response")
+
+    # ターンの処理
+
+    def _connect_mcp_servers(self) -> dict[str, list[str]]:
+        """初回のみMCPサーバーを初期化してツール一覧を取得する"""
+        if self._mcp_tools is None:
+            self._mcp_tools = {}
+            for server in self.mcp_servers:
+                self._mcp_request(
+                    server,
+                    "initialize",
+                    {
+                        "protocolVersion": "2025-06-18",
+                        "capabilities": {},
+                        "clientInfo": {"name": "fake-claude", "version": "0.0.0"},
+                    },
+                )
+                result = self._mcp_request(server, "tools/list").get("result", {})
+                self._mcp_tools[server] = [t["name"] for t in result.get("tools", [])]
+        return self._mcp_tools
+
+    def _select_response(self, prompt: str) -> dict[str, Any]:
+        responses: list[dict[str, Any]] = self.script.get("responses") or []
+        for response in responses:
+            pattern = response.get("match")
+            if pattern is not None and re.search(pattern, prompt):
+                return response
+        unmatched = [r for r in responses if r.get("match") is None]
+        if not unmatched:
+            return _DEFAULT_RESPONSE
+        response = unmatched[self._cycle_index % len(unmatched)]
+        self._cycle_index += 1
+        return response
+
+    def _sleep(self, response: dict[str, Any]) -> None:
+        spec = response.get("latency", self.script.get("latency"))
+        delay = sample_latency(spec, self._rng)
+        if delay:
+            time.sleep(delay)
+
+    def _assistant(self, content: list[dict[str, Any]], message_id: str) -> None:
+        self._emit(
+            {
+                "type": "assistant",
+                "message": {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": self.model,
+                    "content": content,
+                },
+                "parent_tool_use_id": None,
+                "session_id": self.session_id,
+            }
+        )
+
+    def _resolve_tool(self, name: str) -> tuple[str, str]:
+        """ツール名を(サーバー名, MCPツール名)に分解する"""
+        if name.startswith("mcp__"):
+            _, server, tool = name.split("__", 2)
+            return server, tool
+        if not self.mcp_servers:
+            raise ValueError(f"No SDK MCP server available for tool: {name}")
+        return self.mcp_servers[0], name
+
+    def _handle_user_message(self, message: dict[str, Any]) -> None:
+        started = time.monotonic()
+        prompt = _prompt_text(message.get("message", {}).get("content", ""))
+        tools = self._connect_mcp_servers()
+        response = self._select_response(prompt)
+
+        self._emit(
+            {
+                "type": "system",
+                "subtype": "init",
+                "session_id": self.session_id,
+                "model": self.model,
+                "tools": [
+                    f"mcp__{server}__{tool}"
+                    for server, names in tools.items()
+                    for tool in names
+                ],
+                "mcp_servers": [
+                    {"name": server, "status": "connected"} for server in tools
+                ],
+            }
+        )
+
+        results: list[str] = []
+        num_turns = 1
+        for call in response.get("tool_calls") or []:
+            for _ in range(int(call.get("repeat", 1))):
+                server, tool = self._resolve_tool(call["name"])
+                tool_use_id = f"toolu_{uuid.uuid4().hex[:24]}"
+                self._sleep(response)
+                self._assistant(
+                    [
+                        {
+                            "type": "tool_use",
+                            "id": tool_use_id,
+                            "name": f"mcp__{server}__{tool}",
+                            "input": call.get("arguments", {}),
+                        }
+                    ],
+                    f"msg_{uuid.uuid4().hex[:24]}",
+                )
+                mcp_response = self._mcp_request(
+                    server,
+                    "tools/call",
+                    {"name": tool, "arguments": call.get("arguments", {})},
+                )
+                content, is_error = _tool_result(mcp_response)
+                results.append(_prompt_text(content))
+                self._emit(
+                    {
+                        "type": "user",
+                        "message": {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "tool_result",
+                                    "tool_use_id": tool_use_id,
+                                    "content": content,
+                                    "is_error": is_error,
+                                }
+                            ],
+                        },
+                        "parent_tool_use_id": None,
+                        "session_id": self.session_id,
+                    }
+                )
+                num_turns += 1
+
+        self._sleep(response)
+        text = (
+            str(response.get("text", "OK"))
+            .replace("{prompt}", prompt)
+            .replace("{results}", ", ".join(results))
+        )
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        if response.get("thinking"):
+            self._assistant(
+                [
+                    {
+                        "type": "thinking",
+                        "thinking": response["thinking"],
+                        "signature": "fake",
+                    }
+                ],
+                message_id,
+            )
+        self._assistant([{"type": "text", "text": text}], message_id)
+
+        duration_ms = int((time.monotonic() - started) * 1000)
+        is_error = bool(response.get("is_error", False))
+        self._emit(
+            {
+                "type": "result",
+                "subtype": "error_during_execution" if is_error else "success",
+                "duration_ms": duration_ms,
+                "duration_api_ms": duration_ms,
+                "is_error": is_error,
+                "num_turns": num_turns,
+                "session_id": self.session_id,
+                "total_cost_usd": 0.0,
+                "usage": {
+                    "input_tokens": max(1, len(prompt) // 4),
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 0,
+                    "output_tokens": max(1, len(text) // 4),
+                },
+                "result": text,
+            }
+        )
+
+
+def _prompt_text(content: Any) -> str:
+    """メッセージのcontent（文字列またはブロックのリスト）からテキストを取り出す"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "")
+            for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return ""
+
+
+def _tool_result(mcp_response: dict[str, Any]) -> tuple[list[dict[str, Any]], bool]:
+    """MCPのtools/call応答を(tool_resultのcontent, is_error)に変換する"""
+    if "error" in mcp_response:
+        message = str(mcp_response["error"].get("message", "MCP error"))
+        return [{"type": "text", "text": message}], True
+    result = mcp_response.get("result", {})
+    content = [
+        block for block in result.get("content", []) if block.get("type") == "text"
+    ]
+    return content, bool(result.get("isError") or result.get("is_error"))
+
+
+def _sdk_server_names(mcp_config: str | None) -> list[str]:
+    if not mcp_config:
+        return []
+    try:
+        servers = json.loads(mcp_config).get("mcpServers", {})
+    except json.JSONDecodeError:
+        return []
+    return [name for name, config in servers.items() if config.get("type") == "sdk"]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """コマンドラインのエントリーポイント"""
+    parser = argparse.ArgumentParser(prog="fake-claude", add_help=False)
+    parser.add_argument("--version", "-v", action="store_true")
+    parser.add_argument("--help", "-h", action="store_true")
+    parser.add_argument("--fake-script", default=os.environ.get(SCRIPT_ENV_VAR))
+    parser.add_argument("--model", default="claude-fake")
+    parser.add_argument("--mcp-config")
+    parser.add_argument("--input-format")
+    parser.add_argument("--print", "-p", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+
+    if args.version:
+        print(VERSION)
+        return 0
+    if args.help:
+        print(HELP, end="")
+        return 0
+    if args.input_format != "stream-json":
+        print("fake-claude only supports --input-format stream-json", file=sys.stderr)
+        return 1
+
+    FakeClaudeCLI(
+        load_script(args.fake_script),
+        model=args.model,
+        mcp_servers=_sdk_server_names(args.mcp_config),
+    ).run()
+    return 0
+
+
+def write_launcher(
+    path: str | Path,
+    script: dict[str, Any] | str | Path | None = None,
+) -> Path:
+    """`cli_path`に指定できる実行ファイルを作成する
+
+    現在のPythonインタープリタで本モジュールを起動するシェルスクリプトを書き出します。
+    起動を速くするため、パッケージ（pydantic-ai等）をimportせずにファイルを直接実行します
+    （本モジュールは標準ライブラリのみに依存）。
+
+    Args:
+        path: 作成する実行ファイルのパス
+        script: 応答スクリプト（dict、JSON文字列、またはJSONファイルのパス）
+
+    Returns:
+        作成した実行ファイルのパス
+    """
+    path = Path(path)
+    command = [sys.executable, str(Path(__file__).resolve())]
+    if isinstance(script, dict):
+        command += ["--fake-script", json.dumps(script, separators=(",", ":"))]
+    elif script is not None:
+        command += ["--fake-script", str(script)]
+    path.write_text(
+        "#!/bin/sh\nexec " + " ".join(shlex.quote(c) for c in command) + ' "$@"\n',
+        encoding="utf-8",
+    )
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+if __name__ == "__main__":
+    sys.exit(main())
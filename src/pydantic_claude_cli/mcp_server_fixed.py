@@ -9,19 +9,152 @@ claude-code-sdkのcreate_sdk_mcp_server()にバグがあるため、
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any
 
+import jsonschema
 from claude_code_sdk import SdkMcpTool
 from claude_code_sdk.types import McpSdkServerConfig
 from mcp.server import Server
-from mcp.types import TextContent, Tool
+from mcp.types import (
+    AudioContent,
+    CallToolResult,
+    ContentBlock,
+    EmbeddedResource,
+    ImageContent,
+    ListToolsRequest,
+    ListToolsResult,
+    ResourceLink,
+    TextContent,
+    Tool,
+)
+from pydantic_core import to_json
+
+from .tool_stats import ToolStatsRegistry
+from .tool_validation import format_argument_errors
 
 # ロガーを設定
 logger = logging.getLogger(__name__)
 
 
+_PYTHON_TO_JSON_TYPE: dict[type, str] = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+
+def to_json_schema(input_schema: Any) -> dict[str, Any]:
+    """ツールの入力スキーマをMCPのinputSchema（JSON Schema）に変換する
+
+    JSON Schemaはそのまま使用します（enum、ネストしたオブジェクト、$defs/$ref、デフォルト値、
+    説明、必須項目をすべて保持）。`{"x": int}`のような型マッピングは、全パラメータを必須とする
+    JSON Schemaに変換します。
+
+    Args:
+        input_schema: JSON Schema、または{パラメータ名: Python型}のマッピング
+
+    Returns:
+        トップレベルが"object"のJSON Schema
+    """
+    if not isinstance(input_schema, dict):
+        # 型が不明な場合は空のスキーマ
+        return {"type": "object", "properties": {}}
+
+    if input_schema and all(isinstance(v, type) for v in input_schema.values()):
+        # シンプルなdict（型マッピング）をJSON Schemaに変換
+        properties = {
+            param_name: {"type": _PYTHON_TO_JSON_TYPE.get(param_type, "string")}
+            for param_name, param_type in input_schema.items()
+        }
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties.keys()),
+        }
+
+    # JSON Schema（空のスキーマは引数なしのオブジェクトとして扱う）
+    schema = dict(input_schema)
+    schema.setdefault("type", "object")
+    if schema["type"] == "object":
+        schema.setdefault("properties", {})
+    return schema
+
+
+_CONTENT_TYPES: dict[str, type[ContentBlock]] = {
+    "image": ImageContent,
+    "audio": AudioContent,
+    "resource": EmbeddedResource,
+    "resource_link": ResourceLink,
+}
+
+
+def _to_content_block(item: Any) -> ContentBlock | None:
+    """ツール結果のコンテンツ（dict）をMCPのコンテンツブロックに変換する"""
+    if not isinstance(item, dict):
+        return None
+    kind = str(item.get("type"))
+    if kind == "text":
+        return TextContent(type="text", text=item.get("text", ""))
+    content_type = _CONTENT_TYPES.get(kind)
+    if content_type is None:
+        logger.warning("Unsupported tool result content type: %s", kind)
+        return None
+    return content_type.model_validate(item)
+
+
+@dataclass(frozen=True)
+class _ToolEntry:
+    """ディスパッチテーブルの1エントリ"""
+
+    sdk_tool: SdkMcpTool[Any]
+    tool: Tool
+    validator: Any
+    """コンパイル済みのJSON Schema検証器（ハンドラーが引数を検証するツールではNone）"""
+
+
+def _build_dispatch(
+    tools: list[SdkMcpTool[Any]], validated_tools: Collection[str] = ()
+) -> Mapping[str, _ToolEntry]:
+    """ツール名から定義・検証器への読み取り専用の対応表を作成する
+
+    Args:
+        tools: ツールリスト
+        validated_tools: ハンドラー自身が引数を検証するツールの名前（JSON Schemaの
+            検証器を作成しない）
+    """
+    entries: dict[str, _ToolEntry] = {}
+    for tool_def in tools:
+        schema = to_json_schema(tool_def.input_schema)
+        validator = None
+        if tool_def.name not in validated_tools:
+            # NOTE: check_schema()（メタスキーマによる検証）はツール1個あたり数msかかるため
+            # 行わない。不正なスキーマは呼び出し時のSchemaErrorとしてエラー結果になる
+            validator = jsonschema.validators.validator_for(schema)(schema)
+        entries[tool_def.name] = _ToolEntry(
+            sdk_tool=tool_def,
+            tool=Tool(
+                name=tool_def.name,
+                description=tool_def.description,
+                inputSchema=schema,
+            ),
+            validator=validator,
+        )
+    return MappingProxyType(entries)
+
+
 def create_fixed_sdk_mcp_server(
-    name: str, version: str = "1.0.0", tools: list[SdkMcpTool[Any]] | None = None
+    name: str,
+    version: str = "1.0.0",
+    tools: list[SdkMcpTool[Any]] | None = None,
+    validated_tools: Collection[str] = (),
+    stats: ToolStatsRegistry | None = None,
 ) -> McpSdkServerConfig:
     """修正版SDK MCPサーバーを作成する
 
@@ -31,6 +164,10 @@ def create_fixed_sdk_mcp_server(
         name: サーバー名
         version: バージョン
         tools: ツールリスト
+        validated_tools: ハンドラー自身が引数を検証・変換するツールの名前。
+            JSON Schemaでは検証しない（"5"→5のような変換や未知の引数の無視を妨げないため）
+        stats: JSON Schemaの検証で拒否した呼び出しをエラーとして記録する先
+            （ハンドラーに届かないため、ハンドラー側では記録されない）
 
     Returns:
         McpSdkServerConfig
@@ -40,7 +177,8 @@ def create_fixed_sdk_mcp_server(
         以下の点を修正しています：
         - ツール登録の方法
         - call_toolハンドラーの戻り値形式
-        - list_toolsハンドラーの実装
+        - list_toolsハンドラーの実装（JSON Schemaをそのまま返し、一覧は作成時に計算）
+        - 入力検証（作成時にコンパイルした検証器を使用、`validated_tools`は除く）
     """
     # MCPサーバーインスタンスを作成
     logger.debug("Creating MCP Server instance: name=%s, version=%s", name, version)
@@ -49,66 +187,25 @@ def create_fixed_sdk_mcp_server(
     # ツールを登録
     if tools:
         logger.debug("Registering %d tools with MCP server", len(tools))
-        # ツールマップを作成
-        tool_map: dict[str, SdkMcpTool[Any]] = {
-            tool_def.name: tool_def for tool_def in tools
-        }
+        # ツール一覧と呼び出しのディスパッチテーブルはサーバー作成時に1度だけ作成し、
+        # 以降は変更しない（tools/listは同じ結果オブジェクトを共有して返す）
+        dispatch = _build_dispatch(tools, validated_tools)
+        list_result = ListToolsResult(tools=[entry.tool for entry in dispatch.values()])
 
         # list_toolsハンドラーを登録
         @server.list_tools()  # type: ignore[misc]
-        async def handle_list_tools() -> list[Tool]:
+        async def handle_list_tools(_request: ListToolsRequest) -> ListToolsResult:
             """利用可能なツールのリストを返す"""
-            tool_list = []
-
-            for tool_def in tools:
-                # input_schemaをJSON Schema形式に変換
-                if isinstance(tool_def.input_schema, dict):
-                    # 既にJSON Schemaかチェック
-                    if (
-                        "type" in tool_def.input_schema
-                        and "properties" in tool_def.input_schema
-                    ):
-                        schema = tool_def.input_schema
-                    else:
-                        # シンプルなdict（型マッピング）をJSON Schemaに変換
-                        properties = {}
-                        for param_name, param_type in tool_def.input_schema.items():
-                            if param_type is str:
-                                properties[param_name] = {"type": "string"}
-                            elif param_type is int:
-                                properties[param_name] = {"type": "integer"}
-                            elif param_type is float:
-                                properties[param_name] = {"type": "number"}
-                            elif param_type is bool:
-                                properties[param_name] = {"type": "boolean"}
-                            else:
-                                # デフォルト
-                                properties[param_name] = {"type": "string"}
-
-                        schema = {
-                            "type": "object",
-                            "properties": properties,
-                            "required": list(properties.keys()),
-                        }
-                else:
-                    # 型が不明な場合は空のスキーマ
-                    schema = {"type": "object", "properties": {}}
-
-                tool_list.append(
-                    Tool(
-                        name=tool_def.name,
-                        description=tool_def.description,
-                        inputSchema=schema,
-                    )
-                )
-
-            return tool_list
+            return list_result
 
         # call_toolハンドラーを登録
-        @server.call_tool()  # type: ignore[misc]
+        # NOTE: MCPサーバー標準の入力検証（validate_input=True）は呼び出しごとに
+        # jsonschema.validate()でスキーマの検査と検証器の作成を行うため、
+        # 作成時にコンパイルした検証器で検証する
+        @server.call_tool(validate_input=False)  # type: ignore[misc]
         async def handle_call_tool(
             name: str, arguments: dict[str, Any]
-        ) -> list[TextContent]:
+        ) -> CallToolResult:
             """ツールを実行する
 
             Args:
@@ -116,33 +213,65 @@ def create_fixed_sdk_mcp_server(
                 arguments: 引数
 
             Returns:
-                TextContentのリスト
+                CallToolResult
 
             Raises:
-                ValueError: ツールが見つからない場合
+                ValueError: ツールが見つからない場合、または引数がスキーマに合わない場合
             """
-            if name not in tool_map:
+            entry = dispatch.get(name)
+            if entry is None:
                 raise ValueError(f"Tool '{name}' not found")
 
-            tool_def = tool_map[name]
+            start = time.perf_counter()
+            # モデルが1度で修正できるよう、すべてのエラーを関連度順に返す
+            errors = (
+                sorted(
+                    entry.validator.iter_errors(arguments),
+                    key=jsonschema.exceptions.relevance,
+                    reverse=True,
+                )
+                if entry.validator is not None
+                else []
+            )
+            if errors:
+                if stats is not None:
+                    stats.record_call(
+                        name,
+                        time.perf_counter() - start,
+                        error=True,
+                        request_bytes=len(to_json(arguments, fallback=str)),
+                    )
+                raise ValueError(
+                    format_argument_errors(
+                        name,
+                        [
+                            (
+                                ".".join(str(p) for p in error.absolute_path),
+                                error.message,
+                            )
+                            for error in errors
+                        ],
+                    )
+                )
 
             # ツールのハンドラーを呼び出し
-            result = await tool_def.handler(arguments)
+            result = await entry.sdk_tool.handler(arguments)
 
             # 結果をMCP形式に変換
-            content: list[TextContent] = []
+            content: list[ContentBlock] = []
 
             if isinstance(result, dict) and "content" in result:
                 for item in result["content"]:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        content.append(
-                            TextContent(type="text", text=item.get("text", ""))
-                        )
+                    block = _to_content_block(item)
+                    if block is not None:
+                        content.append(block)
             else:
                 # 結果が辞書でない場合は文字列に変換
                 content.append(TextContent(type="text", text=str(result)))
 
-            return content
+            # ツールが返したエラー（"is_error"）をMCPのisErrorとして伝える
+            is_error = isinstance(result, dict) and bool(result.get("is_error"))
+            return CallToolResult(content=content, isError=is_error)
 
     # SDK MCPサーバー設定を返す
     return McpSdkServerConfig(type="sdk", name=name, instance=server)
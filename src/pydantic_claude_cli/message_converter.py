@@ -2,16 +2,23 @@
 
 from __future__ import annotations
 
+import base64
+from collections.abc import AsyncIterator, Sequence
 from typing import Any
 
 from claude_code_sdk.types import (
     AssistantMessage,
+    Message,
     TextBlock,
     ThinkingBlock,
     ToolResultBlock,
     ToolUseBlock,
+    UserMessage,
 )
 from pydantic_ai.messages import (
+    BinaryContent,
+    ImageUrl,
+    ModelMessagesTypeAdapter,
     ModelRequest,
     ModelResponse,
     SystemPromptPart,
@@ -21,10 +28,13 @@ from pydantic_ai.messages import (
     ToolReturnPart,
     UserPromptPart,
 )
-from pydantic_ai.usage import RequestUsage
+from pydantic_ai.usage import RequestUsage, RunUsage
 
 from .exceptions import MessageConversionError
 
+TRANSCRIPT_KEY = "transcript"
+"""Key in ``ModelResponse.provider_details`` holding the intermediate turns."""
+
 
 def convert_to_claude_prompt(messages: list[ModelRequest | ModelResponse]) -> str:
     """Convert Pydantic AI messages to a Claude SDK prompt.
@@ -64,6 +74,11 @@ def convert_to_claude_prompt(messages: list[ModelRequest | ModelResponse]) -> st
                         f"Tool-related message parts are not yet supported: {type(part).__name__}"
                     )
         elif isinstance(message, ModelResponse):
+            # Intermediate tool turns executed inside the CLI (include_transcript=True)
+            # precede the final text of the response they belong to.
+            transcript = (message.provider_details or {}).get(TRANSCRIPT_KEY)
+            if transcript:
+                prompt_parts.extend(_render_transcript(transcript))
             # Model responses in the history - extract text
             for part in message.parts:  # type: ignore[assignment]
                 if isinstance(part, TextPart):
@@ -75,21 +90,157 @@ def convert_to_claude_prompt(messages: list[ModelRequest | ModelResponse]) -> st
     return "\n\n".join(prompt_parts)
 
 
-def extract_system_prompt(messages: list[ModelRequest | ModelResponse]) -> str | None:
+def convert_to_claude_content_blocks(
+    messages: list[ModelRequest | ModelResponse],
+) -> list[dict[str, Any]]:
+    """Convert Pydantic AI messages to stream-json content blocks.
+
+    Unlike ``convert_to_claude_prompt``, every message is rendered to its own
+    content block(s) independently of the rest of the history, so the blocks
+    for earlier turns stay byte-identical as the conversation grows and the
+    backend prompt cache can reuse the prefix. User prompts are sent as-is;
+    assistant turns are wrapped in ``<assistant>`` tags because the CLI only
+    accepts user-role input messages. Images are sent as image blocks.
+
+    Args:
+        messages: List of Pydantic AI messages to convert.
+
+    Returns:
+        Content blocks for a single stream-json user message.
+
+    Raises:
+        MessageConversionError: If message conversion fails.
+    """
+    blocks: list[dict[str, Any]] = []
+
+    for message in messages:
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, SystemPromptPart):
+                    # System prompts are handled separately via ClaudeCodeOptions
+                    continue
+                elif isinstance(part, UserPromptPart):
+                    if isinstance(part.content, str):
+                        blocks.append(_text_block(part.content))
+                    else:
+                        blocks.extend(_user_content_blocks(part.content))
+                elif isinstance(part, (ToolReturnPart, ToolCallPart)):
+                    raise MessageConversionError(
+                        f"Tool-related message parts are not yet supported: {type(part).__name__}"
+                    )
+        elif isinstance(message, ModelResponse):
+            transcript = (message.provider_details or {}).get(TRANSCRIPT_KEY)
+            rendered = _render_transcript(transcript) if transcript else []
+            for part in message.parts:  # type: ignore[assignment]
+                if isinstance(part, TextPart):
+                    rendered.append(part.content)
+                elif isinstance(part, ThinkingPart):
+                    rendered.append(f"[Thinking: {part.content}]")
+            if rendered:
+                text = "\n\n".join(rendered)
+                blocks.append(_text_block(f"<assistant>\n{text}\n</assistant>"))
+
+    return blocks
+
+
+def _text_block(text: str) -> dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def _user_content_blocks(content: Sequence[Any]) -> list[dict[str, Any]]:
+    """Convert multimodal UserPromptPart content to content blocks."""
+    blocks: list[dict[str, Any]] = []
+    for item in content:
+        if isinstance(item, str):
+            blocks.append(_text_block(item))
+        elif isinstance(item, BinaryContent) and item.is_image:
+            blocks.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": item.media_type,
+                        "data": base64.b64encode(item.data).decode("ascii"),
+                    },
+                }
+            )
+        elif isinstance(item, ImageUrl):
+            blocks.append({"type": "image", "source": {"type": "url", "url": item.url}})
+        else:
+            raise MessageConversionError(
+                f"Unsupported content in UserPromptPart: {type(item).__name__}"
+            )
+    return blocks
+
+
+async def stream_user_message(
+    blocks: list[dict[str, Any]],
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield a single stream-json user message carrying the given blocks.
+
+    Args:
+        blocks: Content blocks from ``convert_to_claude_content_blocks``.
+
+    Yields:
+        The user message dict accepted by ``ClaudeSDKClient.query``.
+    """
+    yield {
+        "type": "user",
+        "message": {"role": "user", "content": blocks},
+        "parent_tool_use_id": None,
+    }
+
+
+def _render_transcript(transcript: Sequence[Any]) -> list[str]:
+    """Render intermediate tool turns as prompt context.
+
+    Args:
+        transcript: Messages stored under ``provider_details["transcript"]``.
+
+    Returns:
+        Prompt fragments describing the tool calls and their results.
+    """
+    rendered: list[str] = []
+    for message in _validate_transcript(transcript):
+        for part in message.parts:
+            if isinstance(part, TextPart):
+                rendered.append(f"Assistant: {part.content}")
+            elif isinstance(part, ToolCallPart):
+                rendered.append(
+                    f"[Tool call: {part.tool_name}({part.args_as_json_str()})]"
+                )
+            elif isinstance(part, ToolReturnPart):
+                rendered.append(
+                    f"[Tool result: {part.tool_name}] {part.model_response_str()}"
+                )
+    return rendered
+
+
+def extract_system_prompt(
+    messages: list[ModelRequest | ModelResponse], instructions: str | None = None
+) -> str | None:
     """Extract system prompt from messages.
 
+    All system prompt parts are joined in history order, followed by the
+    agent instructions. Static content therefore always comes first, which
+    keeps the start of the request stable for the backend prompt cache.
+
     Args:
         messages: List of Pydantic AI messages.
+        instructions: Optional agent instructions for the current request.
 
     Returns:
         System prompt string if found, None otherwise.
     """
+    sections: list[str] = []
     for message in messages:
         if isinstance(message, ModelRequest):
             for part in message.parts:
                 if isinstance(part, SystemPromptPart):
-                    return part.content
-    return None
+                    sections.append(part.content)
+    if instructions:
+        sections.append(instructions)
+    return "\n\n".join(sections) if sections else None
 
 
 def convert_from_claude_message(
@@ -107,9 +258,18 @@ def convert_from_claude_message(
     Raises:
         MessageConversionError: If message conversion fails.
     """
+    return ModelResponse(
+        parts=_convert_content_blocks(message.content),
+        model_name=model_name or message.model,
+        provider_name="claude-code-cli",
+    )
+
+
+def _convert_content_blocks(content: Sequence[Any]) -> list[Any]:
+    """Convert Claude SDK content blocks to Pydantic AI response parts."""
     parts: list[Any] = []  # 型を緩和（TextPart, ToolCallPart, ToolReturnPart等の混在）
 
-    for block in message.content:
+    for block in content:
         if isinstance(block, TextBlock):
             parts.append(TextPart(content=block.text))
         elif isinstance(block, ThinkingBlock):
@@ -149,31 +309,151 @@ def convert_from_claude_message(
         else:
             raise MessageConversionError(f"Unknown content block type: {type(block)}")
 
-    return ModelResponse(
-        parts=parts,
-        model_name=model_name or message.model,
-        provider_name="claude-code-cli",
+    return parts
+
+
+def convert_from_claude_messages(
+    messages: Sequence[Message], model_name: str | None = None
+) -> list[ModelRequest | ModelResponse]:
+    """Convert the full message stream of one CLI invocation in a single pass.
+
+    Consecutive AssistantMessages (the CLI emits one per content block) are
+    merged into a single ModelResponse, and tool results reported back to the
+    model via UserMessages become ModelRequests with ToolReturnParts whose
+    tool names are resolved from the preceding tool_use blocks.
+
+    Args:
+        messages: Messages received from the Claude SDK, in order.
+        model_name: Optional model name for the responses.
+
+    Returns:
+        Pydantic AI messages, ending with the final ModelResponse.
+
+    Raises:
+        MessageConversionError: If a content block cannot be converted.
+    """
+    history: list[ModelRequest | ModelResponse] = []
+    tool_names: dict[str, str] = {}
+    pending: list[Any] = []
+    pending_model: str | None = None
+
+    def flush() -> None:
+        if pending:
+            history.append(
+                ModelResponse(
+                    parts=list(pending),
+                    model_name=model_name or pending_model,
+                    provider_name="claude-code-cli",
+                )
+            )
+            pending.clear()
+
+    for message in messages:
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if isinstance(block, ToolUseBlock):
+                    tool_names[block.id] = block.name
+            pending.extend(_convert_content_blocks(message.content))
+            pending_model = message.model
+        elif isinstance(message, UserMessage):
+            if isinstance(message.content, str):
+                continue
+            request_parts: list[Any] = []
+            for block in message.content:
+                if isinstance(block, ToolResultBlock):
+                    request_parts.append(
+                        ToolReturnPart(
+                            tool_name=tool_names.get(block.tool_use_id, ""),
+                            content=_tool_result_text(block),
+                            tool_call_id=block.tool_use_id,
+                        )
+                    )
+                elif isinstance(block, TextBlock):
+                    request_parts.append(UserPromptPart(content=block.text))
+            if request_parts:
+                flush()
+                history.append(ModelRequest(parts=request_parts))
+
+    flush()
+    return history
+
+
+def _tool_result_text(block: ToolResultBlock) -> str:
+    """Flatten the content of a ToolResultBlock to text."""
+    if block.content is None:
+        return ""
+    if isinstance(block.content, str):
+        return block.content
+    return "\n".join(
+        str(item.get("text", "")) if isinstance(item, dict) else str(item)
+        for item in block.content
     )
 
 
+def _validate_transcript(
+    transcript: Sequence[Any],
+) -> list[ModelRequest | ModelResponse]:
+    """Return transcript messages, re-validating them if they were serialized."""
+    if all(isinstance(m, (ModelRequest, ModelResponse)) for m in transcript):
+        return list(transcript)
+    return ModelMessagesTypeAdapter.validate_python(transcript)
+
+
+def expand_transcript(
+    messages: Sequence[ModelRequest | ModelResponse],
+) -> list[ModelRequest | ModelResponse]:
+    """Expand a message history with the intermediate turns recorded by the CLI.
+
+    Responses produced with ``include_transcript=True`` carry the tool turns
+    the CLI executed internally in ``provider_details["transcript"]``. This
+    inserts them in front of the response they belong to, which is useful for
+    auditing. The original (unexpanded) history should be used for follow-up
+    runs; it already renders the transcript into the prompt.
+
+    Args:
+        messages: Message history, e.g. ``result.all_messages()``.
+
+    Returns:
+        A new list containing the intermediate turns inline.
+    """
+    expanded: list[ModelRequest | ModelResponse] = []
+    for message in messages:
+        if isinstance(message, ModelResponse):
+            transcript = (message.provider_details or {}).get(TRANSCRIPT_KEY)
+            if transcript:
+                expanded.extend(_validate_transcript(transcript))
+        expanded.append(message)
+    return expanded
+
+
 def extract_usage_from_result(result_data: dict[str, Any]) -> RequestUsage:
     """Extract usage information from Claude SDK result message.
 
+    Token counts follow the Pydantic AI convention for Anthropic models:
+    ``input_tokens`` includes the tokens written to and read from the prompt
+    cache, which are also reported separately.
+
     Args:
         result_data: Result message data from Claude SDK.
 
     Returns:
         RequestUsage object with extracted information.
     """
-    usage_dict = result_data.get("usage", {})
+    usage_dict = result_data.get("usage") or {}
 
     # Claude SDK provides usage in Anthropic format
     # Note: RequestUsageのパラメータ名が変更されました
-    input_tokens = usage_dict.get("input_tokens", 0)
-    output_tokens = usage_dict.get("output_tokens", 0)
+    cache_write_tokens = usage_dict.get("cache_creation_input_tokens") or 0
+    cache_read_tokens = usage_dict.get("cache_read_input_tokens") or 0
+    input_tokens = (
+        (usage_dict.get("input_tokens") or 0) + cache_write_tokens + cache_read_tokens
+    )
+    output_tokens = usage_dict.get("output_tokens") or 0
 
     return RequestUsage(
         input_tokens=input_tokens,
+        cache_write_tokens=cache_write_tokens,
+        cache_read_tokens=cache_read_tokens,
         output_tokens=output_tokens,
         # Additional details（intのみを含める）
         details={
@@ -182,3 +462,20 @@ def extract_usage_from_result(result_data: dict[str, Any]) -> RequestUsage:
             "num_turns": result_data.get("num_turns", 0),
         },
     )
+
+
+def cache_hit_rate(usage: RequestUsage | RunUsage) -> float:
+    """Return the share of input tokens that were read from the prompt cache.
+
+    Works for a single response (``RequestUsage``) as well as for a whole run
+    or any aggregate of runs (``RunUsage``).
+
+    Args:
+        usage: Usage with cache token accounting.
+
+    Returns:
+        ``cache_read_tokens / input_tokens``, or 0.0 if there was no input.
+    """
+    if not usage.input_tokens:
+        return 0.0
+    return usage.cache_read_tokens / usage.input_tokens
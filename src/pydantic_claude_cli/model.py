@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterable, Callable, Mapping
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar, cast
 
-from claude_code_sdk import ClaudeSDKClient
+import anyio
 from claude_code_sdk.types import (
     AssistantMessage,
-    ClaudeCodeOptions,
+    McpHttpServerConfig,
+    McpServerConfig,
     Message,
     ResultMessage,
     SystemMessage,
@@ -18,24 +21,51 @@ from claude_code_sdk.types import (
 from pydantic_ai import ModelProfile
 from pydantic_ai.messages import ModelMessage, ModelResponse
 from pydantic_ai.models import Model, ModelRequestParameters, ModelSettings
+from pydantic_ai.tools import ToolDefinition
 
 from .builtin_tools import ToolPreset
 from .exceptions import (
+    ClaudeCLINotFoundError,
     ClaudeCLIProcessError,
     MessageConversionError,
-    ClaudeCLINotFoundError,
 )
 from .message_converter import (
+    TRANSCRIPT_KEY,
     convert_from_claude_message,
+    convert_from_claude_messages,
+    convert_to_claude_content_blocks,
     convert_to_claude_prompt,
     extract_system_prompt,
     extract_usage_from_result,
+    stream_user_message,
 )
+from .options import ClaudeCodeCLIOptions
 from .provider import ClaudeCodeCLIProvider
+from .recording import MessageRecorder, MessageReplayer
+from .response_cache import ResponseCache, make_cache_key
+from .result_store import READ_RESULT_TOOL_NAME, ToolResultStore
+from .sdk_client import ClaudeCLIClient
+from .tool_options import ToolOptions
+from .tool_stats import ToolCallStats, ToolStatsRegistry
 
 # ロガーを設定
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+async def _run_cache_io(
+    cache: ResponseCache, func: Callable[..., _T], *args: Any
+) -> _T:
+    """Call a response cache method, off the event loop if it touches the disk tier.
+
+    The sqlite tier may wait up to its busy timeout while another process
+    holds the write lock, which would stall every task on the loop.
+    """
+    if cache.persistent:
+        return await anyio.to_thread.run_sync(func, *args)
+    return func(*args)
+
 
 @dataclass(init=False)
 class ClaudeCodeCLIModel(Model):
@@ -65,6 +95,7 @@ class ClaudeCodeCLIModel(Model):
 
     _model_name: str = field(repr=True)
     _provider: ClaudeCodeCLIProvider = field(repr=False)
+    _options_template: ClaudeCodeCLIOptions = field(repr=False)
     _cli_path: str | Path | None = field(default=None, repr=False)
     _max_turns: int | None = field(default=None, repr=False)
     _permission_mode: (
@@ -77,6 +108,19 @@ class ClaudeCodeCLIModel(Model):
     _tool_preset: ToolPreset | str | None = field(default=None, repr=False)
     _allowed_tools: list[str] | None = field(default=None, repr=False)
     _disallowed_tools: list[str] | None = field(default=None, repr=False)
+    _include_transcript: bool = field(default=False, repr=False)
+    _structured_input: bool = field(default=False, repr=False)
+    _response_cache: ResponseCache | None = field(default=None, repr=False)
+    _recorder: MessageRecorder | None = field(default=None, repr=False)
+    _replayer: MessageReplayer | None = field(default=None, repr=False)
+    _strict_mcp_config: bool = field(default=False, repr=False)
+    _max_tool_result_chars: int | None = field(default=None, repr=False)
+    _tool_options: Mapping[str, ToolOptions] = field(default_factory=dict, repr=False)
+    _tool_timeout: float | None = field(default=None, repr=False)
+    _shared_tool_server: str | None = field(default=None, repr=False)
+    _tool_stats: ToolStatsRegistry = field(
+        default_factory=ToolStatsRegistry, repr=False
+    )
 
     def __init__(
         self,
@@ -94,6 +138,16 @@ class ClaudeCodeCLIModel(Model):
         tool_preset: ToolPreset | str | None = None,
         allowed_tools: list[str] | None = None,
         disallowed_tools: list[str] | None = None,
+        include_transcript: bool = False,
+        structured_input: bool = False,
+        response_cache: ResponseCache | None = None,
+        recorder: MessageRecorder | None = None,
+        replayer: MessageReplayer | None = None,
+        strict_mcp_config: bool = False,
+        max_tool_result_chars: int | None = None,
+        tool_options: Mapping[str, ToolOptions] | None = None,
+        tool_timeout: float | None = None,
+        shared_tool_server: str | None = None,
     ):
         """Initialize Claude Code CLI model.
 
@@ -115,6 +169,54 @@ class ClaudeCodeCLIModel(Model):
                 Examples: ["Bash", "Write", "Edit"]
                 If both allowed_tools and disallowed_tools are specified,
                 disallowed_tools takes precedence (security first).
+            include_transcript: Keep the intermediate tool-use turns the CLI executed
+                internally. They are converted in the same pass as the final response
+                and stored in its ``provider_details["transcript"]``; follow-up runs
+                render them into the prompt without another CLI call, and
+                ``expand_transcript()`` inlines them into a history for auditing.
+            structured_input: Send the conversation as stream-json content blocks
+                (one block per turn, images as image blocks) instead of a single
+                flattened string. Earlier turns stay byte-identical across requests,
+                which allows backend prompt-cache hits.
+            response_cache: Exact-match cache consulted before running the CLI.
+                The key covers the model name, system prompt, converted prompt,
+                custom tool definitions, deps and the CLI options. Hits skip the
+                CLI entirely (including tool side effects) and report zero usage.
+            recorder: Append the raw CLI message stream of every request to a file.
+            replayer: Serve requests from a recording instead of starting the CLI.
+                Messages go through the same conversion path, and recorded MCP tool
+                calls are still executed against the custom tools.
+            strict_mcp_config: Only load the custom tools' MCP server, ignoring
+                MCP servers from the user's CLI configuration (which the CLI would
+                otherwise start on every request). Applied only when the provider's
+                ``capabilities`` report ``--strict-mcp-config`` support.
+            max_tool_result_chars: Custom tool text results longer than this are
+                written to a temporary file instead of the MCP response; the model
+                gets a preview plus a handle and reads slices through the
+                auto-registered ``read_tool_result`` tool. Files are removed when
+                the request ends. Defaults to ``None`` (spilling disabled);
+                ``100_000`` characters roughly matches the CLI's own limit on
+                MCP tool output.
+            tool_options: Per-tool execution options keyed by custom tool name,
+                e.g. ``{"search": ToolOptions(cache=ToolResultCache(ttl=60))}``
+                to memoize a read-only tool's results within and across runs.
+            tool_timeout: Default timeout in seconds for custom tool calls. A call
+                that exceeds it is cancelled (sync tools are abandoned in their
+                worker thread) and the model receives an error result. Overridden
+                per tool by ``ToolOptions.timeout``; ``None`` means no timeout.
+            shared_tool_server: URL of a shared custom tool server started with
+                ``tool_server.run_tool_server()`` (e.g. ``"http://127.0.0.1:8765/mcp"``).
+                The CLI calls the custom tools there instead of through a per-request
+                in-process server, so multi-worker deployments keep one copy of tool
+                state. Tool options, timeouts, result spilling and statistics are then
+                configured on the server; RunContext tools are not supported and, when
+                the agent toolsets are set, make the request raise ``ValueError``. If the
+                server spills results, also set ``max_tool_result_chars`` here so the
+                CLI is allowed to call ``read_tool_result``.
+
+        Raises:
+            ValueError: If ``max_tool_result_chars`` or ``tool_timeout`` is not
+                positive, or ``shared_tool_server`` is not an http(s) URL.
         """
         self._model_name = model_name
         self._cli_path = cli_path
@@ -124,6 +226,33 @@ class ClaudeCodeCLIModel(Model):
         self._tool_preset = tool_preset
         self._allowed_tools = allowed_tools
         self._disallowed_tools = disallowed_tools
+        self._include_transcript = include_transcript
+        self._structured_input = structured_input
+        self._response_cache = response_cache
+        self._recorder = recorder
+        self._replayer = replayer
+        self._strict_mcp_config = strict_mcp_config
+        if max_tool_result_chars is not None and max_tool_result_chars <= 0:
+            raise ValueError("max_tool_result_chars must be positive or None")
+        self._max_tool_result_chars = max_tool_result_chars
+        self._tool_options = dict(tool_options or {})
+        if tool_timeout is not None and tool_timeout <= 0:
+            raise ValueError("tool_timeout must be positive or None")
+        self._tool_timeout = tool_timeout
+        if shared_tool_server is not None and not shared_tool_server.startswith(
+            ("http://", "https://")
+        ):
+            raise ValueError("shared_tool_server must be an http(s) URL")
+        self._shared_tool_server = shared_tool_server
+        self._tool_stats = ToolStatsRegistry()
+        self._options_template = ClaudeCodeCLIOptions.from_settings(
+            model_name,
+            max_turns=max_turns,
+            permission_mode=permission_mode,
+            tool_preset=tool_preset,
+            allowed_tools=allowed_tools,
+            disallowed_tools=disallowed_tools,
+        )
 
         if isinstance(provider, str):
             if provider == "claude-code-cli":
@@ -164,77 +293,64 @@ class ClaudeCodeCLIModel(Model):
         """
         self._agent_toolsets = toolsets
 
+    def tool_stats(self, *, reset: bool = False) -> dict[str, ToolCallStats]:
+        """Snapshot of per-tool execution statistics of this model's custom tools.
+
+        Counts calls, errors, timeouts and cache hits, with a latency histogram
+        (``p50``/``p99``) and argument/result sizes. Pass the result to
+        ``tool_stats.format_prometheus()`` for the Prometheus text format.
+
+        Args:
+            reset: Clear the statistics after taking the snapshot.
+        """
+        return self._tool_stats.snapshot(reset=reset)
+
+    @property
+    def options_template(self) -> ClaudeCodeCLIOptions:
+        """The immutable CLI options precomputed from this model's settings."""
+        return self._options_template
+
     def _resolve_tools(
         self,
         custom_tool_names: list[str],
     ) -> tuple[list[str], list[str]]:
         """ツール設定を解決する
 
+        静的な部分（プリセット、許可/禁止ツール）はモデル作成時に
+        `ClaudeCodeCLIOptions`として計算済みで、ここではカスタムツール名をマージするだけです。
+
         Args:
             custom_tool_names: カスタムツール名のリスト（MCPツール名）
 
         Returns:
-            (final_allowed, final_disallowed): 最終的な許可/禁止ツールのリスト
+            (final_allowed, final_disallowed): 最終的な許可/禁止ツールのリスト（名前順）
+        """
+        allowed, disallowed = self._options_template.resolve_tools(custom_tool_names)
+        return list(allowed), list(disallowed)
 
-        Note:
-            優先順位: tool_preset → allowed_tools → disallowed_tools
-            - tool_presetがベースとなる
-            - allowed_toolsで追加/上書き
-            - disallowed_toolsで除外（最優先）
+    async def _extra_args(self) -> dict[str, str | None]:
+        """CLIが対応している追加フラグを決定する
+
+        CLIのバージョン・対応フラグはプロバイダーで1度だけ検出してキャッシュされるため、
+        未対応のフラグで起動して失敗する、といった試行錯誤は発生しません。
+        再生モードではCLIを使わないため検出しません。
         """
-        # Step 0: tool_presetから基本ツールリストを取得
-        preset_tools: list[str] = []
-        if self._tool_preset:
-            if isinstance(self._tool_preset, str):
-                preset = ToolPreset(self._tool_preset)
-            else:
-                preset = self._tool_preset
-            preset_tools = preset.get_allowed_tools()
-
-        allowed = self._allowed_tools
-        disallowed = self._disallowed_tools
-
-        # Step 1: ベースセットを決定
-        if allowed is not None:
-            # preset_tools + allowed_tools + custom_tools
-            base_allowed = list(set(preset_tools + allowed + custom_tool_names))
-        elif preset_tools:
-            # preset_tools + custom_tools
-            base_allowed = list(set(preset_tools + custom_tool_names))
-        elif custom_tool_names:
-            # カスタムツールのみ（デフォルト）
-            base_allowed = custom_tool_names
-        else:
-            # 何も許可しない（最もセキュア）
-            base_allowed = []
+        extra_args: dict[str, str | None] = {}
+        if not self._strict_mcp_config or self._replayer is not None:
+            return extra_args
 
-        # Step 2: disallowedで除外（セキュリティ優先）
-        if disallowed:
-            final_allowed = [t for t in base_allowed if t not in disallowed]
-            final_disallowed = disallowed
+        # 初回は--version/--helpを実行するため、イベントループを止めないようスレッドで検出
+        capabilities = await anyio.to_thread.run_sync(
+            lambda: self._provider.capabilities
+        )
+        if capabilities.supports("--strict-mcp-config"):
+            extra_args["strict-mcp-config"] = None
         else:
-            final_allowed = base_allowed
-            # カスタムツール使用時は組み込みツールをデフォルトで無効化
-            if custom_tool_names:
-                final_disallowed = [
-                    "Bash",
-                    "Read",
-                    "Write",
-                    "Edit",
-                    "Glob",
-                    "Grep",
-                    "WebFetch",
-                    "WebSearch",
-                    "Task",
-                ]
-                # ただしallowedで明示的に許可されたものは除外
-                final_disallowed = [
-                    t for t in final_disallowed if t not in final_allowed
-                ]
-            else:
-                final_disallowed = []
-
-        return final_allowed, final_disallowed
+            logger.debug(
+                "CLI %s does not support --strict-mcp-config; ignoring strict_mcp_config",
+                capabilities.version,
+            )
+        return extra_args
 
     async def request(
         self,
@@ -255,6 +371,8 @@ class ClaudeCodeCLIModel(Model):
         Raises:
             MessageConversionError: If message conversion fails.
             ClaudeCLIProcessError: If the CLI process fails.
+            ValueError: If a shared tool server is configured and a function tool
+                requires RunContext.
         """
         # Prepare settings
         model_settings, model_request_parameters = self.prepare_request(
@@ -262,17 +380,40 @@ class ClaudeCodeCLIModel(Model):
         )
 
         # カスタムツールサポート（Phase 1 + Milestone 3: 依存性サポート）
-        mcp_server = None
-        if model_request_parameters.function_tools:
-            from .tool_converter import create_mcp_from_tools
-            from .tool_support import extract_tools_from_agent
+        mcp_server: McpServerConfig | None = None
+        deps_json: str | None = None
+        deps_type_info: type | None = None
+        tools_with_funcs: list[tuple[ToolDefinition, Callable[..., Any]]] = []
+        result_store: ToolResultStore | None = None
+        # output_toolsはサポートしない
+        if (
+            model_request_parameters.function_tools
+            and model_request_parameters.output_tools
+        ):
+            raise MessageConversionError(
+                "Output tools are not supported with custom tools in ClaudeCodeCLIModel. "
+                "Please use only function tools (@agent.tool or @agent.tool_plain)."
+            )
 
-            # output_toolsはサポートしない
-            if model_request_parameters.output_tools:
-                raise MessageConversionError(
-                    "Output tools are not supported with custom tools in ClaudeCodeCLIModel. "
-                    "Please use only function tools (@agent.tool or @agent.tool_plain)."
-                )
+        if model_request_parameters.function_tools and self._shared_tool_server:
+            from .tool_support import find_tool_function, reject_run_context_tools
+
+            # 共有サーバーにはリクエストごとの依存性を渡せないため、サーバーの作成時と
+            # 同じくRunContextに依存するツールを拒否する（関数がわかる場合のみ確認できる）
+            agent_toolsets_list = (
+                [self._agent_toolsets] if self._agent_toolsets is not None else None
+            )
+            reject_run_context_tools(
+                (tool_def, func)
+                for tool_def in model_request_parameters.function_tools
+                if (func := find_tool_function(tool_def, agent_toolsets_list))
+                is not None
+            )
+            # ツールは共有サーバーのプロセスで実行する（ツール名は同じ）
+            logger.debug("Using shared tool server at %s", self._shared_tool_server)
+            mcp_server = McpHttpServerConfig(type="http", url=self._shared_tool_server)
+        elif model_request_parameters.function_tools:
+            from .tool_support import extract_tools_from_agent
 
             # ツールを抽出して検証
             # _agent_toolsetsがある場合は、リストとしてラップして渡す
@@ -282,10 +423,10 @@ class ClaudeCodeCLIModel(Model):
             tools_with_funcs, has_context_tools = extract_tools_from_agent(
                 model_request_parameters, agent_toolsets=agent_toolsets_list
             )
+            # ツール定義の順序を名前順に固定する（プロンプトキャッシュを効かせるため）
+            tools_with_funcs.sort(key=lambda pair: pair[0].name)
 
             # Milestone 3: 依存性サポート（実験的）
-            deps_json: str | None = None
-            deps_type_info: type | None = None
             if self._enable_experimental_deps and has_context_tools:
                 from .deps_context import get_current_deps_with_type
                 from .deps_support import is_serializable_deps, serialize_deps
@@ -349,54 +490,117 @@ class ClaudeCodeCLIModel(Model):
                     "Workaround 2: Enable experimental deps support with enable_experimental_deps=True (Milestone 3)."
                 )
 
-            # MCPサーバー作成（依存性を渡す）
-            if tools_with_funcs:
-                logger.info(
-                    "Creating MCP server for %d custom tools (deps: %s, type: %s)",
-                    len(tools_with_funcs),
-                    deps_json is not None,
-                    deps_type_info,
-                )
-                mcp_server = create_mcp_from_tools(
-                    tools_with_funcs, deps_data=deps_json, deps_type=deps_type_info
-                )
-                logger.debug("MCP server created successfully")
-
         # Convert messages
         try:
-            prompt = convert_to_claude_prompt(messages)
-            system_prompt = extract_system_prompt(messages)
+            prompt_content: str | list[dict[str, Any]]
+            prompt: str | AsyncIterable[dict[str, Any]]
+            if self._structured_input:
+                prompt_content = convert_to_claude_content_blocks(messages)
+                prompt = stream_user_message(prompt_content)
+            else:
+                prompt_content = prompt = convert_to_claude_prompt(messages)
+            system_prompt = extract_system_prompt(
+                messages, instructions=self._get_instructions(messages)
+            )
         except Exception as e:
             raise MessageConversionError(f"Failed to convert messages: {e}") from e
 
         # Prepare Claude Code options
         # カスタムツールの名前リストを作成（mcp_serverが存在する場合のみ）
         # MCPツールは "mcp__{server_name}__{tool_name}" の形式で参照される
+        # NOTE: MCPサーバーと退避先は、レスポンスキャッシュにヒットしなかった場合にだけ作成する
+        has_custom_tools = mcp_server is not None or bool(tools_with_funcs)
+        spill_results = (
+            bool(tools_with_funcs) and self._max_tool_result_chars is not None
+        )
         custom_tool_names: list[str] = []
-        if mcp_server is not None:
+        if has_custom_tools:
             mcp_server_name = "custom"
             # ツール名にプレフィックスを付ける
-            custom_tool_names = [
-                f"mcp__{mcp_server_name}__{tool.name}"
-                for tool in (model_request_parameters.function_tools or [])
+            tool_names = [
+                tool.name for tool in (model_request_parameters.function_tools or [])
             ]
+            # 共有サーバーでは退避はサーバー側で行うため、モデルにもmax_tool_result_charsを
+            # 指定した場合のみ読み出しツールを許可する（既定はどちらも退避しない）
+            if spill_results or (
+                self._shared_tool_server and self._max_tool_result_chars is not None
+            ):
+                tool_names.append(READ_RESULT_TOOL_NAME)
+            custom_tool_names = sorted(
+                f"mcp__{mcp_server_name}__{name}" for name in set(tool_names)
+            )
 
         # MCPツールの許可設定
         # MCPツールは "mcp__{server_name}__{tool_name}" の形式で参照される
         # _resolve_toolsを使ってユーザー設定を反映
         final_allowed, final_disallowed = self._resolve_tools(custom_tool_names)
 
-        options = ClaudeCodeOptions(
-            model=self._model_name,
+        cache_key: str | None = None
+        if self._response_cache is not None:
+            cache_key = make_cache_key(
+                model_name=self._model_name,
+                system_prompt=system_prompt,
+                prompt=prompt_content,
+                tools=model_request_parameters.function_tools
+                if has_custom_tools
+                else None,
+                settings={
+                    "max_turns": self._max_turns,
+                    "permission_mode": self._permission_mode,
+                    "allowed_tools": final_allowed,
+                    "disallowed_tools": final_disallowed,
+                    "include_transcript": self._include_transcript,
+                    "deps": deps_json,
+                    "strict_mcp_config": self._strict_mcp_config,
+                    "max_tool_result_chars": self._max_tool_result_chars,
+                    "shared_tool_server": self._shared_tool_server,
+                },
+            )
+            # キャッシュを読めない場合（ロック中・破損など）はミスとして扱う
+            try:
+                cached_response = await _run_cache_io(
+                    self._response_cache, self._response_cache.get, cache_key
+                )
+            except Exception as e:
+                logger.warning(
+                    "Response cache lookup failed, treating as a miss: %s", e
+                )
+                cached_response = None
+            if cached_response is not None:
+                logger.debug("Response cache hit (key: %s)", cache_key[:12])
+                return cached_response
+
+        # MCPサーバー作成（依存性を渡す）
+        if tools_with_funcs:
+            from .tool_converter import create_mcp_from_tools
+
+            logger.info(
+                "Creating MCP server for %d custom tools (deps: %s, type: %s)",
+                len(tools_with_funcs),
+                deps_json is not None,
+                deps_type_info,
+            )
+            if spill_results:
+                assert self._max_tool_result_chars is not None
+                result_store = ToolResultStore(self._max_tool_result_chars)
+            mcp_server = create_mcp_from_tools(
+                tools_with_funcs,
+                deps_data=deps_json,
+                deps_type=deps_type_info,
+                result_store=result_store,
+                tool_options=self._tool_options,
+                default_timeout=self._tool_timeout,
+                stats=self._tool_stats,
+            )
+            logger.debug("MCP server created successfully")
+
+        options = self._options_template.build(
             system_prompt=system_prompt,
-            max_turns=self._max_turns,
-            permission_mode=self._permission_mode,
             # MCPサーバー設定（カスタムツールがある場合のみ）
-            mcp_servers={"custom": mcp_server} if mcp_server else {},
-            # ユーザー設定 + カスタムツールを許可
-            allowed_tools=final_allowed,
-            # ユーザー設定に基づいて無効化
-            disallowed_tools=final_disallowed,
+            mcp_servers={"custom": mcp_server} if mcp_server else None,
+            # ユーザー設定 + カスタムツールを許可（禁止ツールはテンプレートで解決済み）
+            custom_tool_names=custom_tool_names,
+            extra_args=await self._extra_args(),
         )
 
         # MCPツールがある場合はClaudeSDKClientを使用、ない場合はquery()を使用
@@ -410,10 +614,21 @@ class ClaudeCodeCLIModel(Model):
             logger.debug(
                 "Using ClaudeSDKClient (always, for proper allowed_tools support)"
             )
-            async with ClaudeSDKClient(options=options) as client:
-                await client.query(prompt)
-                async for message in client.receive_response():
-                    response_messages.append(message)
+            # 退避した結果のファイルはCLIの実行が終わったら削除する
+            with result_store if result_store is not None else nullcontext():
+                async with ClaudeCLIClient(
+                    options=options,
+                    cli_path=self._provider.cli_path,
+                    transport=self._replayer.create_transport()
+                    if self._replayer is not None
+                    else None,
+                    transport_wrapper=self._recorder.wrap
+                    if self._recorder is not None
+                    else None,
+                ) as client:
+                    await client.query(prompt)
+                    async for message in client.receive_response():
+                        response_messages.append(message)
             logger.debug(
                 "Received %d messages from ClaudeSDKClient", len(response_messages)
             )
@@ -441,12 +656,28 @@ class ClaudeCodeCLIModel(Model):
                     "No assistant message received from Claude CLI"
                 )
 
-            # Convert the last assistant message to ModelResponse
-            # (in multi-turn conversations, there might be multiple)
-            last_assistant_message = assistant_messages[-1]
-            model_response = convert_from_claude_message(
-                last_assistant_message, self._model_name
-            )
+            if self._include_transcript:
+                # Convert every turn in one pass; the last one is the final response
+                transcript = convert_from_claude_messages(
+                    response_messages, self._model_name
+                )
+                # max_turnsで打ち切られた場合、末尾がツール結果のこともある
+                while transcript and not isinstance(transcript[-1], ModelResponse):
+                    transcript.pop()
+                if not transcript:
+                    raise ClaudeCLIProcessError(
+                        "No assistant message received from Claude CLI"
+                    )
+                model_response = cast(ModelResponse, transcript.pop())
+                if transcript:
+                    model_response.provider_details = {TRANSCRIPT_KEY: transcript}
+            else:
+                # Convert the last assistant message to ModelResponse
+                # (in multi-turn conversations, there might be multiple)
+                last_assistant_message = assistant_messages[-1]
+                model_response = convert_from_claude_message(
+                    last_assistant_message, self._model_name
+                )
 
             # Add usage information if available
             if result_message:
@@ -460,6 +691,12 @@ class ClaudeCodeCLIModel(Model):
                             "total_cost_usd": result_message.total_cost_usd,
                         }
                     )
+                    provider_details = model_response.provider_details
+                    if result_message.total_cost_usd is not None:
+                        provider_details = {
+                            **(provider_details or {}),
+                            "total_cost_usd": result_message.total_cost_usd,
+                        }
                     # Replace the default usage with extracted one
                     model_response = ModelResponse(
                         parts=model_response.parts,
@@ -467,6 +704,7 @@ class ClaudeCodeCLIModel(Model):
                         model_name=model_response.model_name,
                         timestamp=model_response.timestamp,
                         provider_name=model_response.provider_name,
+                        provider_details=provider_details,
                         finish_reason="stop"
                         if not result_message.is_error
                         else "error",
@@ -475,10 +713,23 @@ class ClaudeCodeCLIModel(Model):
                     # If usage extraction fails, continue with default usage
                     pass
 
-            return model_response
-
         except Exception as e:
             # Wrap any Claude SDK exceptions
             if "CLI not found" in str(e) or "claude: command not found" in str(e):
                 raise ClaudeCLINotFoundError() from e
             raise ClaudeCLIProcessError(f"Failed to query Claude CLI: {e}") from e
+
+        if cache_key is not None and model_response.finish_reason != "error":
+            assert self._response_cache is not None
+            # キャッシュへの書き込みに失敗しても、取得したレスポンスは返す
+            try:
+                await _run_cache_io(
+                    self._response_cache,
+                    self._response_cache.put,
+                    cache_key,
+                    model_response,
+                )
+            except Exception as e:
+                logger.warning("Failed to store response in cache: %s", e)
+
+        return model_response
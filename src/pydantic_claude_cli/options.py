@@ -0,0 +1,171 @@
+"""CLIオプションのテンプレート
+
+モデルの設定（モデル名、権限モード、ツールプリセット、許可/禁止ツールなど）から決まる
+`ClaudeCodeOptions`の静的な部分を、モデルの作成時に1度だけ計算して不変のテンプレートに
+します。リクエストごとには、システムプロンプト・MCPサーバー・カスタムツール名などの
+動的な部分だけをマージします。
+
+許可/禁止ツールのリストは常に名前順に並べるため、同じ設定からは同じオプション
+（CLIの引数）が生成されます。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from claude_code_sdk.types import ClaudeCodeOptions
+
+from .builtin_tools import ToolPreset
+
+__all__ = ("DEFAULT_DISALLOWED_TOOLS", "ClaudeCodeCLIOptions")
+
+DEFAULT_DISALLOWED_TOOLS: tuple[str, ...] = (
+    "Bash",
+    "Edit",
+    "Glob",
+    "Grep",
+    "Read",
+    "Task",
+    "WebFetch",
+    "WebSearch",
+    "Write",
+)
+"""カスタムツール使用時にデフォルトで無効化する組み込みツール（名前順）"""
+
+# カスタムツール名の組ごとの解決結果を保持する上限
+_MAX_RESOLVED = 128
+
+PermissionMode = Literal["default", "acceptEdits", "plan", "bypassPermissions"]
+
+
+@dataclass(frozen=True)
+class ClaudeCodeCLIOptions:
+    """モデル設定から事前計算した`ClaudeCodeOptions`のテンプレート
+
+    `from_settings()`で作成し、`build()`でリクエストごとのオプションを生成します。
+    """
+
+    model: str
+    max_turns: int | None = None
+    permission_mode: PermissionMode | None = None
+    base_allowed: frozenset[str] | None = None
+    """プリセット + allowed_tools（どちらも未指定ならNone）"""
+    disallowed: frozenset[str] = frozenset()
+    """ユーザーが指定した禁止ツール"""
+    _resolved: dict[tuple[str, ...], tuple[tuple[str, ...], tuple[str, ...]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_settings(
+        cls,
+        model: str,
+        *,
+        max_turns: int | None = None,
+        permission_mode: PermissionMode | None = None,
+        tool_preset: ToolPreset | str | None = None,
+        allowed_tools: Iterable[str] | None = None,
+        disallowed_tools: Iterable[str] | None = None,
+    ) -> ClaudeCodeCLIOptions:
+        """モデルの設定からテンプレートを作成する
+
+        優先順位: tool_preset → allowed_tools → disallowed_tools
+            - tool_presetがベースとなる
+            - allowed_toolsで追加/上書き
+            - disallowed_toolsで除外（最優先）
+        """
+        preset_tools: list[str] = []
+        if tool_preset:
+            preset_tools = ToolPreset(tool_preset).get_allowed_tools()
+
+        base_allowed: frozenset[str] | None = None
+        if allowed_tools is not None:
+            base_allowed = frozenset(preset_tools) | frozenset(allowed_tools)
+        elif preset_tools:
+            base_allowed = frozenset(preset_tools)
+
+        return cls(
+            model=model,
+            max_turns=max_turns,
+            permission_mode=permission_mode,
+            base_allowed=base_allowed,
+            disallowed=frozenset(disallowed_tools or ()),
+        )
+
+    def resolve_tools(
+        self, custom_tool_names: Iterable[str] = ()
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """許可/禁止ツールを解決する（どちらも名前順）
+
+        結果はカスタムツール名の組ごとに保持するため、同じツールを持つエージェントの
+        2回目以降のリクエストでは辞書の参照だけで済みます。
+
+        Args:
+            custom_tool_names: カスタムツール名（MCPツール名）
+
+        Returns:
+            (allowed, disallowed)
+        """
+        key = tuple(sorted(custom_tool_names))
+        cached = self._resolved.get(key)
+        if cached is not None:
+            return cached
+
+        if self.base_allowed is not None:
+            allowed = sorted(self.base_allowed.union(key))
+        else:
+            # カスタムツールのみ（何もなければ何も許可しない）
+            allowed = list(key)
+
+        disallowed: tuple[str, ...]
+        if self.disallowed:
+            # 禁止ツールを除外（セキュリティ優先）
+            allowed = [t for t in allowed if t not in self.disallowed]
+            disallowed = tuple(sorted(self.disallowed))
+        elif key:
+            # カスタムツール使用時は組み込みツールをデフォルトで無効化
+            # （ただし許可されたものは除外）
+            allowed_set = frozenset(allowed)
+            disallowed = tuple(
+                t for t in DEFAULT_DISALLOWED_TOOLS if t not in allowed_set
+            )
+        else:
+            disallowed = ()
+
+        result = (tuple(allowed), disallowed)
+        with self._lock:
+            if len(self._resolved) >= _MAX_RESOLVED:
+                self._resolved.clear()
+            self._resolved[key] = result
+        return result
+
+    def build(
+        self,
+        *,
+        system_prompt: str | None = None,
+        mcp_servers: Mapping[str, Any] | None = None,
+        custom_tool_names: Iterable[str] = (),
+        extra_args: Mapping[str, str | None] | None = None,
+    ) -> ClaudeCodeOptions:
+        """リクエストごとの値をマージして`ClaudeCodeOptions`を作成する
+
+        返すオプションのリスト・辞書は毎回新しく作成するため、呼び出し側（SDK）が
+        変更してもテンプレートには影響しません。
+        """
+        allowed, disallowed = self.resolve_tools(custom_tool_names)
+        return ClaudeCodeOptions(
+            model=self.model,
+            system_prompt=system_prompt,
+            max_turns=self.max_turns,
+            permission_mode=self.permission_mode,
+            mcp_servers=dict(mcp_servers or {}),
+            allowed_tools=list(allowed),
+            disallowed_tools=list(disallowed),
+            extra_args=dict(extra_args or {}),
+        )
@@ -2,14 +2,90 @@
 
 from __future__ import annotations
 
+import json
+import logging
+import os
 import shutil
+import stat
+import tempfile
+import threading
 from pathlib import Path
+from typing import Any
 
 from pydantic_ai import ModelProfile
 from pydantic_ai.providers import Provider
 
+from .capabilities import (
+    CLICapabilities,
+    cached_capabilities,
+    probe_cli_capabilities,
+    store_capabilities,
+)
 from .exceptions import ClaudeCLINotFoundError
 
+logger = logging.getLogger(__name__)
+
+DISCOVERY_CACHE_ENV = "PYDANTIC_CLAUDE_CLI_DISCOVERY_CACHE"
+"""Environment variable naming the default on-disk discovery cache file."""
+
+_DISCOVERY_CACHE_VERSION = 1
+
+# Process-wide cache of auto-discovered CLI paths:
+# (PATH, home) -> (path, st_ino, st_mtime_ns)
+_discovery_cache: dict[tuple[str, str], tuple[str, int, int]] = {}
+_discovery_lock = threading.Lock()
+
+
+def clear_discovery_cache() -> None:
+    """Clear the process-wide CLI discovery cache.
+
+    The on-disk cache, if any, is left untouched.
+    """
+    with _discovery_lock:
+        _discovery_cache.clear()
+
+
+def _fingerprint(path: str) -> tuple[int, int] | None:
+    """Return (inode, mtime) of a regular file, or None if it is not one."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def _read_disk_cache(cache_file: Path) -> dict[str, dict[str, Any]]:
+    """Read all sections of the on-disk cache ({} if missing or unreadable)."""
+    try:
+        data = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("v") != _DISCOVERY_CACHE_VERSION:
+        return {}
+    return {k: v for k, v in data.items() if k != "v" and isinstance(v, dict)}
+
+
+def _read_disk_entry(cache_file: Path, section: str, key: str) -> dict[str, Any] | None:
+    entry = _read_disk_cache(cache_file).get(section, {}).get(key)
+    return entry if isinstance(entry, dict) else None
+
+
+def _write_disk_entry(
+    cache_file: Path, section: str, key: str, entry: dict[str, Any]
+) -> None:
+    data = _read_disk_cache(cache_file)
+    data.setdefault(section, {})[key] = entry
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"v": _DISCOVERY_CACHE_VERSION, **data}, f)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        logger.debug("Failed to write CLI discovery cache %s: %s", cache_file, e)
+
 
 class ClaudeCodeCLIProvider(Provider[None]):
     """Provider for Claude Code CLI.
@@ -27,17 +103,78 @@ class ClaudeCodeCLIProvider(Provider[None]):
         ```
     """
 
-    def __init__(self, cli_path: str | Path | None = None):
+    def __init__(
+        self,
+        cli_path: str | Path | None = None,
+        *,
+        discovery_cache: str | Path | None = None,
+    ):
         """Initialize the Claude Code CLI provider.
 
+        Auto-discovered CLI paths are cached process-wide, keyed by ``PATH`` and
+        the home directory, so creating many providers (e.g. one model per
+        tenant) costs a single ``stat`` after the first. A cached path is
+        re-discovered when the binary's inode or mtime changes.
+
         Args:
             cli_path: Optional custom path to the Claude CLI executable.
                      If not provided, will search in standard locations.
+            discovery_cache: Optional JSON file that persists the discovered
+                path and the probed capabilities across processes. Defaults to
+                the file named by the ``PYDANTIC_CLAUDE_CLI_DISCOVERY_CACHE``
+                environment variable.
 
         Raises:
             ClaudeCLINotFoundError: If Claude CLI is not found on the system.
         """
-        self._cli_path = self._find_cli(cli_path)
+        if discovery_cache is None:
+            discovery_cache = os.environ.get(DISCOVERY_CACHE_ENV) or None
+        self._discovery_cache_file = (
+            Path(discovery_cache).expanduser() if discovery_cache else None
+        )
+        self._cli_path = self._find_cli(cli_path) if cli_path else self._discover_cli()
+
+    def _discover_cli(self) -> str:
+        """Find the CLI through the process-wide and on-disk caches.
+
+        Returns:
+            Path to the Claude CLI executable.
+
+        Raises:
+            ClaudeCLINotFoundError: If CLI is not found.
+        """
+        key = (os.environ.get("PATH", ""), str(Path.home()))
+        cached = _discovery_cache.get(key)
+        if cached is not None and _fingerprint(cached[0]) == cached[1:]:
+            return cached[0]
+
+        disk_key = json.dumps(key)
+        if self._discovery_cache_file is not None:
+            entry = _read_disk_entry(self._discovery_cache_file, "entries", disk_key)
+            if entry is not None:
+                path = str(entry.get("path"))
+                fingerprint = _fingerprint(path)
+                if fingerprint is not None and list(fingerprint) == [
+                    entry.get("ino"),
+                    entry.get("mtime_ns"),
+                ]:
+                    with _discovery_lock:
+                        _discovery_cache[key] = (path, *fingerprint)
+                    return path
+
+        path = self._find_cli(None)
+        fingerprint = _fingerprint(path)
+        if fingerprint is not None:
+            with _discovery_lock:
+                _discovery_cache[key] = (path, *fingerprint)
+            if self._discovery_cache_file is not None:
+                _write_disk_entry(
+                    self._discovery_cache_file,
+                    "entries",
+                    disk_key,
+                    {"path": path, "ino": fingerprint[0], "mtime_ns": fingerprint[1]},
+                )
+        return path
 
     def _find_cli(self, cli_path: str | Path | None) -> str:
         """Find Claude Code CLI binary.
@@ -79,6 +216,56 @@ class ClaudeCodeCLIProvider(Provider[None]):
         # CLI not found
         raise ClaudeCLINotFoundError()
 
+    @property
+    def cli_path(self) -> str:
+        """Path to the Claude CLI executable."""
+        return self._cli_path
+
+    @property
+    def capabilities(self) -> CLICapabilities:
+        """Version and supported flags of the CLI.
+
+        Probed with ``--version`` and ``--help`` on first access, then cached
+        process-wide (and in the ``discovery_cache`` file, if configured) keyed
+        by the binary's path, inode and mtime, so upgrading the CLI triggers a
+        new probe. A probe that could not run or timed out is not persisted and
+        is retried after ``FAILED_PROBE_TTL`` seconds.
+        """
+        fingerprint = _fingerprint(self._cli_path)
+        if fingerprint is None:
+            # Not a regular file we can fingerprint; probe without caching
+            return probe_cli_capabilities(self._cli_path)
+        if (cached := cached_capabilities(self._cli_path, fingerprint)) is not None:
+            return cached
+
+        if self._discovery_cache_file is not None:
+            entry = _read_disk_entry(
+                self._discovery_cache_file, "capabilities", self._cli_path
+            )
+            if entry is not None and [entry.get("ino"), entry.get("mtime_ns")] == list(
+                fingerprint
+            ):
+                capabilities = CLICapabilities.from_dict(entry)
+                store_capabilities(self._cli_path, fingerprint, capabilities)
+                return capabilities
+
+        capabilities = probe_cli_capabilities(self._cli_path, fingerprint=fingerprint)
+        # Only persist complete probes; a failed or timed-out probe is retried
+        if self._discovery_cache_file is not None and (
+            cached_capabilities(self._cli_path, fingerprint) is not None
+        ):
+            _write_disk_entry(
+                self._discovery_cache_file,
+                "capabilities",
+                self._cli_path,
+                {
+                    "ino": fingerprint[0],
+                    "mtime_ns": fingerprint[1],
+                    **capabilities.to_dict(),
+                },
+            )
+        return capabilities
+
     @property
     def name(self) -> str:
         """The provider name."""
@@ -0,0 +1,318 @@
+"""CLIメッセージストリームの記録と再生
+
+実際のCLIとのやり取り（Assistant/Result/Systemメッセージと、MCPツール呼び出しの
+control_request）をリクエスト単位でファイルに記録し、同じ`request`のコードパスに
+再生します。バックエンドに接続せずに、スタックの残りの部分をプロファイル・負荷試験できます。
+
+ファイル形式はJSON Lines（1行 = 1リクエスト）で、拡張子が`.gz`の場合はgzip圧縮します。
+各メッセージには直前のイベント（CLIの出力、またはSDKからの書き込み）からの経過秒数を保存します。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel, MessageRecorder, MessageReplayer
+
+    # 記録
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", recorder=MessageRecorder("run.jsonl.gz"))
+
+    # 再生（最大速度）
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", replayer=MessageReplayer("run.jsonl.gz"))
+
+    # 再生（記録時のタイミング）
+    replayer = MessageReplayer("run.jsonl.gz", realtime=True)
+    ```
+
+Note:
+    再生時もカスタムツールは実際に実行されます（記録されたcontrol_requestをSDKに渡し、
+    その応答を待ってから次のメッセージを送ります）。
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, cast
+
+import anyio
+from claude_code_sdk._internal.transport import Transport
+
+from .exceptions import ClaudeCLIProcessError
+
+__all__ = (
+    "MessageRecorder",
+    "MessageReplayer",
+    "Recording",
+    "RecordingTransport",
+    "ReplayTransport",
+)
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# ツール応答を待つ最大時間（秒）
+_CONTROL_RESPONSE_TIMEOUT = 60.0
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+@dataclass(frozen=True)
+class Recording:
+    """1リクエスト分の記録"""
+
+    messages: list[tuple[float, dict[str, Any]]]
+    """(直前のイベントからの経過秒数, CLIが出力した生メッセージ)のリスト"""
+
+    init: dict[str, Any] = field(default_factory=dict)
+    """initializeリクエストに対するCLIの応答"""
+
+    def to_json(self) -> str:
+        """1行のJSONにシリアライズする"""
+        return json.dumps(
+            {
+                "v": _FORMAT_VERSION,
+                "init": self.init,
+                "messages": [[round(dt, 4), msg] for dt, msg in self.messages],
+            },
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> Recording:
+        """JSONの1行から復元する"""
+        data = json.loads(line)
+        if data.get("v") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {data.get('v')}")
+        return cls(
+            messages=[(float(dt), msg) for dt, msg in data["messages"]],
+            init=data.get("init") or {},
+        )
+
+
+class MessageRecorder:
+    """CLIメッセージストリームをファイルに追記する
+
+    スレッドセーフです。複数のリクエストを同じファイルに記録できます。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """レコーダーを初期化する
+
+        Args:
+            path: 記録先ファイル（`.gz`で終わる場合はgzip圧縮）
+        """
+        self.path = Path(path)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, transport: Transport) -> Transport:
+        """トランスポートをラップして記録を開始する"""
+        return RecordingTransport(transport, self)
+
+    def save(self, recording: Recording) -> None:
+        """記録を1行追記する"""
+        line = recording.to_json()
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with _open(self.path, "a") as f:
+                f.write(line + "\n")
+            self.count += 1
+        logger.debug("Recorded %d messages to %s", len(recording.messages), self.path)
+
+
+class RecordingTransport(Transport):
+    """読み取ったメッセージを記録するトランスポート"""
+
+    def __init__(self, inner: Transport, recorder: MessageRecorder) -> None:
+        self._inner = inner
+        self._recorder = recorder
+        self._messages: list[tuple[float, dict[str, Any]]] = []
+        self._init: dict[str, Any] = {}
+        self._init_request_id: str | None = None
+        self._last_event: float | None = None
+
+    async def connect(self) -> None:
+        await self._inner.connect()
+
+    async def write(self, data: str) -> None:
+        message = json.loads(data)
+        if message.get("type") == "control_request":
+            if message.get("request", {}).get("subtype") == "initialize":
+                self._init_request_id = message.get("request_id")
+        elif message.get("type") == "user" or self._last_event is not None:
+            # ユーザーメッセージの送信から時間計測を開始する
+            self._last_event = time.monotonic()
+        await self._inner.write(data)
+
+    def read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        return self._read_messages()
+
+    async def _read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        async for message in self._inner.read_messages():
+            now = time.monotonic()
+            if message.get("type") == "control_response":
+                response = message.get("response", {})
+                if response.get("request_id") == self._init_request_id:
+                    self._init = response.get("response") or {}
+            else:
+                dt = now - self._last_event if self._last_event is not None else 0.0
+                self._messages.append((dt, message))
+                self._last_event = now
+            yield message
+
+    async def close(self) -> None:
+        await self._inner.close()
+        if self._messages:
+            recording = Recording(messages=self._messages, init=self._init)
+            self._messages = []
+            # gzip・JSONの書き込みはイベントループを止めないようワーカースレッドで行う
+            await anyio.to_thread.run_sync(self._recorder.save, recording)
+
+    def is_ready(self) -> bool:
+        return self._inner.is_ready()
+
+    async def end_input(self) -> None:
+        await self._inner.end_input()
+
+
+class MessageReplayer:
+    """記録ファイルからリクエストごとに再生用トランスポートを作成する
+
+    記録は先頭から順に使用し、`loop=True`の場合は末尾で先頭に戻ります。
+    スレッドセーフです。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        realtime: bool = False,
+        speed: float = 1.0,
+        loop: bool = True,
+    ) -> None:
+        """リプレイヤーを初期化する
+
+        Args:
+            path: MessageRecorderが作成した記録ファイル
+            realtime: Trueの場合、記録時のメッセージ間隔を再現する。Falseの場合は最大速度
+            speed: realtime時の再生速度倍率（2.0で2倍速）
+            loop: 記録を使い切ったときに先頭から繰り返すか
+
+        Raises:
+            ValueError: 記録が空、またはspeedが0以下の場合
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+
+        with _open(Path(path), "r") as f:
+            self.recordings = [Recording.from_json(line) for line in f if line.strip()]
+        if not self.recordings:
+            raise ValueError(f"No recordings found in {path}")
+
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def next_recording(self) -> Recording:
+        """次に再生する記録を取得する
+
+        Raises:
+            ClaudeCLIProcessError: loop=Falseで記録を使い切った場合
+        """
+        with self._lock:
+            if self._index >= len(self.recordings):
+                if not self.loop:
+                    raise ClaudeCLIProcessError("Replay recordings exhausted")
+                self._index = 0
+            recording = self.recordings[self._index]
+            self._index += 1
+        return recording
+
+    def create_transport(self) -> ReplayTransport:
+        """次の記録を再生するトランスポートを作成する"""
+        return ReplayTransport(
+            self.next_recording(),
+            delay_scale=1.0 / self.speed if self.realtime else 0.0,
+        )
+
+
+class ReplayTransport(Transport):
+    """記録されたメッセージをCLIの代わりに返すトランスポート
+
+    SDKからのcontrol_request（initialize等）には記録された応答を返し、
+    ユーザーメッセージを受け取ると記録を再生します。記録中のcontrol_request
+    （MCPツール呼び出し）はSDKの応答を待ってから次に進みます。
+    """
+
+    def __init__(self, recording: Recording, *, delay_scale: float = 0.0) -> None:
+        self._recording = recording
+        self._delay_scale = delay_scale
+        self._send, self._receive = anyio.create_memory_object_stream[dict[str, Any]](
+            max_buffer_size=math.inf
+        )
+        self._ready = False
+
+    async def connect(self) -> None:
+        self._ready = True
+
+    async def write(self, data: str) -> None:
+        self._send.send_nowait(json.loads(data))
+
+    def read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        return self._read_messages()
+
+    async def _read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        async for message in self._receive:
+            msg_type = message.get("type")
+            if msg_type == "control_request":
+                subtype = message.get("request", {}).get("subtype")
+                yield {
+                    "type": "control_response",
+                    "response": {
+                        "subtype": "success",
+                        "request_id": message.get("request_id"),
+                        "response": self._recording.init
+                        if subtype == "initialize"
+                        else {},
+                    },
+                }
+            elif msg_type == "user":
+                for dt, recorded in self._recording.messages:
+                    if self._delay_scale and dt > 0:
+                        await anyio.sleep(dt * self._delay_scale)
+                    yield recorded
+                    if recorded.get("type") == "control_request":
+                        await self._wait_for_response(recorded.get("request_id"))
+
+    async def _wait_for_response(self, request_id: str | None) -> None:
+        with anyio.fail_after(_CONTROL_RESPONSE_TIMEOUT):
+            async for message in self._receive:
+                if (
+                    message.get("type") == "control_response"
+                    and message.get("response", {}).get("request_id") == request_id
+                ):
+                    return
+
+    async def close(self) -> None:
+        self._ready = False
+        self._send.close()
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    async def end_input(self) -> None:
+        pass
@@ -0,0 +1,277 @@
+"""レスポンスキャッシュ（完全一致）
+
+同一のリクエスト（モデル名・システムプロンプト・プロンプト・ツール定義・CLI設定）に対して、
+CLIを再実行せずに前回のレスポンスを返します。分類や抽出など、決定的なワークロードで
+同じ入力を繰り返し処理する場合のCLI往復コストを削減します。
+
+メモリ上のLRUと、オプションのSQLiteディスク層の2段構成です。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel, ResponseCache
+
+    cache = ResponseCache(max_entries=512, ttl=3600, disk_path="~/.cache/pcc.sqlite")
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=cache)
+
+    # ... agent.run() を繰り返す ...
+    print(cache.stats.hit_rate)
+    ```
+
+Note:
+    キャッシュヒット時はCLIを実行しないため、CLI内部で実行されるツール（カスタムツール含む）の
+    副作用も発生しません。副作用のあるツールを使うエージェントでは有効にしないでください。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelResponse
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.usage import RequestUsage
+
+__all__ = (
+    "ResponseCache",
+    "ResponseCacheStats",
+    "make_cache_key",
+)
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# キーの形式を変更した場合はインクリメントする（古いディスクエントリを無効化）
+_KEY_VERSION = 1
+
+
+@dataclass
+class ResponseCacheStats:
+    """キャッシュのヒット/ミス統計"""
+
+    hits: int = 0
+    """ヒット数（メモリ層 + ディスク層）"""
+
+    disk_hits: int = 0
+    """ディスク層でのヒット数"""
+
+    misses: int = 0
+    """ミス数"""
+
+    evictions: int = 0
+    """LRUによりメモリ層から追い出されたエントリ数"""
+
+    expirations: int = 0
+    """TTL切れで破棄されたエントリ数"""
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率（0.0〜1.0）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_cache_key(
+    *,
+    model_name: str,
+    system_prompt: str | None,
+    prompt: str | list[dict[str, Any]],
+    tools: list[ToolDefinition] | None = None,
+    settings: dict[str, Any] | None = None,
+) -> str:
+    """リクエスト内容からキャッシュキーを生成する
+
+    Args:
+        model_name: モデル名
+        system_prompt: システムプロンプト
+        prompt: 変換済みプロンプト（文字列またはstream-jsonのコンテンツブロック）
+        tools: カスタムツール定義（名前・説明・スキーマがフィンガープリントになる）
+        settings: レスポンスに影響するCLI設定（max_turns、許可ツール、deps等）
+
+    Returns:
+        SHA-256の16進ダイジェスト
+    """
+    tool_fingerprint = sorted(
+        (
+            tool.name,
+            tool.description or "",
+            tool.parameters_json_schema,
+        )
+        for tool in tools or []
+    )
+    payload = {
+        "v": _KEY_VERSION,
+        "model": model_name,
+        "system": system_prompt,
+        "prompt": prompt,
+        "tools": tool_fingerprint,
+        "settings": settings or {},
+    }
+    data = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """完全一致のレスポンスキャッシュ
+
+    レスポンスはJSONにシリアライズして保持するため、取得したレスポンスを
+    呼び出し側が変更してもキャッシュには影響しません。
+    ヒット時のレスポンスは使用量（usage）が0になります（トークンを消費していないため）。
+
+    スレッドセーフです。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        *,
+        ttl: float | None = None,
+        disk_path: str | Path | None = None,
+    ) -> None:
+        """キャッシュを初期化する
+
+        Args:
+            max_entries: メモリ層の最大エントリ数（超えると最も古く使われたものを破棄）
+            ttl: エントリの有効期間（秒）。Noneの場合は無期限
+            disk_path: SQLiteファイルのパス。指定するとディスク層を有効化し、
+                プロセスをまたいでキャッシュを共有する
+
+        Raises:
+            ValueError: max_entriesが1未満、またはttlが0以下の場合
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+        if disk_path is not None:
+            path = Path(disk_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        """メモリ層のエントリ数"""
+        return len(self._entries)
+
+    @property
+    def persistent(self) -> bool:
+        """ディスク層（SQLite）が有効か
+
+        有効な場合、`get()`・`put()`はファイルを読み書きし、他のプロセスが書き込み中は
+        待機することがあるため、イベントループからはワーカースレッドで呼び出します。
+        """
+        return self._db is not None
+
+    def get(self, key: str) -> ModelResponse | None:
+        """キャッシュからレスポンスを取得する
+
+        Args:
+            key: make_cache_key()で生成したキー
+
+        Returns:
+            キャッシュされたレスポンス。存在しない・期限切れの場合はNone
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0], now):
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                data = entry[1]
+            else:
+                disk_entry = self._disk_get(key, now)
+                if disk_entry is None:
+                    self.stats.misses += 1
+                    return None
+                # ディスク層のヒットはメモリ層に昇格させる
+                self._memory_put(key, disk_entry)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                data = disk_entry[1]
+
+        response = ModelMessagesTypeAdapter.validate_json(data)[0]
+        assert isinstance(response, ModelResponse)
+        return replace(response, usage=RequestUsage())
+
+    def put(self, key: str, response: ModelResponse) -> None:
+        """レスポンスをキャッシュに保存する
+
+        Args:
+            key: make_cache_key()で生成したキー
+            response: 保存するレスポンス
+        """
+        entry = (time.time(), ModelMessagesTypeAdapter.dump_json([response]))
+        with self._lock:
+            self._memory_put(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, created, value) VALUES (?, ?, ?)",
+                    (key, entry[0], entry[1]),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """全エントリを削除する（ディスク層を含む）。統計はリセットしない"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        """ディスク層の接続を閉じる"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _memory_put(self, key: str, entry: tuple[float, bytes]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, bytes] | None:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT created, value FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[0], now):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self.stats.expirations += 1
+            return None
+        return row[0], row[1]
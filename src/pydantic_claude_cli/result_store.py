@@ -0,0 +1,325 @@
+"""大きなツール結果の退避とページ単位の読み出し
+
+ツールの戻り値（テキスト）が閾値を超える場合、全体をMCPの応答（=モデルのコンテキスト）に
+含めず一時ファイルに退避し、先頭のプレビューとハンドルだけを返します。モデルは自動登録される
+`read_tool_result`ツールで、必要な範囲だけをページ単位で読み出します。
+
+退避したファイルは文字位置の索引付きで保存するため、ページの読み出しはファイル全体ではなく
+該当範囲だけを読み込みます。ファイルはリクエストの終了時（`close()`）に削除されます。
+共有のツールサーバーのように長時間使用するストアでは、`max_results`・`ttl`で保持する結果を
+制限し、古いファイルをその都度削除します。
+退避は既定で無効で、`max_tool_result_chars`を指定した場合のみ行います。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel
+
+    # 50,000文字を超える結果を退避（既定のNoneでは退避しない）
+    model = ClaudeCodeCLIModel("claude-sonnet-4-5", max_tool_result_chars=50_000)
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+__all__ = (
+    "DEFAULT_MAX_RESULT_CHARS",
+    "READ_RESULT_TOOL_NAME",
+    "ToolResultStore",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESULT_CHARS = 100_000
+"""`ToolResultStore`の閾値の既定値（CLIのMCPツール出力の上限 約25,000トークンに相当）"""
+
+DEFAULT_PAGE_CHARS = 20_000
+"""`read_tool_result`で1度に読み出せる最大文字数の既定値"""
+
+PREVIEW_CHARS = 2_000
+"""退避した結果の代わりに返すプレビューの文字数"""
+
+READ_RESULT_TOOL_NAME = "read_tool_result"
+"""退避した結果を読み出すために自動登録されるツールの名前"""
+
+# 索引を作成する間隔（文字数）。ページの読み出しはこの単位でファイルをシークする
+_INDEX_STRIDE = 4096
+
+
+@dataclass(frozen=True)
+class _SpilledResult:
+    path: Path
+    length: int
+    """結果全体の文字数"""
+    offsets: tuple[int, ...]
+    """_INDEX_STRIDE文字ごとのバイト位置（末尾はファイルサイズ）"""
+    created_at: float
+    """退避した時刻（time.monotonic()）"""
+
+
+class ToolResultStore:
+    """大きなツール結果を一時ファイルに退避し、ページ単位で読み出すストア
+
+    1リクエスト（CLIの1回の実行）の間だけ使用し、終了時に`close()`で
+    ファイルを削除します。コンテキストマネージャーとしても使用できます。
+
+    複数のリクエストで共有する場合は、`max_results`（最近使用していない結果から削除）と
+    `ttl`で保持する結果を制限し、`private_handles=True`で他のリクエストの結果を
+    推測・列挙できないようにします。
+    """
+
+    def __init__(
+        self,
+        max_chars: int = DEFAULT_MAX_RESULT_CHARS,
+        *,
+        page_chars: int = DEFAULT_PAGE_CHARS,
+        directory: str | Path | None = None,
+        max_results: int | None = None,
+        ttl: float | None = None,
+        private_handles: bool = False,
+    ) -> None:
+        """ストアを初期化する
+
+        Args:
+            max_chars: この文字数を超えるテキスト結果を退避する
+            page_chars: 1度に読み出せる最大文字数
+            directory: 一時ディレクトリを作成する場所（Noneの場合はシステムの既定）
+            max_results: 保持する結果の最大数（超えた場合は最近使用していない結果の
+                ファイルを削除する。Noneで無制限）
+            ttl: 退避してから結果を保持する秒数（Noneで無期限）
+            private_handles: ハンドルに推測できない値を含め、存在しないハンドルを
+                指定された場合も他のハンドルを案内しない
+
+        Raises:
+            ValueError: max_chars・page_chars・max_results・ttlが正でない場合
+        """
+        if max_chars <= 0 or page_chars <= 0:
+            raise ValueError("max_chars and page_chars must be positive")
+        if max_results is not None and max_results <= 0:
+            raise ValueError("max_results must be positive or None")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive or None")
+        self.max_chars = max_chars
+        self.page_chars = page_chars
+        self.max_results = max_results
+        self.ttl = ttl
+        self.private_handles = private_handles
+        self._directory = directory
+        self._tmpdir: tempfile.TemporaryDirectory[str] | None = None
+        # 挿入順 = 最近使用していない順（読み出すと末尾に移動する）
+        self._results: dict[str, _SpilledResult] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> ToolResultStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def close(self) -> None:
+        """退避したファイルをすべて削除する"""
+        with self._lock:
+            self._results.clear()
+            if self._tmpdir is not None:
+                self._tmpdir.cleanup()
+                self._tmpdir = None
+
+    def _discard(self, handle: str) -> None:
+        """結果を削除する（ロックを取得して呼び出す）"""
+        spilled = self._results.pop(handle)
+        spilled.path.unlink(missing_ok=True)
+        logger.debug("Discarded stored tool result '%s'", handle)
+
+    def _evict(self, now: float, reserve: int = 0) -> None:
+        """期限切れの結果と、上限を超える古い結果を削除する（ロックを取得して呼び出す）"""
+        if self.ttl is not None:
+            for handle, spilled in list(self._results.items()):
+                if now - spilled.created_at >= self.ttl:
+                    self._discard(handle)
+        if self.max_results is not None:
+            while self._results and len(self._results) + reserve > self.max_results:
+                self._discard(next(iter(self._results)))
+
+    def _lookup(self, handle: str) -> _SpilledResult | None:
+        """期限内の結果を返し、最近使用した結果として末尾に移動する"""
+        with self._lock:
+            self._evict(time.monotonic())
+            spilled = self._results.pop(handle, None)
+            if spilled is not None:
+                self._results[handle] = spilled
+            return spilled
+
+    def spill(self, tool_name: str, text: str) -> str:
+        """テキストを一時ファイルに退避し、ハンドルを返す"""
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now, reserve=1)
+            if self._tmpdir is None:
+                # 退避が発生するまでディレクトリを作成しない
+                self._tmpdir = tempfile.TemporaryDirectory(
+                    prefix="pydantic-claude-cli-results-", dir=self._directory
+                )
+            # 削除した結果の番号は再利用しない
+            self._next_id += 1
+            handle = f"{tool_name}-{self._next_id}"
+            if self.private_handles:
+                handle += f"-{secrets.token_hex(8)}"
+            path = Path(self._tmpdir.name) / f"{self._next_id}.txt"
+
+            offsets = [0]
+            position = 0
+            with path.open("wb") as f:
+                for start in range(0, len(text), _INDEX_STRIDE):
+                    position += f.write(
+                        text[start : start + _INDEX_STRIDE].encode("utf-8")
+                    )
+                    offsets.append(position)
+
+            self._results[handle] = _SpilledResult(
+                path=path, length=len(text), offsets=tuple(offsets), created_at=now
+            )
+        logger.debug(
+            "Spilled %d characters from tool '%s' to %s", len(text), tool_name, path
+        )
+        return handle
+
+    def read(self, handle: str, offset: int = 0, limit: int | None = None) -> str:
+        """退避した結果のoffset文字目からlimit文字を読み出す
+
+        Raises:
+            KeyError: ハンドルが存在しない（削除された）場合
+        """
+        spilled = self._lookup(handle)
+        if spilled is None:
+            raise KeyError(handle)
+        limit = self.page_chars if limit is None else min(limit, self.page_chars)
+        start = max(offset, 0)
+        end = min(start + max(limit, 0), spilled.length)
+        if start >= end:
+            return ""
+
+        first_block = start // _INDEX_STRIDE
+        last_block = -(-end // _INDEX_STRIDE)  # 切り上げ
+        try:
+            with spilled.path.open("rb") as f:
+                f.seek(spilled.offsets[first_block])
+                data = f.read(
+                    spilled.offsets[last_block] - spilled.offsets[first_block]
+                )
+        except FileNotFoundError:
+            # 読み出しの間に他のスレッドが削除した
+            raise KeyError(handle) from None
+        base = first_block * _INDEX_STRIDE
+        return data.decode("utf-8")[start - base : end - base]
+
+    def read_page(self, handle: str, offset: int = 0, limit: int | None = None) -> str:
+        """`read_tool_result`ツールの応答（本文 + 位置の案内）を作成する"""
+        spilled = self._lookup(handle)
+        if spilled is None:
+            return self._unknown_handle(handle)
+        length = spilled.length
+        if offset >= length:
+            return (
+                f"[offset {offset} is past the end of the result ({length} "
+                f"characters); call {READ_RESULT_TOOL_NAME} with an offset "
+                f"below {length}]"
+            )
+        try:
+            text = self.read(handle, offset, limit)
+        except KeyError:
+            return self._unknown_handle(handle)
+        end = offset + len(text)
+        if end < length:
+            footer = (
+                f"[characters {offset}-{end} of {length}; call "
+                f"{READ_RESULT_TOOL_NAME} with offset={end} to continue]"
+            )
+        else:
+            footer = f"[characters {offset}-{end} of {length}; end of result]"
+        return f"{text}\n{footer}"
+
+    def _unknown_handle(self, handle: str) -> str:
+        if self.private_handles:
+            return f"Unknown or expired result handle '{handle}'."
+        with self._lock:
+            known = ", ".join(sorted(self._results)) or "none"
+        return f"Unknown result handle '{handle}'. Available handles: {known}."
+
+    def _spillable_text(self, result: dict[str, Any]) -> str | None:
+        content = result.get("content")
+        if result.get("is_error") or not isinstance(content, list) or len(content) != 1:
+            return None
+        (block,) = content
+        if not isinstance(block, dict) or block.get("type") != "text":
+            return None
+        text = block.get("text", "")
+        return text if len(text) > self.max_chars else None
+
+    def exceeds_limit(self, result: dict[str, Any]) -> bool:
+        """MCP形式の結果が退避の対象か（ファイルを読み書きせずに判定する）"""
+        return self._spillable_text(result) is not None
+
+    def maybe_spill(self, tool_name: str, result: dict[str, Any]) -> dict[str, Any]:
+        """MCP形式の結果のテキストが閾値を超える場合、退避してハンドルに置き換える
+
+        ファイルに書き込むため、イベントループからは`exceeds_limit()`で判定した上で
+        ワーカースレッドで呼び出します。
+        """
+        text = self._spillable_text(result)
+        if text is None:
+            return result
+
+        handle = self.spill(tool_name, text)
+        summary = (
+            f"The result of '{tool_name}' is too large to return directly "
+            f"({len(text)} characters) and was stored as handle '{handle}'.\n"
+            f"Call {READ_RESULT_TOOL_NAME}(handle='{handle}', offset=..., limit=...) "
+            f"to read only the parts you need (at most {self.page_chars} "
+            f"characters per call).\n"
+            f"First {PREVIEW_CHARS} characters:\n{text[:PREVIEW_CHARS]}"
+        )
+        return {"content": [{"type": "text", "text": summary}]}
+
+    def input_schema(self) -> dict[str, Any]:
+        """`read_tool_result`ツールのJSON Schema"""
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle of the stored result",
+                },
+                "offset": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "default": 0,
+                    "description": "Character offset to start reading from",
+                },
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": self.page_chars,
+                    "default": self.page_chars,
+                    "description": "Maximum number of characters to read",
+                },
+            },
+            "required": ["handle"],
+        }
@@ -0,0 +1,156 @@
+"""ClaudeSDKClientの拡張
+
+claude-code-sdkのClaudeSDKClientは、接続時に必ずSubprocessCLITransportを生成するため、
+トランスポートを差し替える手段がありません。このモジュールは接続処理だけを置き換えた
+サブクラスを提供し、記録/再生用のトランスポートを注入できるようにします。
+
+また、SDKのQueryはSDK MCPサーバーのtools/callの結果のうちテキストと画像だけをCLIに転送し、
+`isError`も失われるため、結果をそのまま転送するQueryを使用します。
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from claude_code_sdk import ClaudeSDKClient
+from claude_code_sdk._internal.query import Query
+from claude_code_sdk._internal.transport import Transport
+from claude_code_sdk._internal.transport.subprocess_cli import SubprocessCLITransport
+from claude_code_sdk.types import ClaudeCodeOptions
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+__all__ = ("ClaudeCLIClient", "TransportWrapper")
+
+TransportWrapper = Callable[[Transport], Transport]
+"""トランスポートを受け取り、ラップしたトランスポートを返す関数"""
+
+
+class _Query(Query):
+    """tools/callの結果（音声・埋め込みリソース・isErrorを含む）をそのまま返すQuery"""
+
+    async def _handle_sdk_mcp_request(
+        self, server_name: str, message: dict[str, Any]
+    ) -> dict[str, Any]:
+        server = self.sdk_mcp_servers.get(server_name)
+        handler = (
+            server.request_handlers.get(CallToolRequest) if server is not None else None
+        )
+        if message.get("method") != "tools/call" or handler is None:
+            return await super()._handle_sdk_mcp_request(server_name, message)
+
+        params = message.get("params", {})
+        try:
+            result = await handler(
+                CallToolRequest(
+                    method="tools/call",
+                    params=CallToolRequestParams(
+                        name=params.get("name"), arguments=params.get("arguments", {})
+                    ),
+                )
+            )
+        except Exception as e:
+            return {
+                "jsonrpc": "2.0",
+                "id": message.get("id"),
+                "error": {"code": -32603, "message": str(e)},
+            }
+        return {
+            "jsonrpc": "2.0",
+            "id": message.get("id"),
+            "result": result.root.model_dump(
+                mode="json", by_alias=True, exclude_none=True
+            ),
+        }
+
+
+class ClaudeCLIClient(ClaudeSDKClient):
+    """トランスポートを差し替え可能なClaudeSDKClient
+
+    Note:
+        connect()とSDK MCPサーバーのtools/callの結果の転送以外の挙動は親クラスと同一です。
+        claude-code-sdkの内部API（Query、Transport）に依存しています。
+    """
+
+    def __init__(
+        self,
+        options: ClaudeCodeOptions | None = None,
+        *,
+        cli_path: str | Path | None = None,
+        transport: Transport | None = None,
+        transport_wrapper: TransportWrapper | None = None,
+    ) -> None:
+        """クライアントを初期化する
+
+        Args:
+            options: CLIオプション
+            cli_path: CLI実行ファイルのパス。Noneの場合はSDKの検索ロジックに従う
+            transport: 使用するトランスポート。Noneの場合はCLIサブプロセスを起動する
+            transport_wrapper: トランスポートをラップする関数（記録用など）
+        """
+        super().__init__(options=options)
+        self._cli_path = cli_path
+        self._custom_transport = transport
+        self._transport_wrapper = transport_wrapper
+
+    async def connect(
+        self, prompt: str | AsyncIterable[dict[str, Any]] | None = None
+    ) -> None:
+        """CLIに接続する（ClaudeSDKClient.connectと同じ手順）"""
+
+        async def _empty_stream() -> AsyncIterator[dict[str, Any]]:
+            # 接続を開いたままにするための空ストリーム
+            return
+            yield {}  # type: ignore[unreachable]
+
+        actual_prompt = _empty_stream() if prompt is None else prompt
+
+        options = self.options
+        if options.can_use_tool:
+            if isinstance(prompt, str):
+                raise ValueError(
+                    "can_use_tool callback requires streaming mode. "
+                    "Please provide prompt as an AsyncIterable instead of a string."
+                )
+            if options.permission_prompt_tool_name:
+                raise ValueError(
+                    "can_use_tool callback cannot be used with permission_prompt_tool_name. "
+                    "Please use one or the other."
+                )
+            options = replace(options, permission_prompt_tool_name="stdio")
+
+        transport: Transport
+        if self._custom_transport is not None:
+            transport = self._custom_transport
+        else:
+            transport = SubprocessCLITransport(
+                prompt=actual_prompt, options=options, cli_path=self._cli_path
+            )
+        if self._transport_wrapper is not None:
+            transport = self._transport_wrapper(transport)
+        self._transport = transport
+        await transport.connect()
+
+        sdk_mcp_servers = {}
+        if self.options.mcp_servers and isinstance(self.options.mcp_servers, dict):
+            for name, config in self.options.mcp_servers.items():
+                if isinstance(config, dict) and config.get("type") == "sdk":
+                    sdk_mcp_servers[name] = config["instance"]  # type: ignore[typeddict-item]
+
+        self._query = _Query(
+            transport=transport,
+            is_streaming_mode=True,
+            can_use_tool=self.options.can_use_tool,
+            hooks=self._convert_hooks_to_internal_format(self.options.hooks)
+            if self.options.hooks
+            else None,
+            sdk_mcp_servers=sdk_mcp_servers,
+        )
+
+        await self._query.start()
+        await self._query.initialize()
+
+        if prompt is not None and isinstance(prompt, AsyncIterable) and self._query._tg:
+            self._query._tg.start_soon(self._query.stream_input, prompt)
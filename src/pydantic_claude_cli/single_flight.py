@@ -0,0 +1,112 @@
+"""同一のツール呼び出しの並行実行の集約（single-flight）
+
+多数のエージェントを並行実行すると、同じツールが同じ引数で同時に呼び出され
+（例: `get_exchange_rate("USD")`）、バックエンドに同じリクエストが集中します。
+`SingleFlight`は実行中の呼び出しとキーが一致する呼び出しを、新たに実行せずに
+実行中の呼び出しの完了を待って同じ結果を返します。
+
+プロセス全体で1つのインスタンス（`SINGLE_FLIGHT`）を共有するため、リクエストごとに
+作成されるMCPサーバーをまたいで集約されます。完了した結果は保持しません
+（保持したい場合は`ToolResultCache`を併用してください）。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+import anyio
+
+__all__ = ("SINGLE_FLIGHT", "SingleFlight", "SingleFlightStats")
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """集約の統計"""
+
+    executions: int = 0
+    """実際に実行した呼び出しの数"""
+
+    coalesced: int = 0
+    """実行中の呼び出しに集約された（実行しなかった）呼び出しの数"""
+
+
+@dataclass
+class _Flight(Generic[T]):
+    thread: int
+    done: anyio.Event = field(default_factory=anyio.Event)
+    result: T | None = None
+    error: BaseException | None = None
+    abandoned: bool = False
+    """実行していたタスクがキャンセルされた（待機側は自分で実行し直す）"""
+
+
+class SingleFlight:
+    """キーごとに実行中の呼び出しを1つに集約する
+
+    イベントループをまたいで待機することはできないため、集約は同じスレッド
+    （イベントループ）内の呼び出しに限られます。
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._flights: dict[Hashable, _Flight[Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """実行中の呼び出しの数"""
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """keyの呼び出しが実行中ならその結果を待ち、なければfnを実行する
+
+        Args:
+            key: 呼び出しを識別するキー
+            fn: 実行する関数
+
+        Returns:
+            fnの結果（集約された場合は実行中の呼び出しの結果）
+
+        Raises:
+            BaseException: fnが送出した例外（集約された呼び出しにも同じ例外を送出）
+        """
+        thread = threading.get_ident()
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None or flight.thread != thread:
+                    flight = _Flight(thread=thread)
+                    self._flights[key] = flight
+                    self.stats.executions += 1
+                    break
+                self.stats.coalesced += 1
+
+            await flight.done.wait()
+            if flight.abandoned:
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result  # type: ignore[return-value]
+
+        try:
+            flight.result = await fn()
+            return flight.result
+        except BaseException as e:
+            if isinstance(e, anyio.get_cancelled_exc_class()):
+                flight.abandoned = True
+            else:
+                flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+
+SINGLE_FLIGHT = SingleFlight()
+"""プロセス全体で共有するインスタンス（MCPツールのラッパーが使用）"""
@@ -0,0 +1,162 @@
+"""カスタムツールの結果のメモ化キャッシュ
+
+読み取り専用のツールは、モデルが同じ引数で何度も呼び出すことがあります（1回の実行内でも、
+実行をまたいでも）。`ToolResultCache`をツールのオプションに指定すると、正規化した引数
+（RunContextを使うツールでは依存性のフィンガープリントも含む）をキーに結果を保持し、
+2回目以降はツール関数を実行せずに返します。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel, ToolOptions, ToolResultCache
+
+    weather_cache = ToolResultCache(max_entries=128, ttl=300)
+    model = ClaudeCodeCLIModel(
+        "claude-haiku-4-5",
+        tool_options={"get_weather": ToolOptions(cache=weather_cache)},
+    )
+
+    # ... agent.run() を繰り返す ...
+    print(weather_cache.stats.hit_rate)
+    ```
+
+Note:
+    キャッシュヒット時はツール関数を実行しないため、副作用も発生しません。
+    結果が引数だけで決まるツールにのみ使用してください。エラー結果はキャッシュしません。
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+__all__ = (
+    "ToolCacheStats",
+    "ToolResultCache",
+    "make_tool_cache_key",
+)
+
+
+@dataclass
+class ToolCacheStats:
+    """キャッシュのヒット/ミス統計"""
+
+    hits: int = 0
+    """ヒット数"""
+
+    misses: int = 0
+    """ミス数"""
+
+    evictions: int = 0
+    """LRUにより追い出されたエントリ数"""
+
+    expirations: int = 0
+    """TTL切れで破棄されたエントリ数"""
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率（0.0〜1.0）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_tool_cache_key(
+    tool_name: str, args: dict[str, Any], deps_fingerprint: str | None = None
+) -> str:
+    """ツール名・引数・依存性からキャッシュキーを生成する
+
+    引数はJSONに変換してキーの順序を正規化するため、キーの順序が異なるだけの呼び出しや、
+    検証で同じ値に変換される引数（"5"と5など）は同じキーになります。
+
+    Args:
+        tool_name: ツール名
+        args: 検証済みの引数
+        deps_fingerprint: 依存性のフィンガープリント（シリアライズした依存性など）
+
+    Returns:
+        SHA-256の16進ダイジェスト
+    """
+    payload = {
+        "tool": tool_name,
+        "args": to_jsonable_python(args, fallback=repr),
+        "deps": deps_fingerprint,
+    }
+    data = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """ツール結果のLRU + TTLキャッシュ
+
+    MCP形式の結果（dict）を保持し、取得時はコピーを返すため、呼び出し側が結果を
+    変更してもキャッシュには影響しません。1つのキャッシュを複数のツールで共有できます
+    （キーにツール名を含むため）。
+
+    スレッドセーフです。
+    """
+
+    def __init__(self, max_entries: int = 256, *, ttl: float | None = None) -> None:
+        """キャッシュを初期化する
+
+        Args:
+            max_entries: 最大エントリ数（超えると最も古く使われたものを破棄）
+            ttl: エントリの有効期間（秒）。Noneの場合は無期限
+
+        Raises:
+            ValueError: max_entriesが1未満、またはttlが0以下の場合
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = ToolCacheStats()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """キャッシュから結果を取得する（存在しない・期限切れの場合はNone）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """結果をキャッシュに保存する"""
+        value = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """すべてのエントリを破棄する（統計は保持）"""
+        with self._lock:
+            self._entries.clear()
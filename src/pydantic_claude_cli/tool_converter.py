@@ -4,22 +4,47 @@
 claude_code_sdkのMCPツール形式に変換する機能を提供します。
 
 主な機能:
-- JSON SchemaからPython型の抽出
-- ツール実行結果のMCP形式への変換
+- JSON SchemaからPython型の抽出（ツール定義にはJSON Schemaをそのまま使用）
+- ツール実行結果のMCP形式への変換（JSON、画像・音声・バイナリ）
+- ツール引数の検証・変換（関数のシグネチャから作成したpydanticの検証器）
+- 大きな結果の退避とページ単位の読み出し（`read_tool_result`ツール）
+- ツールごとの実行オプション（結果のキャッシュ、同一呼び出しの集約、タイムアウト）
 - MCPサーバーの作成
 """
 
 from __future__ import annotations
 
+import base64
+import dataclasses
+import functools
 import inspect
 import logging
+import time
+from collections.abc import Awaitable, Mapping
 from typing import Any, Callable, cast
 
+import anyio
+from anyio.lowlevel import RunVar
+from claude_code_sdk import SdkMcpTool
 from claude_code_sdk import tool as sdk_tool
 from claude_code_sdk.types import McpSdkServerConfig
+from pydantic import ValidationError
+from pydantic_ai.messages import BinaryContent
 from pydantic_ai.tools import ToolDefinition
+from pydantic_core import to_json
 
 from .mcp_server_fixed import create_fixed_sdk_mcp_server
+from .result_store import READ_RESULT_TOOL_NAME, ToolResultStore
+from .single_flight import SINGLE_FLIGHT
+from .tool_cache import ToolResultCache, make_tool_cache_key
+from .tool_limits import ToolLimiter, get_tool_limiter
+from .tool_options import ToolOptions
+from .tool_stats import ToolStatsRegistry
+from .tool_validation import (
+    ArgsValidator,
+    format_validation_error,
+    get_args_validator,
+)
 
 # ロガーを設定
 logger = logging.getLogger(__name__)
@@ -76,9 +101,62 @@ def extract_python_types(json_schema: dict[str, Any]) -> dict[str, type]:
     return result
 
 
+_SCALAR_TYPES = (int, float, bool, type(None))
+
+_DEFAULT_OPTIONS = ToolOptions()
+
+# タイムアウトを適用する同期ツールを同時に実行するワーカースレッドの上限
+TOOL_THREAD_LIMIT = 40
+
+_tool_thread_limiter: RunVar[anyio.CapacityLimiter] = RunVar("_tool_thread_limiter")
+
+
+def _get_tool_thread_limiter() -> anyio.CapacityLimiter:
+    """同期ツール専用のCapacityLimiterを返す（イベントループごとに作成）
+
+    anyioの既定のリミッターは結果の退避やレスポンスキャッシュのファイルIOと共有するため、
+    ブロックしたツールがトークンを使い切ってそれらを待たせないよう、ツールは別枠で実行する。
+    """
+    try:
+        return _tool_thread_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(TOOL_THREAD_LIMIT)
+        _tool_thread_limiter.set(limiter)
+        return limiter
+
+
+def _binary_content_block(
+    data: Any, media_type: str, identifier: str
+) -> dict[str, Any]:
+    """バイナリをMCPのコンテンツブロック（image / audio / resource）に変換する
+
+    base64エンコードはMCPの形式上必要な1回だけ行い、bytes()などによる複製はしません
+    （bytearray・memoryviewもそのままエンコードします）。
+    """
+    encoded = base64.b64encode(data).decode("ascii")
+    if media_type.startswith("image/"):
+        return {"type": "image", "data": encoded, "mimeType": media_type}
+    if media_type.startswith("audio/"):
+        return {"type": "audio", "data": encoded, "mimeType": media_type}
+    return {
+        "type": "resource",
+        "resource": {
+            "uri": f"binary://{identifier}",
+            "mimeType": media_type,
+            "blob": encoded,
+        },
+    }
+
+
 def format_tool_result(result: Any) -> dict[str, Any]:
     """ツール実行結果をMCP形式に変換する
 
+    - 文字列・数値・真偽値・None: そのままテキスト（str()）
+    - `BinaryContent`: 画像・音声はimage/audio、それ以外は埋め込みリソース
+    - bytes・bytearray・memoryview: 埋め込みリソース（application/octet-stream）
+    - それ以外（Pydanticモデル、dataclass、リスト、辞書など）: pydanticのシリアライザーで
+      JSONに変換したテキスト（Pythonのreprではなく、構造を保ったままトークンも少ない）
+
     Args:
         result: ツールの戻り値
 
@@ -90,22 +168,46 @@ def format_tool_result(result: Any) -> dict[str, Any]:
         {'content': [{'type': 'text', 'text': 'Hello'}]}
         >>> format_tool_result(42)
         {'content': [{'type': 'text', 'text': '42'}]}
+        >>> format_tool_result({"items": [1, 2]})
+        {'content': [{'type': 'text', 'text': '{"items":[1,2]}'}]}
     """
     # 既にMCP形式の場合はそのまま返す
     if isinstance(result, dict) and "content" in result:
         return result
 
-    # 文字列に変換してMCP形式にする
-    text_content = str(result)
+    if isinstance(result, BinaryContent):
+        block = _binary_content_block(result.data, result.media_type, result.identifier)
+        return {"content": [block]}
+
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        block = _binary_content_block(result, "application/octet-stream", "result")
+        return {"content": [block]}
+
+    if isinstance(result, str):
+        text_content = result
+    elif isinstance(result, _SCALAR_TYPES):
+        text_content = str(result)
+    else:
+        # 変換できない値はstr()にフォールバック
+        text_content = to_json(result, fallback=str).decode()
 
     return {"content": [{"type": "text", "text": text_content}]}
 
 
-def _make_async(func: Callable[..., Any]) -> Callable[..., Any]:
+def _make_async(
+    func: Callable[..., Any], *, threaded: bool = False
+) -> Callable[..., Any]:
     """同期関数をasync関数でラップする
 
+    threaded=Trueの場合は関数をワーカースレッドで実行するため、タイムアウト時は
+    スレッドの完了を待たずに呼び出しを打ち切れます。スレッドの数はanyioの既定の
+    リミッターではなく専用のリミッター（TOOL_THREAD_LIMIT）で制限し、打ち切った
+    時点でトークンを返却します。Falseの場合はスレッドの切り替えのコストを避けるため、
+    イベントループ上で直接呼び出します。
+
     Args:
         func: 同期関数
+        threaded: ワーカースレッドで実行する（タイムアウトを適用するツール用）
 
     Returns:
         async関数
@@ -119,16 +221,98 @@ def _make_async(func: Callable[..., Any]) -> Callable[..., Any]:
         10
     """
 
+    if threaded:
+
+        async def threaded_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await anyio.to_thread.run_sync(
+                functools.partial(func, *args, **kwargs),
+                abandon_on_cancel=True,
+                limiter=_get_tool_thread_limiter(),
+            )
+
+        return threaded_wrapper
+
     async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
         return func(*args, **kwargs)
 
     return async_wrapper
 
 
+def _result_size(result: dict[str, Any]) -> int:
+    """MCP形式の結果のサイズ（テキストはUTF-8のバイト数、バイナリはbase64の長さ）"""
+    size = 0
+    for block in result.get("content") or ():
+        payload = block.get("resource", block) if isinstance(block, dict) else {}
+        text = payload.get("text")
+        if isinstance(text, str):
+            size += len(text) if text.isascii() else len(text.encode("utf-8"))
+        else:
+            size += len(payload.get("data") or payload.get("blob") or "")
+    return size
+
+
+def _instrument(
+    handler: Callable[[dict[str, Any]], Awaitable[dict[str, Any]]],
+    tool_name: str,
+    stats: ToolStatsRegistry,
+) -> Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]:
+    """ツールのハンドラーに呼び出し数・エラー数・レイテンシ・サイズの記録を追加する"""
+
+    async def instrumented(args: dict[str, Any]) -> dict[str, Any]:
+        start = time.perf_counter()
+        result: dict[str, Any] | None = None
+        try:
+            result = await handler(args)
+            return result
+        finally:
+            # キャンセルされた呼び出しはエラーとして記録する
+            stats.record_call(
+                tool_name,
+                time.perf_counter() - start,
+                error=result is None or bool(result.get("is_error")),
+                request_bytes=len(to_json(args, fallback=str)),
+                response_bytes=_result_size(result) if result is not None else 0,
+            )
+
+    return instrumented
+
+
+def _create_read_result_tool(store: ToolResultStore) -> SdkMcpTool[Any]:
+    """退避した結果をページ単位で読み出すツールを作成する"""
+
+    @sdk_tool(
+        READ_RESULT_TOOL_NAME,
+        "Read part of a large tool result that was stored under a handle "
+        "instead of being returned directly.",
+        store.input_schema(),
+    )
+    async def read_tool_result(args: dict[str, Any]) -> dict[str, Any]:
+        # ファイルの読み出しはイベントループを止めないようワーカースレッドで行う
+        text = await anyio.to_thread.run_sync(
+            store.read_page, args["handle"], args.get("offset", 0), args.get("limit")
+        )
+        return format_tool_result(text)
+
+    return read_tool_result
+
+
+async def _maybe_spill(
+    store: ToolResultStore, tool_name: str, result: dict[str, Any]
+) -> dict[str, Any]:
+    """大きな結果を退避する（ファイルへの書き込みはワーカースレッドで行う）"""
+    if not store.exceeds_limit(result):
+        return result
+    return await anyio.to_thread.run_sync(store.maybe_spill, tool_name, result)
+
+
 def create_mcp_from_tools(
     tools_with_funcs: list[tuple[ToolDefinition, Callable[..., Any]]],
     deps_data: str | None = None,
     deps_type: type | None = None,
+    result_store: ToolResultStore | None = None,
+    tool_options: Mapping[str, ToolOptions] | None = None,
+    default_timeout: float | None = None,
+    stats: ToolStatsRegistry | None = None,
 ) -> McpSdkServerConfig:
     """ツールリストからMCPサーバーを作成する（依存性サポート付き）
 
@@ -136,6 +320,11 @@ def create_mcp_from_tools(
         tools_with_funcs: (ToolDefinition, 実行関数)のペアリスト
         deps_data: シリアライズされた依存性（JSON文字列、Milestone 3）
         deps_type: 依存性の型（デシリアライズに使用）
+        result_store: 大きな結果の退避先。指定すると閾値を超えるテキスト結果を退避し、
+            読み出し用の`read_tool_result`ツールを登録する
+        tool_options: ツール名ごとの実行オプション（結果のキャッシュなど）
+        default_timeout: `ToolOptions.timeout`を指定していないツールのタイムアウト（秒）
+        stats: ツールごとの実行統計（呼び出し数、エラー数、レイテンシ、サイズなど）の記録先
 
     Returns:
         McpSdkServerConfig dict
@@ -163,14 +352,31 @@ def create_mcp_from_tools(
         RunContext依存ツールに対してEmulatedRunContextを提供します。
     """
     sdk_tools = []
+    # 引数をpydanticの検証器で検証・変換するツール（JSON Schemaでは検証しない）
+    validated_tools: list[str] = []
+
+    if result_store is not None and any(
+        tool_def.name == READ_RESULT_TOOL_NAME for tool_def, _ in tools_with_funcs
+    ):
+        logger.warning(
+            "A custom tool is named '%s'; large tool results will not be spilled",
+            READ_RESULT_TOOL_NAME,
+        )
+        result_store = None
 
     for tool_def, func in tools_with_funcs:
-        # JSON SchemaからPython型を抽出
-        input_schema = extract_python_types(tool_def.parameters_json_schema)
+        # JSON Schemaはそのまま渡す（enum、ネスト、デフォルト値、説明を保持）
+        # NOTE: 以前はextract_python_types()で型だけに縮約していたため、全パラメータが
+        # 必須になりenum等も失われて、モデルが不正な呼び出しを繰り返すことがあった
+        input_schema = tool_def.parameters_json_schema
+
+        options = (tool_options or {}).get(tool_def.name, _DEFAULT_OPTIONS)
+        timeout = options.timeout if options.timeout is not None else default_timeout
 
         # 同期関数をasyncでラップ
+        # （タイムアウトを適用する場合のみ、打ち切れるようワーカースレッドで実行する）
         if not inspect.iscoroutinefunction(func):
-            async_func = _make_async(func)
+            async_func = _make_async(func, threaded=timeout is not None)
         else:
             async_func = func
 
@@ -179,6 +385,19 @@ def create_mcp_from_tools(
 
         needs_context = requires_run_context(func)
 
+        # 引数の検証器（関数ごとにキャッシュされ、2回目以降は作成済みのものを使用）
+        args_validator = get_args_validator(func)
+        if args_validator is not None:
+            validated_tools.append(tool_def.name)
+
+        # 同時実行数・レートの制限（MCPサーバーをまたいで共有するため元の関数ごとに作成）
+        limiter = get_tool_limiter(
+            func,
+            options.max_concurrency,
+            options.rate_limit,
+            options.rate_burst,
+        )
+
         # SDK MCPツールを作成
         # NOTE: Pythonのクロージャの問題を回避するため、
         # デフォルト引数で関数を束縛する
@@ -189,40 +408,135 @@ def create_mcp_from_tools(
             _needs_ctx: bool = needs_context,
             _deps: str | None = deps_data,
             _deps_type: type | None = deps_type,
+            _validator: ArgsValidator | None = args_validator,
+            _name: str = tool_def.name,
+            _store: ToolResultStore | None = result_store,
+            _cache: ToolResultCache | None = options.cache,
+            _single_flight: bool = options.single_flight,
+            _origin: Callable[..., Any] = func,
+            _timeout: float | None = timeout,
+            _limiter: ToolLimiter | None = limiter,
         ) -> dict[str, Any]:
             """MCPツールのラッパー関数"""
-            try:
-                # Milestone 3: RunContext依存の場合はエミュレート
-                if _needs_ctx and _deps:
-                    from .deps_support import deserialize_deps
-                    from .emulated_run_context import EmulatedRunContext
-
-                    # 依存性をデシリアライズ（型情報を使用）
-                    deps_obj = deserialize_deps(_deps, deps_type=_deps_type)
-
-                    # EmulatedRunContextを作成
-                    ctx = EmulatedRunContext(deps=deps_obj)
-
-                    # ctxを渡して関数を実行
-                    result = await _func(ctx=ctx, **args)
-                else:
-                    # 通常のツール（依存性なし）
-                    result = await _func(**args)
+            if _validator is not None:
+                try:
+                    args = _validator.validate(args)
+                except ValidationError as e:
+                    # ツールを実行せず、モデルが修正できる短いメッセージを返す
+                    logger.debug("Invalid arguments for tool '%s': %s", _name, e)
+                    return {
+                        "content": [
+                            {"type": "text", "text": format_validation_error(_name, e)}
+                        ],
+                        "is_error": True,
+                    }
+
+            call_key: str | None = None
+            if _cache is not None or _single_flight:
+                # RunContext依存のツールは依存性が変われば結果も変わるためキーに含める
+                call_key = make_tool_cache_key(
+                    _name, args, deps_fingerprint=_deps if _needs_ctx else None
+                )
+            if _cache is not None:
+                assert call_key is not None
+                cached = _cache.get(call_key)
+                if cached is not None:
+                    logger.debug("Tool result cache hit for '%s'", _name)
+                    if stats is not None:
+                        stats.record_cache_hit(_name)
+                    return (
+                        await _maybe_spill(_store, _name, cached) if _store else cached
+                    )
+
+            async def execute() -> dict[str, Any]:
+                try:
+                    # タイムアウトした場合はツールのコルーチンをキャンセルする
+                    # （同期関数はワーカースレッドの完了を待たずに打ち切る）
+                    with anyio.move_on_after(_timeout) as scope:
+                        # Milestone 3: RunContext依存の場合はエミュレート
+                        if _needs_ctx and _deps:
+                            from .deps_support import deserialize_deps
+                            from .emulated_run_context import EmulatedRunContext
+
+                            # 依存性をデシリアライズ（型情報を使用）
+                            deps_obj = deserialize_deps(_deps, deps_type=_deps_type)
+
+                            # EmulatedRunContextを作成
+                            ctx = EmulatedRunContext(deps=deps_obj)
+
+                            # ctxを渡して関数を実行
+                            result = await _func(ctx=ctx, **args)
+                        else:
+                            # 通常のツール（依存性なし）
+                            result = await _func(**args)
+                except Exception as e:
+                    # エラーをMCP形式で返す
+                    logger.error("Tool execution error: %s", e, exc_info=True)
+                    return {
+                        "content": [
+                            {"type": "text", "text": f"Tool execution error: {str(e)}"}
+                        ],
+                        "is_error": True,
+                    }
+
+                if scope.cancelled_caught:
+                    logger.warning("Tool '%s' timed out after %ss", _name, _timeout)
+                    if stats is not None:
+                        stats.record_timeout(_name)
+                    return {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": f"Tool '{_name}' timed out after "
+                                f"{_timeout:g} seconds and was cancelled.",
+                            }
+                        ],
+                        "is_error": True,
+                    }
 
                 # 結果をMCP形式に変換
-                return format_tool_result(result)
-            except Exception as e:
-                # エラーをMCP形式で返す
-                logger.error("Tool execution error: %s", e, exc_info=True)
-                return {
-                    "content": [
-                        {"type": "text", "text": f"Tool execution error: {str(e)}"}
-                    ],
-                    "is_error": True,
-                }
-
+                formatted = format_tool_result(result)
+                if _cache is not None and not formatted.get("is_error"):
+                    assert call_key is not None
+                    _cache.put(call_key, formatted)
+                return formatted
+
+            async def limited() -> dict[str, Any]:
+                # 制限を超える呼び出しはエラーにせず、実行できるまで待機する
+                # （待機時間はタイムアウトに含めない）
+                assert _limiter is not None
+                async with _limiter.acquire():
+                    return await execute()
+
+            run = limited if _limiter is not None else execute
+            if _single_flight:
+                # 同じ関数・引数の実行中の呼び出しがあれば、その結果を共有する
+                # （MCPサーバーをまたいで集約するため、キーには元の関数自体を含める）
+                assert call_key is not None
+                formatted = await SINGLE_FLIGHT.do((_origin, call_key), run)
+            else:
+                formatted = await run()
+
+            # 大きな結果は退避してハンドルに置き換える（元の結果は変更しない）
+            if _store is not None:
+                formatted = await _maybe_spill(_store, _name, formatted)
+            return formatted
+
+        if stats is not None:
+            wrapped = dataclasses.replace(
+                wrapped, handler=_instrument(wrapped.handler, tool_def.name, stats)
+            )
         sdk_tools.append(wrapped)
 
+    if result_store is not None:
+        read_tool = _create_read_result_tool(result_store)
+        if stats is not None:
+            read_tool = dataclasses.replace(
+                read_tool,
+                handler=_instrument(read_tool.handler, READ_RESULT_TOOL_NAME, stats),
+            )
+        sdk_tools.append(read_tool)
+
     # MCPサーバー作成
     # NOTE: 修正版create_fixed_sdk_mcp_server()を使用
     # claude-code-sdkの既知のバグ（Issue #6710）を回避
@@ -231,7 +545,11 @@ def create_mcp_from_tools(
     )
 
     server = create_fixed_sdk_mcp_server(
-        name="pydantic-custom-tools", version="1.0.0", tools=sdk_tools
+        name="pydantic-custom-tools",
+        version="1.0.0",
+        tools=sdk_tools,
+        validated_tools=validated_tools,
+        stats=stats,
     )
 
     logger.info(
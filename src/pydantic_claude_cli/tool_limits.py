@@ -0,0 +1,176 @@
+"""カスタムツールの同時実行数とレートの制限
+
+レート制限のあるAPIを呼び出すツールでは、多数のエージェントを並行実行すると
+上流で429などのエラーになります。`ToolOptions`の`max_concurrency`・`rate_limit`を
+指定したツールは、制限を超える呼び出しをエラーにせず、実行できるまで待機させます。
+
+制限はツール関数と設定の組ごとにプロセス全体で1つ作成し、リクエストごとに
+作成されるMCPサーバー（並行するエージェントの実行）をまたいで共有します。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel, ToolOptions
+
+    model = ClaudeCodeCLIModel(
+        "claude-haiku-4-5",
+        # 同時に2件まで、毎秒5回まで（最大10回のバースト）
+        tool_options={
+            "search_api": ToolOptions(max_concurrency=2, rate_limit=5, rate_burst=10)
+        },
+    )
+    ```
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import anyio
+
+__all__ = ("TokenBucket", "ToolLimiter", "get_tool_limiter")
+
+# 関数 -> {(max_concurrency, rate_limit, rate_burst): 制限}
+_limiters: weakref.WeakKeyDictionary[
+    Callable[..., Any], dict[tuple[int | None, float | None, int], ToolLimiter]
+] = weakref.WeakKeyDictionary()
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """トークンバケットによるレート制限
+
+    毎秒`rate`個のトークンが最大`burst`個まで貯まり、1回の呼び出しで1個を消費します。
+    トークンが足りない場合は先に予約してから補充を待つため、待機中の呼び出しは
+    到着順に実行されます。スレッドセーフです。
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """バケットを初期化する（満杯の状態から開始）
+
+        Raises:
+            ValueError: rate・burstが正でない場合
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """トークンを1個予約し、使用できるまでの待ち時間（秒）を返す"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """使用しなかった予約を返却する"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    async def acquire(self) -> None:
+        """トークンを1個取得する（足りない場合は補充まで待機）"""
+        delay = self.reserve()
+        if delay <= 0:
+            return
+        try:
+            await anyio.sleep(delay)
+        except BaseException:
+            # キャンセルされた呼び出しの分を後続の呼び出しに回す
+            self.refund()
+            raise
+
+
+class ToolLimiter:
+    """1つのツールの同時実行数とレートの制限
+
+    同時実行数の待機はイベントループ内でのみ共有されるため、複数のスレッドで
+    別々のイベントループを実行する場合は同じスレッドの呼び出しに限られます
+    （レート制限はスレッドをまたいで共有されます）。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        rate_limit: float | None = None,
+        *,
+        rate_burst: int = 1,
+    ) -> None:
+        """制限を初期化する
+
+        Args:
+            max_concurrency: 同時に実行できる呼び出しの数（Noneの場合は無制限）
+            rate_limit: 1秒あたりの呼び出し回数（Noneの場合は無制限）
+            rate_burst: 待機せずに連続して実行できる呼び出しの数
+        """
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self._concurrency = (
+            anyio.CapacityLimiter(max_concurrency)
+            if max_concurrency is not None
+            else None
+        )
+        self._bucket = (
+            TokenBucket(rate_limit, rate_burst) if rate_limit is not None else None
+        )
+
+    @property
+    def waiting(self) -> int:
+        """同時実行数の空きを待っている呼び出しの数"""
+        return self._concurrency.statistics().tasks_waiting if self._concurrency else 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """制限内で実行できるまで待機し、ブロックの間は実行枠を保持する"""
+        # 同じタスクが複数の呼び出しを実行することがあるため、呼び出しごとに借り手を作る
+        borrower = object()
+        if self._concurrency is not None:
+            await self._concurrency.acquire_on_behalf_of(borrower)
+        try:
+            # 実行枠を確保してからトークンを取得する（待機中にトークンを消費しない）
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            yield
+        finally:
+            if self._concurrency is not None:
+                self._concurrency.release_on_behalf_of(borrower)
+
+
+def get_tool_limiter(
+    func: Callable[..., Any],
+    max_concurrency: int | None,
+    rate_limit: float | None,
+    rate_burst: int = 1,
+) -> ToolLimiter | None:
+    """ツール関数と設定の組ごとにプロセス全体で共有する制限を返す
+
+    Returns:
+        ToolLimiter、または制限を指定していない場合はNone
+    """
+    if max_concurrency is None and rate_limit is None:
+        return None
+
+    settings = (max_concurrency, rate_limit, rate_burst)
+    with _limiters_lock:
+        try:
+            per_func = _limiters.setdefault(func, {})
+        except TypeError:
+            # 弱参照を作成できない呼び出し可能オブジェクトは共有しない
+            per_func = {}
+        limiter = per_func.get(settings)
+        if limiter is None:
+            limiter = per_func[settings] = ToolLimiter(
+                max_concurrency, rate_limit, rate_burst=rate_burst
+            )
+    return limiter
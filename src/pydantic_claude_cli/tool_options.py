@@ -0,0 +1,60 @@
+"""カスタムツールごとの実行オプション
+
+pydantic-aiのツールデコレーター（`@agent.tool_plain`など）には独自の引数を追加できないため、
+`ClaudeCodeCLIModel`の`tool_options`でツール名ごとに指定します。
+
+Example:
+    ```python
+    from pydantic_claude_cli import ClaudeCodeCLIModel, ToolOptions, ToolResultCache
+
+    model = ClaudeCodeCLIModel(
+        "claude-haiku-4-5",
+        tool_options={"search": ToolOptions(cache=ToolResultCache(ttl=60))},
+    )
+    ```
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .tool_cache import ToolResultCache
+
+__all__ = ("ToolOptions",)
+
+
+@dataclass(frozen=True)
+class ToolOptions:
+    """カスタムツールの実行オプション"""
+
+    cache: ToolResultCache | None = None
+    """結果のメモ化キャッシュ（Noneの場合はキャッシュしない）"""
+
+    single_flight: bool = False
+    """同じ引数で並行して呼び出された場合に1回だけ実行し、結果を共有する
+    （プロセス内のすべてのMCPサーバーで集約。副作用のあるツールには使用しない）"""
+
+    timeout: float | None = None
+    """タイムアウト（秒）。超えるとツールをキャンセルしてエラー結果を返す
+    （Noneの場合はモデルの`tool_timeout`）"""
+
+    max_concurrency: int | None = None
+    """同時に実行できる呼び出しの数。超えた呼び出しは空きが出るまで待機する
+    （プロセス内のすべてのMCPサーバーで共有）"""
+
+    rate_limit: float | None = None
+    """1秒あたりの呼び出し回数の上限。超えた呼び出しは待機する
+    （プロセス内のすべてのMCPサーバーで共有）"""
+
+    rate_burst: int = 1
+    """`rate_limit`を指定した場合に、待機せずに連続して実行できる呼び出しの数"""
+
+    def __post_init__(self) -> None:
+        if self.timeout is not None and self.timeout <= 0:
+            raise ValueError("timeout must be positive")
+        if self.max_concurrency is not None and self.max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if self.rate_limit is not None and self.rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        if self.rate_burst <= 0:
+            raise ValueError("rate_burst must be positive")
@@ -0,0 +1,257 @@
+"""複数プロセスで共有するカスタムツールのMCPサーバー
+
+通常、カスタムツールはリクエストごとにプロセス内のSDK MCPサーバーとして登録されます。
+gunicorn/uvicornのマルチワーカー構成では、ワーカーごとにツールの状態
+（`ToolResultCache`、同時実行数・レートの制限、接続プールなど）が重複するため、
+ツールを1つのプロセスでMCPサーバー（Streamable HTTP）として公開し、すべてのワーカーの
+CLIがそこに接続するようにできます。
+
+サーバーに認証はありません。既定では`127.0.0.1`で待ち受け、ループバック以外のアドレスでの
+待ち受けは`allow_remote=True`を指定した場合のみ許可します（信頼できるネットワーク内で、
+ファイアウォールなどで接続元を制限して使用してください）。
+
+ツール名は`create_mcp_from_tools()`と同じ（CLIからは`mcp__custom__<ツール名>`）で、
+引数の検証・結果の変換・`ToolOptions`も同じラッパーで処理されます。
+
+Example:
+    ```python
+    # tool_server.py（1プロセスで起動）
+    from pydantic_claude_cli.tool_server import run_tool_server
+    from myapp.agent import agent
+
+    run_tool_server(agent, port=8765)
+    ```
+
+    ```python
+    # 各ワーカー
+    model = ClaudeCodeCLIModel(
+        "claude-haiku-4-5", shared_tool_server="http://127.0.0.1:8765/mcp"
+    )
+    ```
+"""
+
+from __future__ import annotations
+
+import functools
+import ipaddress
+import logging
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any
+
+import anyio
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from pydantic_ai import Agent
+from pydantic_ai.tools import ToolDefinition
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from .result_store import ToolResultStore
+from .tool_converter import create_mcp_from_tools
+from .tool_options import ToolOptions
+from .tool_stats import ToolStatsRegistry, format_prometheus
+from .tool_support import reject_run_context_tools
+
+__all__ = (
+    "DEFAULT_HOST",
+    "DEFAULT_MAX_STORED_RESULTS",
+    "DEFAULT_PORT",
+    "DEFAULT_RESULT_TTL",
+    "agent_tools",
+    "create_tool_server_app",
+    "run_tool_server",
+    "serve_tools",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+"""既定の待ち受けアドレス（同じホストのワーカーからのみ接続できる）"""
+
+DEFAULT_PORT = 8765
+"""既定の待ち受けポート"""
+
+DEFAULT_MAX_STORED_RESULTS = 256
+"""退避した結果をサーバーで保持する最大数の既定値"""
+
+DEFAULT_RESULT_TTL = 3600.0
+"""退避した結果をサーバーで保持する秒数の既定値"""
+
+ToolsSource = Agent[Any, Any] | Sequence[tuple[ToolDefinition, Callable[..., Any]]]
+
+
+def _is_loopback(host: str) -> bool:
+    """待ち受けアドレスがループバックか"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # ホスト名（名前解決の結果が変わりうるため、ループバックとはみなさない）
+        return False
+
+
+def agent_tools(
+    agent: Agent[Any, Any],
+) -> list[tuple[ToolDefinition, Callable[..., Any]]]:
+    """Agentに登録されたツールを(ToolDefinition, 実行関数)のリストとして返す（名前順）"""
+    tools = agent._function_toolset.tools
+    return [(tools[name].tool_def, tools[name].function) for name in sorted(tools)]
+
+
+class _McpEndpoint:
+    """Streamable HTTPのリクエストをセッションマネージャーに渡すASGIアプリ"""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager) -> None:
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_tool_server_app(
+    tools: ToolsSource,
+    *,
+    tool_options: Mapping[str, ToolOptions] | None = None,
+    tool_timeout: float | None = None,
+    max_tool_result_chars: int | None = None,
+    max_stored_results: int | None = DEFAULT_MAX_STORED_RESULTS,
+    result_ttl: float | None = DEFAULT_RESULT_TTL,
+    stats: ToolStatsRegistry | None = None,
+    path: str = "/mcp",
+) -> Starlette:
+    """ツールをStreamable HTTPのMCPサーバーとして公開するASGIアプリを作成する
+
+    `path`でMCPのリクエストを、`/metrics`でツールの実行統計（Prometheusのテキスト形式）を
+    返します。
+
+    Args:
+        tools: ツールを登録したAgent、または(ToolDefinition, 実行関数)のリスト
+        tool_options: ツール名ごとの実行オプション
+        tool_timeout: `ToolOptions.timeout`を指定していないツールのタイムアウト（秒）
+        max_tool_result_chars: この文字数を超える結果を退避する（Noneで無効）。
+            退避したファイルはサーバーの終了時に削除される
+        max_stored_results: 退避した結果を保持する最大数。超えた場合は最近読み出して
+            いない結果から削除する（Noneで無制限）
+        result_ttl: 退避した結果を保持する秒数（Noneで無期限）
+        stats: 実行統計の記録先（Noneの場合は新規に作成）
+        path: MCPのエンドポイントのパス
+
+    Returns:
+        Starletteアプリ（uvicornなどで実行する）
+
+    Raises:
+        ValueError: RunContextに依存するツールが含まれる場合
+            （共有サーバーにはリクエストごとの依存性を渡せない）
+    """
+    tools_with_funcs = agent_tools(tools) if isinstance(tools, Agent) else list(tools)
+    reject_run_context_tools(tools_with_funcs)
+
+    stats = stats if stats is not None else ToolStatsRegistry()
+    # サーバーの実行中は結果が溜まり続けるため、数と期間を制限する。ハンドルは
+    # 他のリクエスト（ワーカー）からの推測・列挙を防ぐためランダムな値を含める
+    result_store = (
+        ToolResultStore(
+            max_tool_result_chars,
+            max_results=max_stored_results,
+            ttl=result_ttl,
+            private_handles=True,
+        )
+        if max_tool_result_chars is not None
+        else None
+    )
+    server = create_mcp_from_tools(
+        tools_with_funcs,
+        result_store=result_store,
+        tool_options=tool_options,
+        default_timeout=tool_timeout,
+        stats=stats,
+    )["instance"]
+    # リクエストごとに独立して処理する（ワーカー・CLIのプロセスをまたぐ状態を持たない）
+    session_manager = StreamableHTTPSessionManager(
+        app=server, stateless=True, json_response=True
+    )
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            format_prometheus(stats.snapshot()),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        with result_store if result_store is not None else nullcontext():
+            async with session_manager.run():
+                logger.info(
+                    "Serving %d custom tools at %s", len(tools_with_funcs), path
+                )
+                yield
+
+    return Starlette(
+        routes=[
+            Route(path, endpoint=_McpEndpoint(session_manager)),
+            Route("/metrics", endpoint=metrics),
+        ],
+        lifespan=lifespan,
+    )
+
+
+async def serve_tools(
+    tools: ToolsSource,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    allow_remote: bool = False,
+    **kwargs: Any,
+) -> None:
+    """ツールのMCPサーバーを起動し、キャンセルされるまで実行する
+
+    Args:
+        tools: ツールを登録したAgent、または(ToolDefinition, 実行関数)のリスト
+        host: 待ち受けアドレス
+        port: 待ち受けポート
+        allow_remote: ループバック以外のアドレスでの待ち受けを許可する。
+            サーバーには認証がないため、接続できる相手は誰でもツールを実行できる
+        **kwargs: `create_tool_server_app()`の引数
+
+    Raises:
+        ValueError: allow_remote=Falseでループバック以外のアドレスを指定した場合
+    """
+    if not allow_remote and not _is_loopback(host):
+        raise ValueError(
+            f"Refusing to serve tools on non-loopback host {host!r}: the tool server "
+            "has no authentication. Pass allow_remote=True to bind it anyway."
+        )
+
+    import uvicorn
+
+    app = create_tool_server_app(tools, **kwargs)
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", ws="none")
+    await uvicorn.Server(config).serve()
+
+
+def run_tool_server(
+    tools: ToolsSource,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    allow_remote: bool = False,
+    **kwargs: Any,
+) -> None:
+    """ツールのMCPサーバーを起動する（終了するまで戻らない）
+
+    引数は`serve_tools()`と同じです。
+    """
+    anyio.run(
+        functools.partial(
+            serve_tools,
+            tools,
+            host=host,
+            port=port,
+            allow_remote=allow_remote,
+            **kwargs,
+        )
+    )
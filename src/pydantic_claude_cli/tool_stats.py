@@ -0,0 +1,259 @@
+"""カスタムツールの実行統計
+
+MCPツールのラッパーがツールごとの呼び出し数・エラー数・タイムアウト数・キャッシュヒット数、
+レイテンシのヒストグラム、引数と結果のサイズを記録します。1回の呼び出しにつき
+ロックを1度取得してカウンターを加算するだけのため、記録のオーバーヘッドはわずかです。
+
+統計はモデルごとに保持され、`ClaudeCodeCLIModel.tool_stats()`でスナップショットを
+取得できます。`format_prometheus()`でPrometheusのテキスト形式に変換できます。
+
+Example:
+    ```python
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", tool_timeout=30)
+    # ... agent.run() ...
+    for name, stats in model.tool_stats().items():
+        print(name, stats.calls, stats.errors, stats.p50, stats.p99)
+    ```
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+
+__all__ = (
+    "LATENCY_BUCKETS",
+    "ToolCallStats",
+    "ToolStatsRegistry",
+    "format_prometheus",
+)
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+"""レイテンシのヒストグラムのバケットの上限（秒、これを超える分は+Infのバケット）"""
+
+
+@dataclass
+class ToolCallStats:
+    """1つのツールの実行統計"""
+
+    calls: int = 0
+    """呼び出しの数（キャッシュヒット・集約された呼び出しを含む）"""
+
+    errors: int = 0
+    """エラー結果（引数の検証エラー、例外、タイムアウト）を返した呼び出しの数"""
+
+    timeouts: int = 0
+    """タイムアウトした呼び出しの数"""
+
+    cache_hits: int = 0
+    """結果のキャッシュから返した呼び出しの数"""
+
+    latency_sum: float = 0.0
+    """レイテンシの合計（秒）"""
+
+    latency_max: float = 0.0
+    """レイテンシの最大値（秒）"""
+
+    latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    """`LATENCY_BUCKETS`の各バケットに入った呼び出しの数（累積ではない、末尾は+Inf）"""
+
+    request_bytes: int = 0
+    """引数（JSON）のサイズの合計"""
+
+    response_bytes: int = 0
+    """CLIに返した結果のサイズの合計（テキストはUTF-8、バイナリはbase64）"""
+
+    @property
+    def mean_latency(self) -> float:
+        """レイテンシの平均（秒）"""
+        return self.latency_sum / self.calls if self.calls else 0.0
+
+    @property
+    def p50(self) -> float:
+        """レイテンシの中央値の推定値（秒）"""
+        return self.latency_quantile(0.5)
+
+    @property
+    def p99(self) -> float:
+        """レイテンシの99パーセンタイルの推定値（秒）"""
+        return self.latency_quantile(0.99)
+
+    def latency_quantile(self, q: float) -> float:
+        """ヒストグラムからレイテンシの分位数を推定する
+
+        PrometheusのHistogram_quantileと同様に、該当するバケット内で線形補間します
+        （+Infのバケットは最大値までの範囲として扱います）。
+        """
+        if self.calls == 0:
+            return 0.0
+        rank = q * self.calls
+        cumulative = 0
+        for i, count in enumerate(self.latency_buckets):
+            if count and cumulative + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = (
+                    LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+                )
+                upper = min(upper, self.latency_max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.latency_max
+
+
+class ToolStatsRegistry:
+    """ツール名ごとの実行統計
+
+    スレッドセーフです。
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str, ToolCallStats] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def _get(self, tool_name: str) -> ToolCallStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = ToolCallStats()
+        return stats
+
+    def record_call(
+        self,
+        tool_name: str,
+        latency: float,
+        *,
+        error: bool = False,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+    ) -> None:
+        """完了した呼び出しを記録する"""
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            stats = self._get(tool_name)
+            stats.calls += 1
+            stats.errors += error
+            stats.latency_sum += latency
+            if latency > stats.latency_max:
+                stats.latency_max = latency
+            stats.latency_buckets[bucket] += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+
+    def record_timeout(self, tool_name: str) -> None:
+        """タイムアウトを記録する"""
+        with self._lock:
+            self._get(tool_name).timeouts += 1
+
+    def record_cache_hit(self, tool_name: str) -> None:
+        """キャッシュヒットを記録する"""
+        with self._lock:
+            self._get(tool_name).cache_hits += 1
+
+    def snapshot(self, *, reset: bool = False) -> dict[str, ToolCallStats]:
+        """現在の統計のコピー（ツール名順）
+
+        Args:
+            reset: コピーを作成した後に統計を破棄する（区間ごとの集計用）
+        """
+        with self._lock:
+            snapshot = {
+                name: replace(
+                    self._stats[name],
+                    latency_buckets=list(self._stats[name].latency_buckets),
+                )
+                for name in sorted(self._stats)
+            }
+            if reset:
+                self._stats.clear()
+        return snapshot
+
+    def reset(self) -> None:
+        """統計をすべて破棄する"""
+        with self._lock:
+            self._stats.clear()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(
+    stats: Mapping[str, ToolCallStats],
+    *,
+    prefix: str = "pydantic_claude_cli_tool",
+) -> str:
+    """統計をPrometheusのテキスト形式（exposition format）に変換する
+
+    prometheus_clientには依存しません。HTTPサーバーのエンドポイントなどから
+    そのまま返せます。
+
+    Args:
+        stats: `ClaudeCodeCLIModel.tool_stats()`などのスナップショット
+        prefix: メトリクス名の接頭辞
+
+    Returns:
+        Prometheusのテキスト形式の文字列
+
+    Example:
+        ```python
+        from pydantic_claude_cli.tool_stats import format_prometheus
+
+        text = format_prometheus(model.tool_stats())
+        ```
+    """
+    counters = (
+        ("calls_total", "Custom tool calls.", "calls"),
+        ("errors_total", "Custom tool calls that returned an error.", "errors"),
+        ("timeouts_total", "Custom tool calls that timed out.", "timeouts"),
+        ("cache_hits_total", "Custom tool calls served from cache.", "cache_hits"),
+        ("request_bytes_total", "Size of custom tool arguments.", "request_bytes"),
+        ("response_bytes_total", "Size of custom tool results.", "response_bytes"),
+    )
+    labels = {name: f'tool="{_escape_label(name)}"' for name in stats}
+
+    lines: list[str] = []
+    for suffix, help_text, attr in counters:
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(
+            f"{metric}{{{labels[name]}}} {getattr(s, attr)}"
+            for name, s in stats.items()
+        )
+
+    metric = f"{prefix}_duration_seconds"
+    lines.append(f"# HELP {metric} Custom tool call latency.")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, s in stats.items():
+        cumulative = 0
+        for bound, count in zip(
+            (*(f"{b:g}" for b in LATENCY_BUCKETS), "+Inf"), s.latency_buckets
+        ):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{labels[name]},le="{bound}"}} {cumulative}')
+        lines.append(f"{metric}_sum{{{labels[name]}}} {s.latency_sum!r}")
+        lines.append(f"{metric}_count{{{labels[name]}}} {s.calls}")
+
+    return "\n".join(lines) + "\n"
@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import inspect
 import logging
+from collections.abc import Iterable
 from typing import Any, Callable
 
 from pydantic_ai.models import ModelRequestParameters
@@ -174,3 +175,26 @@ def extract_tools_from_agent(
     )
 
     return tools_with_funcs, has_context_tools
+
+
+def reject_run_context_tools(
+    tools_with_funcs: Iterable[tuple[ToolDefinition, Callable[..., Any]]],
+) -> None:
+    """RunContextに依存するツールが含まれる場合はエラーにする
+
+    共有ツールサーバーにはリクエストごとの依存性を渡せないため、サーバーの作成時と、
+    共有サーバーを使うモデルのリクエスト時に呼び出します。
+
+    Raises:
+        ValueError: RunContextに依存するツールが含まれる場合
+    """
+    context_tools = [
+        tool_def.name
+        for tool_def, func in tools_with_funcs
+        if requires_run_context(func)
+    ]
+    if context_tools:
+        raise ValueError(
+            "Tools that require RunContext cannot be served from a shared tool "
+            f"server: {', '.join(context_tools)}"
+        )
@@ -0,0 +1,207 @@
+"""ツール引数のコンパイル済み検証器
+
+CLIから届いたMCPツール呼び出しの引数を、ツール関数のシグネチャから作成した
+pydanticの検証器で検証・変換します（"5" → 5、dict → BaseModelなど）。
+検証器は関数ごとに1度だけ作成してキャッシュするため、リクエストごとにMCPサーバーを
+作成しても再コンパイルは発生しません。
+
+不正な引数はツール関数を呼び出す前に検出し、モデルが次のターンで修正できるよう
+エラー箇所とメッセージだけを並べた短いテキストを返します。
+
+引数の扱いはpydantic-aiの`FunctionSchema`に合わせています:
+    - RunContextのパラメータは検証の対象外
+    - パラメータがモデル的な型（BaseModel、dataclass、TypedDict）1つだけの場合、
+      ツールのJSON Schemaはその型のスキーマになるため、引数全体をその型として検証する
+    - 定義にない引数は無視する（`**kwargs`がある場合はそのまま渡す）
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, is_dataclass
+from collections.abc import Sequence
+from typing import Any, Callable, get_origin, get_type_hints
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError, with_config
+from pydantic_ai.tools import RunContext
+from typing_extensions import NotRequired, Required, TypedDict, is_typeddict
+
+__all__ = (
+    "ArgsValidator",
+    "build_args_validator",
+    "format_argument_errors",
+    "format_validation_error",
+    "get_args_validator",
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 5
+"""エラーメッセージに含めるエラーの最大数"""
+
+_MAX_INPUT_REPR = 80
+
+# 関数 -> 検証器（作成できなかった場合はNone）
+_validator_cache: weakref.WeakKeyDictionary[
+    Callable[..., Any], ArgsValidator | None
+] = weakref.WeakKeyDictionary()
+_validator_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ArgsValidator:
+    """ツール関数の引数の検証器"""
+
+    adapter: TypeAdapter[Any]
+    single_arg_name: str | None = None
+    """引数全体を1つのモデル的な型として検証する場合のパラメータ名"""
+
+    def validate(self, args: dict[str, Any]) -> dict[str, Any]:
+        """引数を検証・変換し、ツール関数に渡すキーワード引数を返す
+
+        Raises:
+            ValidationError: 引数がシグネチャに合わない場合
+        """
+        validated = self.adapter.validate_python(args)
+        if self.single_arg_name is not None:
+            return {self.single_arg_name: validated}
+        return dict(validated)
+
+
+def _is_run_context(annotation: Any) -> bool:
+    return annotation is RunContext or get_origin(annotation) is RunContext
+
+
+def _is_model_like(annotation: Any) -> bool:
+    return isinstance(annotation, type) and (
+        issubclass(annotation, BaseModel)
+        or is_dataclass(annotation)
+        or is_typeddict(annotation)
+    )
+
+
+def build_args_validator(func: Callable[..., Any]) -> ArgsValidator | None:
+    """関数のシグネチャから引数の検証器を作成する
+
+    位置専用引数・可変長位置引数を持つ関数や、型ヒントを解決できない関数では
+    Noneを返します（引数は検証せずにそのまま渡されます）。
+
+    Args:
+        func: ツール関数
+
+    Returns:
+        ArgsValidator、または作成できない場合はNone
+    """
+    try:
+        signature = inspect.signature(func)
+        hints = get_type_hints(func, include_extras=True)
+    except Exception as e:
+        logger.debug("Cannot inspect %r for argument validation: %s", func, e)
+        return None
+
+    # パラメータ名 -> (型, 必須か)
+    fields: dict[str, tuple[Any, bool]] = {}
+    has_var_kwargs = False
+    for param in signature.parameters.values():
+        annotation = hints.get(param.name, Any)
+        if _is_run_context(annotation):
+            continue
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            has_var_kwargs = True
+        elif param.kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.VAR_POSITIONAL,
+        ):
+            # ツール関数はキーワード引数で呼び出すため対象外
+            return None
+        else:
+            fields[param.name] = (annotation, param.default is inspect.Parameter.empty)
+
+    try:
+        if len(fields) == 1 and not has_var_kwargs:
+            name, (annotation, _) = next(iter(fields.items()))
+            if _is_model_like(annotation):
+                return ArgsValidator(TypeAdapter(annotation), single_arg_name=name)
+
+        # 省略された引数は関数のデフォルト値が使われるため、NotRequiredにするだけでよい
+        args_type = TypedDict(  # type: ignore[misc]
+            f"{getattr(func, '__name__', 'tool')}_args",
+            {
+                name: Required[annotation] if required else NotRequired[annotation]
+                for name, (annotation, required) in fields.items()
+            },
+        )
+        config = ConfigDict(extra="allow" if has_var_kwargs else "ignore")
+        return ArgsValidator(TypeAdapter(with_config(config)(args_type)))
+    except Exception as e:
+        logger.debug("Cannot build argument validator for %r: %s", func, e)
+        return None
+
+
+def get_args_validator(func: Callable[..., Any]) -> ArgsValidator | None:
+    """関数ごとにキャッシュした引数の検証器を返す（初回のみ作成）"""
+    try:
+        return _validator_cache[func]
+    except KeyError:
+        pass
+    except TypeError:
+        # 弱参照を作成できない呼び出し可能オブジェクト
+        return build_args_validator(func)
+
+    validator = build_args_validator(func)
+    with _validator_lock:
+        _validator_cache[func] = validator
+    return validator
+
+
+def _short_repr(value: Any) -> str:
+    text = repr(value)
+    if len(text) > _MAX_INPUT_REPR:
+        text = text[: _MAX_INPUT_REPR - 3] + "..."
+    return text
+
+
+def format_argument_errors(
+    tool_name: str,
+    errors: Sequence[tuple[str, str]],
+    *,
+    max_errors: int = MAX_REPORTED_ERRORS,
+) -> str:
+    """(エラー箇所, メッセージ)のリストをモデルへの再試行メッセージに変換する
+
+    Example:
+        ```
+        Invalid arguments for tool 'search':
+        - mode: Input should be 'fast' or 'slow' (got 'bad')
+        - address.city: Field required
+        Fix the errors and try again.
+        ```
+    """
+    lines = [f"Invalid arguments for tool '{tool_name}':"]
+    lines.extend(
+        f"- {location or '(arguments)'}: {message}"
+        for location, message in errors[:max_errors]
+    )
+    if len(errors) > max_errors:
+        lines.append(f"- ... and {len(errors) - max_errors} more errors")
+    lines.append("Fix the errors and try again.")
+    return "\n".join(lines)
+
+
+def format_validation_error(
+    tool_name: str,
+    error: ValidationError,
+    *,
+    max_errors: int = MAX_REPORTED_ERRORS,
+) -> str:
+    """pydanticの検証エラーをモデルへの再試行メッセージに変換する"""
+    errors: list[tuple[str, str]] = []
+    for detail in error.errors(include_url=False, include_context=False):
+        message = detail["msg"]
+        if detail["type"] != "missing":
+            message += f" (got {_short_repr(detail['input'])})"
+        errors.append((".".join(str(part) for part in detail["loc"]), message))
+    return format_argument_errors(tool_name, errors, max_errors=max_errors)
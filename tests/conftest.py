@@ -0,0 +1,64 @@
+"""テスト共通のフィクスチャ
+
+カスタムツールのMCPサーバーを作成し、ハンドラーを直接呼び出すヘルパーを提供する。
+"""
+
+import pytest
+from mcp import types
+from pydantic_ai.tools import ToolDefinition
+
+from pydantic_claude_cli.tool_converter import create_mcp_from_tools
+
+EMPTY_SCHEMA = {"type": "object", "properties": {}}
+
+
+@pytest.fixture
+def tool_server():
+    """1つの関数をツールとして登録したMCPサーバーを作成するファクトリ
+
+    schemaを省略した場合は引数なしのツールになる。optionsはそのツールの
+    ToolOptionsで、それ以外のキーワード引数はcreate_mcp_from_toolsに渡す。
+    """
+
+    def make(func, schema=None, *, description="", options=None, **kwargs):
+        tool_def = ToolDefinition(
+            name=func.__name__,
+            description=description,
+            parameters_json_schema=schema if schema is not None else EMPTY_SCHEMA,
+        )
+        if options is not None:
+            kwargs["tool_options"] = {func.__name__: options}
+        return create_mcp_from_tools([(tool_def, func)], **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def call_tool():
+    """MCPサーバーのtools/callハンドラーを呼び出し、CallToolResultを返す"""
+
+    async def call(server, name, arguments=None):
+        handler = server["instance"].request_handlers[types.CallToolRequest]
+        result = await handler(
+            types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(
+                    name=name, arguments=arguments if arguments is not None else {}
+                ),
+            )
+        )
+        return result.root
+
+    return call
+
+
+@pytest.fixture
+def list_tools():
+    """MCPサーバーのtools/listハンドラーを呼び出し、ツール一覧を返す"""
+
+    async def list_(server):
+        handler = server["instance"].request_handlers[types.ListToolsRequest]
+        result = await handler(types.ListToolsRequest(method="tools/list"))
+        return result.root.tools
+
+    return list_
@@ -0,0 +1,240 @@
+"""テスト: capabilities モジュール（CLIのバージョン・対応フラグの検出）"""
+
+import json
+
+import pytest
+
+from pydantic_claude_cli import ClaudeCodeCLIModel, ClaudeCodeCLIProvider
+from pydantic_claude_cli import capabilities as capabilities_module
+from pydantic_claude_cli.capabilities import (
+    CLICapabilities,
+    clear_capabilities_cache,
+    parse_help_flags,
+)
+from pydantic_claude_cli.fake_cli import VERSION, write_launcher
+
+HELP_TEXT = """Usage: claude [options] [command] [prompt]
+
+Options:
+  --add-dir <directories...>            Additional directories to allow tool
+                                        access to
+  --allowedTools, --allowed-tools <tools...>
+      Comma or space-separated list of tool names to allow
+  --bare                                Minimal mode. Explicitly provide context
+                                        via: --system-prompt, --mcp-config.
+  -c, --continue                        Continue the most recent conversation
+  -p, --print                           Print response and exit
+
+Commands:
+  mcp                                   Configure and manage MCP servers
+"""
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_capabilities_cache()
+    yield
+    clear_capabilities_cache()
+
+
+@pytest.fixture
+def probe_calls(monkeypatch):
+    """CLIの起動（--version / --help）を記録する"""
+    calls = []
+    real_run = capabilities_module._run
+
+    def counting_run(cli_path, arg, timeout):
+        calls.append(arg)
+        return real_run(cli_path, arg, timeout)
+
+    monkeypatch.setattr(capabilities_module, "_run", counting_run)
+    return calls
+
+
+def _plain_cli(path, version="1.0.3 (Claude Code)"):
+    """--versionのみに応答するCLI"""
+    path.write_text(
+        f'#!/bin/sh\nif [ "$1" = "--version" ]; then echo "{version}"; exit 0; fi\n'
+        "exit 1\n"
+    )
+    path.chmod(0o755)
+    return path
+
+
+class TestParseHelpFlags:
+    """--help出力の解析のテスト"""
+
+    def test_option_names(self):
+        """オプション行のフラグ（別名を含む）を抽出すること"""
+        assert parse_help_flags(HELP_TEXT) == {
+            "--add-dir",
+            "--allowedTools",
+            "--allowed-tools",
+            "--bare",
+            "--continue",
+            "--print",
+        }
+
+    def test_ignores_flags_in_descriptions(self):
+        """説明文中に出てくるフラグは含めないこと"""
+        flags = parse_help_flags(HELP_TEXT)
+
+        assert "--system-prompt" not in flags
+        assert "--mcp-config" not in flags
+
+
+class TestCLICapabilities:
+    """CLICapabilitiesのテスト"""
+
+    def test_version_info(self):
+        """バージョン文字列から番号を取り出すこと"""
+        caps = CLICapabilities(version="2.1.0-dev.2025 (Claude Code)")
+
+        assert caps.version_info == (2, 1, 0)
+        assert caps.at_least(2, 0)
+        assert not caps.at_least(2, 1, 1)
+
+    def test_unknown_version(self):
+        """バージョン不明の場合はat_leastがFalseになること"""
+        caps = CLICapabilities(version=None)
+
+        assert caps.version_info is None
+        assert not caps.at_least(0)
+
+    def test_supports_with_or_without_dashes(self):
+        """先頭の"--"の有無にかかわらず判定できること"""
+        caps = CLICapabilities(version=None, flags=frozenset({"--strict-mcp-config"}))
+
+        assert caps.supports("--strict-mcp-config")
+        assert caps.supports("strict-mcp-config")
+        assert not caps.supports("bare")
+
+    def test_round_trip(self):
+        """to_dict/from_dictで復元できること"""
+        caps = CLICapabilities(version="1.2.3", flags=frozenset({"--a", "--b"}))
+
+        assert CLICapabilities.from_dict(json.loads(json.dumps(caps.to_dict()))) == caps
+
+
+class TestProviderCapabilities:
+    """プロバイダーによる検出とキャッシュのテスト"""
+
+    def test_probe_fake_cli(self, tmp_path):
+        """偽のCLIのバージョンとフラグを検出できること"""
+        provider = ClaudeCodeCLIProvider(cli_path=write_launcher(tmp_path / "claude"))
+
+        caps = provider.capabilities
+
+        assert caps.version == VERSION
+        assert caps.supports("--mcp-config")
+        assert caps.supports("--strict-mcp-config")
+
+    def test_probe_is_cached_across_providers(self, tmp_path, probe_calls):
+        """同じバイナリは1度だけ検出すること"""
+        cli = write_launcher(tmp_path / "claude")
+
+        for _ in range(5):
+            ClaudeCodeCLIProvider(cli_path=cli).capabilities
+
+        assert probe_calls == ["--version", "--help"]
+
+    def test_failed_help_yields_no_flags(self, tmp_path):
+        """--helpが失敗してもバージョンは取得できること"""
+        provider = ClaudeCodeCLIProvider(cli_path=_plain_cli(tmp_path / "claude"))
+
+        caps = provider.capabilities
+
+        assert caps.version_info == (1, 0, 3)
+        assert caps.flags == frozenset()
+
+    def test_disk_cache(self, tmp_path, probe_calls):
+        """ディスクキャッシュから復元し、CLIを起動しないこと"""
+        cli = write_launcher(tmp_path / "claude")
+        cache_file = tmp_path / "discovery.json"
+        first = ClaudeCodeCLIProvider(cli_path=cli, discovery_cache=cache_file)
+        expected = first.capabilities
+        clear_capabilities_cache()  # 別プロセスを模擬
+
+        second = ClaudeCodeCLIProvider(cli_path=cli, discovery_cache=cache_file)
+
+        assert second.capabilities == expected
+        assert probe_calls == ["--version", "--help"]
+        assert str(cli) in json.loads(cache_file.read_text())["capabilities"]
+
+    def test_timed_out_probe_is_not_persisted(self, tmp_path, monkeypatch):
+        """タイムアウトしたプローブはディスクに保存せず、期限後に再検出すること"""
+        cli = write_launcher(tmp_path / "claude")
+        cache_file = tmp_path / "discovery.json"
+        real_run = capabilities_module._run
+        monkeypatch.setattr(capabilities_module, "_run", lambda *args: None)
+        monkeypatch.setattr(capabilities_module, "FAILED_PROBE_TTL", 0.0)
+
+        provider = ClaudeCodeCLIProvider(cli_path=cli, discovery_cache=cache_file)
+        assert provider.capabilities == CLICapabilities(version=None)
+        assert not cache_file.exists()
+
+        monkeypatch.setattr(capabilities_module, "_run", real_run)
+        assert provider.capabilities.version == VERSION
+        assert str(cli) in json.loads(cache_file.read_text())["capabilities"]
+
+    def test_failed_probe_is_reused_until_ttl(self, tmp_path, monkeypatch):
+        """失敗したプローブの結果は期限内は再利用すること"""
+        cli = write_launcher(tmp_path / "claude")
+        calls = []
+
+        def failing_run(cli_path, arg, timeout):
+            calls.append(arg)
+            return None
+
+        monkeypatch.setattr(capabilities_module, "_run", failing_run)
+
+        for _ in range(3):
+            assert ClaudeCodeCLIProvider(cli_path=cli).capabilities.version is None
+
+        assert calls == ["--version", "--help"]
+
+    def test_upgraded_binary_is_probed_again(self, tmp_path):
+        """バイナリが更新されると再検出すること"""
+        cli = _plain_cli(tmp_path / "claude", version="1.0.0")
+        assert ClaudeCodeCLIProvider(cli_path=cli).capabilities.version == "1.0.0"
+
+        replacement = _plain_cli(tmp_path / "claude.new", version="2.0.0")
+        replacement.replace(cli)
+
+        assert ClaudeCodeCLIProvider(cli_path=cli).capabilities.version == "2.0.0"
+
+
+class TestStrictMcpConfig:
+    """strict_mcp_configオプションのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_enabled_when_supported(self, tmp_path):
+        """CLIが対応していれば--strict-mcp-configを付けること"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5",
+            cli_path=write_launcher(tmp_path / "claude"),
+            strict_mcp_config=True,
+        )
+
+        assert await model._extra_args() == {"strict-mcp-config": None}
+
+    @pytest.mark.asyncio
+    async def test_skipped_when_unsupported(self, tmp_path):
+        """CLIが対応していなければ付けないこと"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5",
+            cli_path=_plain_cli(tmp_path / "claude"),
+            strict_mcp_config=True,
+        )
+
+        assert await model._extra_args() == {}
+
+    @pytest.mark.asyncio
+    async def test_disabled_does_not_probe(self, tmp_path, probe_calls):
+        """無効の場合はCLIを検出しないこと"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5", cli_path=write_launcher(tmp_path / "claude")
+        )
+
+        assert await model._extra_args() == {}
+        assert probe_calls == []
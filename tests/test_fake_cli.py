@@ -0,0 +1,155 @@
+"""テスト: fake_cli モジュール"""
+
+import io
+import json
+import random
+import subprocess
+
+import pytest
+from pydantic_ai import Agent
+
+from pydantic_claude_cli import ClaudeCodeCLIModel
+from pydantic_claude_cli.fake_cli import (
+    VERSION,
+    FakeClaudeCLI,
+    sample_latency,
+    write_launcher,
+)
+
+
+def _run(script: dict, *lines: dict) -> list[dict]:
+    """偽のCLIに入力行を与え、出力メッセージを返す"""
+    stdin = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    stdout = io.StringIO()
+    FakeClaudeCLI(script, stdin=stdin, stdout=stdout).run()
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def _user(text: str) -> dict:
+    return {"type": "user", "message": {"role": "user", "content": text}}
+
+
+class TestSampleLatency:
+    """遅延分布のテスト"""
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {"distribution": "uniform", "low": 0.1, "high": 0.2},
+            {"distribution": "normal", "mean": 0.15, "stddev": 0.01},
+            {"distribution": "lognormal", "mean": 0.15, "sigma": 0.1},
+            {"distribution": "exponential", "mean": 0.15},
+        ],
+    )
+    def test_distributions_are_non_negative(self, spec: dict) -> None:
+        """各分布のサンプルは0以上"""
+        rng = random.Random(0)
+
+        samples = [sample_latency(spec, rng) for _ in range(200)]
+
+        assert min(samples) >= 0
+        assert 0.05 < sum(samples) / len(samples) < 0.3
+
+    def test_constant_and_none(self) -> None:
+        """固定値とNone"""
+        rng = random.Random(0)
+
+        assert sample_latency(0.25, rng) == 0.25
+        assert sample_latency({"value": 0.5}, rng) == 0.5
+        assert sample_latency(None, rng) == 0.0
+
+    def test_unknown_distribution(self) -> None:
+        """未知の分布はエラー"""
+        with pytest.raises(ValueError):
+            sample_latency({"distribution": "pareto"}, random.Random(0))
+
+
+class TestFakeClaudeCLI:
+    """プロトコルのテスト"""
+
+    def test_answers_initialize(self) -> None:
+        """initializeのcontrol_requestに応答する"""
+        messages = _run(
+            {},
+            {
+                "type": "control_request",
+                "request_id": "req_1",
+                "request": {"subtype": "initialize"},
+            },
+        )
+
+        assert messages[0]["type"] == "control_response"
+        assert messages[0]["response"]["request_id"] == "req_1"
+
+    def test_scripted_response_by_match(self) -> None:
+        """プロンプトの正規表現で応答を選択する"""
+        script = {
+            "responses": [
+                {"match": "weather", "text": "sunny"},
+                {"text": "echo: {prompt}"},
+            ]
+        }
+
+        messages = _run(script, _user("weather today?"), _user("hi"))
+
+        results = [m["result"] for m in messages if m["type"] == "result"]
+        assert results == ["sunny", "echo: hi"]
+
+    def test_stream_shape(self) -> None:
+        """system → assistant → resultの順に出力する"""
+        messages = _run({"responses": [{"text": "ok", "thinking": "hmm"}]}, _user("x"))
+
+        assert [m["type"] for m in messages] == [
+            "system",
+            "assistant",
+            "assistant",
+            "result",
+        ]
+        assert messages[-1]["usage"]["output_tokens"] >= 1
+
+
+class TestFakeCLIEndToEnd:
+    """cli_pathで指定したエンドツーエンドのテスト"""
+
+    def test_launcher_version(self, tmp_path) -> None:
+        """起動スクリプトが--versionに応答する"""
+        cli = write_launcher(tmp_path / "claude")
+
+        output = subprocess.run(
+            [str(cli), "--version"], capture_output=True, text=True, check=True
+        )
+
+        assert output.stdout.strip() == VERSION
+
+    @pytest.mark.asyncio
+    async def test_tool_call_sequence(self, tmp_path) -> None:
+        """スクリプトのツール呼び出しがSDK MCPサーバー経由で実行される"""
+        cli = write_launcher(
+            tmp_path / "claude",
+            {
+                "responses": [
+                    {
+                        "tool_calls": [
+                            {"name": "add", "arguments": {"x": 1, "y": 2}, "repeat": 2}
+                        ],
+                        "text": "results: {results}",
+                    }
+                ]
+            },
+        )
+        calls: list = []
+        model = ClaudeCodeCLIModel("claude-haiku-4-5", cli_path=cli)
+        agent = Agent(model)
+        model.set_agent_toolsets(agent._function_toolset)
+
+        @agent.tool_plain
+        def add(x: int, y: int) -> int:
+            """Add two numbers"""
+            calls.append((x, y))
+            return x + y
+
+        result = await agent.run("add 1 and 2")
+
+        assert result.output == "results: 3, 3"
+        assert calls == [(1, 2), (1, 2)]
+        assert result.usage().details["num_turns"] == 3
@@ -0,0 +1,55 @@
+"""テスト: パッケージの遅延インポート"""
+
+import subprocess
+import sys
+
+import pytest
+
+import pydantic_claude_cli
+
+
+def _run(code: str) -> str:
+    """新しいプロセスでコードを実行し、標準出力を返す"""
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestLazyImports:
+    """PEP 562による遅延インポートのテスト"""
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        """パッケージとBuiltinToolsのインポートで重い依存が読み込まれないこと"""
+        loaded = _run(
+            "import sys\n"
+            "from pydantic_claude_cli import BuiltinTools, PydanticClaudeCLIError\n"
+            "print([m for m in ('claude_code_sdk', 'mcp', 'pydantic_ai') "
+            "if m in sys.modules])"
+        )
+        assert loaded == "[]"
+
+    def test_lazy_attribute_loads_on_access(self):
+        """遅延属性にアクセスすると依存が読み込まれること"""
+        loaded = _run(
+            "import sys\n"
+            "from pydantic_claude_cli import ClaudeCodeCLIModel\n"
+            "print('claude_code_sdk' in sys.modules)"
+        )
+        assert loaded == "True"
+
+    @pytest.mark.parametrize("name", pydantic_claude_cli.__all__)
+    def test_all_exports_resolve(self, name):
+        """__all__の全ての名前が解決できること"""
+        assert getattr(pydantic_claude_cli, name) is not None
+        assert name in dir(pydantic_claude_cli)
+
+    def test_lazy_attribute_is_same_object(self):
+        """遅延属性がサブモジュールの同じオブジェクトを返すこと"""
+        from pydantic_claude_cli.model import ClaudeCodeCLIModel
+
+        assert pydantic_claude_cli.ClaudeCodeCLIModel is ClaudeCodeCLIModel
+
+    def test_unknown_attribute_raises(self):
+        """存在しない属性はAttributeErrorになること"""
+        with pytest.raises(AttributeError, match="no_such_attribute"):
+            pydantic_claude_cli.no_such_attribute  # noqa: B018
@@ -0,0 +1,281 @@
+"""テスト: message_converter モジュール"""
+
+import pytest
+from claude_code_sdk.types import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ThinkingBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+from pydantic_ai.messages import (
+    BinaryContent,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ThinkingPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from pydantic_claude_cli.exceptions import MessageConversionError
+from pydantic_claude_cli.message_converter import (
+    TRANSCRIPT_KEY,
+    cache_hit_rate,
+    convert_from_claude_messages,
+    convert_to_claude_content_blocks,
+    convert_to_claude_prompt,
+    expand_transcript,
+    extract_system_prompt,
+    extract_usage_from_result,
+    stream_user_message,
+)
+
+
+def _tool_stream() -> list:
+    """ツール呼び出しを1回含むCLIのメッセージ列"""
+    return [
+        AssistantMessage(
+            content=[ThinkingBlock(thinking="use the tool", signature="sig")],
+            model="claude-haiku-4-5",
+        ),
+        AssistantMessage(
+            content=[
+                ToolUseBlock(id="toolu_1", name="mcp__custom__add", input={"x": 1})
+            ],
+            model="claude-haiku-4-5",
+        ),
+        UserMessage(content=[ToolResultBlock(tool_use_id="toolu_1", content="2")]),
+        AssistantMessage(content=[TextBlock(text="The answer is 2")], model="m"),
+        ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=2,
+            session_id="s",
+        ),
+    ]
+
+
+class TestConvertFromClaudeMessages:
+    """CLIメッセージ列全体の変換のテスト"""
+
+    def test_converts_full_transcript(self) -> None:
+        """ツールターンを含む全メッセージを変換する"""
+        history = convert_from_claude_messages(_tool_stream(), "claude-haiku-4-5")
+
+        assert [type(m) for m in history] == [
+            ModelResponse,
+            ModelRequest,
+            ModelResponse,
+        ]
+        assert history[-1].parts == [TextPart(content="The answer is 2")]
+
+    def test_merges_consecutive_assistant_messages(self) -> None:
+        """連続したAssistantMessageを1つのModelResponseにまとめる"""
+        history = convert_from_claude_messages(_tool_stream())
+
+        first = history[0]
+        assert isinstance(first, ModelResponse)
+        assert isinstance(first.parts[0], ThinkingPart)
+        assert isinstance(first.parts[1], ToolCallPart)
+
+    def test_resolves_tool_name_for_results(self) -> None:
+        """ツール結果にtool_useのツール名を対応付ける"""
+        history = convert_from_claude_messages(_tool_stream())
+
+        tool_return = history[1].parts[0]
+        assert isinstance(tool_return, ToolReturnPart)
+        assert tool_return.tool_name == "mcp__custom__add"
+        assert tool_return.tool_call_id == "toolu_1"
+        assert tool_return.content == "2"
+
+    def test_flattens_list_tool_result_content(self) -> None:
+        """リスト形式のツール結果をテキストに変換する"""
+        messages = [
+            UserMessage(
+                content=[
+                    ToolResultBlock(
+                        tool_use_id="t", content=[{"type": "text", "text": "a"}]
+                    )
+                ]
+            )
+        ]
+        history = convert_from_claude_messages(messages)
+
+        assert history[0].parts[0].content == "a"
+
+
+class TestTranscript:
+    """provider_detailsに保存されたトランスクリプトのテスト"""
+
+    def _history(self) -> list:
+        *intermediate, final = convert_from_claude_messages(_tool_stream())
+        final.provider_details = {TRANSCRIPT_KEY: intermediate}
+        return [ModelRequest(parts=[UserPromptPart(content="add 1")]), final]
+
+    def test_expand_transcript_inlines_turns(self) -> None:
+        """expand_transcriptが中間ターンを展開する"""
+        expanded = expand_transcript(self._history())
+
+        assert len(expanded) == 4
+        assert isinstance(expanded[2], ModelRequest)
+
+    def test_expand_transcript_after_json_round_trip(self) -> None:
+        """JSONシリアライズ後のトランスクリプトも展開できる"""
+        data = ModelMessagesTypeAdapter.dump_json(self._history())
+        restored = ModelMessagesTypeAdapter.validate_json(data)
+
+        expanded = expand_transcript(restored)
+
+        assert isinstance(expanded[1], ModelResponse)
+        assert isinstance(expanded[2].parts[0], ToolReturnPart)
+
+    def test_prompt_renders_transcript(self) -> None:
+        """後続ターンのプロンプトにツールターンが含まれる"""
+        prompt = convert_to_claude_prompt(self._history())
+
+        assert '[Tool call: mcp__custom__add({"x":1})]' in prompt
+        assert "[Tool result: mcp__custom__add] 2" in prompt
+        assert prompt.index("[Tool result") < prompt.index("Assistant: The answer")
+
+
+class TestConvertToClaudeContentBlocks:
+    """stream-json入力用コンテンツブロック変換のテスト"""
+
+    def _turn(self, prompt: str, answer: str) -> list:
+        return [
+            ModelRequest(parts=[UserPromptPart(content=prompt)]),
+            ModelResponse(parts=[TextPart(content=answer)]),
+        ]
+
+    def test_one_block_per_turn(self) -> None:
+        """ユーザー/アシスタントのターンごとにブロックを生成する"""
+        messages = [
+            ModelRequest(
+                parts=[
+                    SystemPromptPart(content="system"),
+                    UserPromptPart(content="Hi"),
+                ]
+            ),
+            ModelResponse(parts=[TextPart(content="Hello")]),
+        ]
+
+        blocks = convert_to_claude_content_blocks(messages)
+
+        assert blocks == [
+            {"type": "text", "text": "Hi"},
+            {"type": "text", "text": "<assistant>\nHello\n</assistant>"},
+        ]
+
+    def test_prefix_is_stable_across_turns(self) -> None:
+        """履歴が伸びても先頭ブロックはバイト単位で同一"""
+        first = self._turn("Q1", "A1")
+        second = first + self._turn("Q2", "A2")
+
+        blocks_1 = convert_to_claude_content_blocks(first)
+        blocks_2 = convert_to_claude_content_blocks(second)
+
+        assert blocks_2[: len(blocks_1)] == blocks_1
+
+    def test_converts_images(self) -> None:
+        """画像をimageブロックとして送る"""
+        part = UserPromptPart(
+            content=["Describe", BinaryContent(data=b"png", media_type="image/png")]
+        )
+
+        blocks = convert_to_claude_content_blocks([ModelRequest(parts=[part])])
+
+        assert blocks[1]["type"] == "image"
+        assert blocks[1]["source"] == {
+            "type": "base64",
+            "media_type": "image/png",
+            "data": "cG5n",
+        }
+
+    def test_rejects_unsupported_content(self) -> None:
+        """未対応のコンテンツはエラーになる"""
+        part = UserPromptPart(
+            content=[BinaryContent(data=b"%PDF", media_type="application/pdf")]
+        )
+
+        with pytest.raises(MessageConversionError):
+            convert_to_claude_content_blocks([ModelRequest(parts=[part])])
+
+    @pytest.mark.asyncio
+    async def test_stream_user_message(self) -> None:
+        """単一のユーザーメッセージとして送信される"""
+        blocks = [{"type": "text", "text": "Hi"}]
+
+        messages = [m async for m in stream_user_message(blocks)]
+
+        assert messages == [
+            {
+                "type": "user",
+                "message": {"role": "user", "content": blocks},
+                "parent_tool_use_id": None,
+            }
+        ]
+
+
+class TestExtractSystemPrompt:
+    """システムプロンプト抽出のテスト"""
+
+    def test_joins_all_parts_before_instructions(self) -> None:
+        """全SystemPromptPartを順に連結し、instructionsを最後に置く"""
+        messages = [
+            ModelRequest(
+                parts=[
+                    SystemPromptPart(content="A"),
+                    SystemPromptPart(content="B"),
+                    UserPromptPart(content="Hi"),
+                ]
+            )
+        ]
+
+        assert extract_system_prompt(messages, instructions="C") == "A\n\nB\n\nC"
+
+    def test_returns_none_without_system_prompt(self) -> None:
+        """システムプロンプトがない場合はNone"""
+        messages = [ModelRequest(parts=[UserPromptPart(content="Hi")])]
+
+        assert extract_system_prompt(messages) is None
+
+
+class TestExtractUsageFromResult:
+    """使用量抽出のテスト"""
+
+    def test_extracts_cache_tokens(self) -> None:
+        """キャッシュトークンを取り込み、input_tokensに含める"""
+        usage = extract_usage_from_result(
+            {
+                "usage": {
+                    "input_tokens": 10,
+                    "cache_creation_input_tokens": 100,
+                    "cache_read_input_tokens": 890,
+                    "output_tokens": 5,
+                },
+                "duration_ms": 1200,
+                "num_turns": 1,
+            }
+        )
+
+        assert usage.input_tokens == 1000
+        assert usage.cache_write_tokens == 100
+        assert usage.cache_read_tokens == 890
+        assert usage.output_tokens == 5
+        assert usage.details["duration_ms"] == 1200
+        assert cache_hit_rate(usage) == 0.89
+
+    def test_handles_missing_usage(self) -> None:
+        """usageがNoneでも0として扱う"""
+        usage = extract_usage_from_result({"usage": None})
+
+        assert usage.input_tokens == 0
+        assert cache_hit_rate(usage) == 0.0
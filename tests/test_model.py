@@ -0,0 +1,43 @@
+"""テスト: ClaudeCodeCLIModel"""
+
+from pydantic_claude_cli import ClaudeCodeCLIModel, ToolPreset
+
+
+class TestResolveTools:
+    """ツール設定解決のテスト"""
+
+    def test_allowed_tools_are_sorted(self) -> None:
+        """許可ツールの順序が決定的である（プロンプトキャッシュのため）"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5",
+            tool_preset=ToolPreset.SAFE,
+            allowed_tools=["WebFetch", "Bash"],
+        )
+
+        allowed, disallowed = model._resolve_tools(["mcp__custom__b", "mcp__custom__a"])
+
+        assert allowed == sorted(allowed)
+        assert "mcp__custom__a" in allowed
+        assert not set(allowed) & set(disallowed)
+
+    def test_disallowed_takes_precedence(self) -> None:
+        """disallowed_toolsが優先される"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5",
+            tool_preset=ToolPreset.WEB_ENABLED,
+            disallowed_tools=["WebSearch"],
+        )
+
+        allowed, disallowed = model._resolve_tools([])
+
+        assert allowed == ["WebFetch"]
+        assert disallowed == ["WebSearch"]
+
+    def test_custom_tools_disable_builtin_tools(self) -> None:
+        """カスタムツールのみの場合、組み込みツールを無効化する"""
+        model = ClaudeCodeCLIModel("claude-haiku-4-5")
+
+        allowed, disallowed = model._resolve_tools(["mcp__custom__add"])
+
+        assert allowed == ["mcp__custom__add"]
+        assert "Bash" in disallowed
@@ -0,0 +1,112 @@
+"""テスト: options モジュール（CLIオプションのテンプレート）"""
+
+import dataclasses
+
+import pytest
+
+from pydantic_claude_cli import ClaudeCodeCLIModel, ToolPreset
+from pydantic_claude_cli.options import DEFAULT_DISALLOWED_TOOLS, ClaudeCodeCLIOptions
+
+
+class TestClaudeCodeCLIOptions:
+    """ClaudeCodeCLIOptionsのテスト"""
+
+    def test_is_immutable(self):
+        """テンプレートは変更できないこと"""
+        template = ClaudeCodeCLIOptions.from_settings("claude-haiku-4-5")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            template.model = "other"  # type: ignore[misc]
+
+    def test_no_tools_allows_nothing(self):
+        """設定もカスタムツールもなければ何も許可・禁止しないこと"""
+        template = ClaudeCodeCLIOptions.from_settings("claude-haiku-4-5")
+
+        assert template.resolve_tools() == ((), ())
+
+    def test_custom_tools_only(self):
+        """カスタムツールのみなら名前順に許可し、組み込みツールを禁止すること"""
+        template = ClaudeCodeCLIOptions.from_settings("claude-haiku-4-5")
+
+        allowed, disallowed = template.resolve_tools(
+            ["mcp__custom__b", "mcp__custom__a"]
+        )
+
+        assert allowed == ("mcp__custom__a", "mcp__custom__b")
+        assert disallowed == DEFAULT_DISALLOWED_TOOLS
+
+    def test_preset_and_allowed_are_merged_and_sorted(self):
+        """プリセットとallowed_toolsとカスタムツールを名前順にマージすること"""
+        template = ClaudeCodeCLIOptions.from_settings(
+            "claude-haiku-4-5",
+            tool_preset=ToolPreset.WEB_ENABLED,
+            allowed_tools=["Read"],
+        )
+
+        allowed, disallowed = template.resolve_tools(["mcp__custom__x"])
+
+        assert allowed == ("Read", "WebFetch", "WebSearch", "mcp__custom__x")
+        assert not set(allowed) & set(disallowed)
+        assert list(disallowed) == sorted(disallowed)
+
+    def test_disallowed_is_sorted_and_wins(self):
+        """禁止ツールは名前順で、許可より優先されること"""
+        template = ClaudeCodeCLIOptions.from_settings(
+            "claude-haiku-4-5",
+            allowed_tools=["WebSearch", "Read"],
+            disallowed_tools=["WebSearch", "Bash"],
+        )
+
+        assert template.resolve_tools() == (("Read",), ("Bash", "WebSearch"))
+
+    def test_resolution_is_reused(self):
+        """同じカスタムツールの組の解決結果を再利用すること"""
+        template = ClaudeCodeCLIOptions.from_settings("claude-haiku-4-5")
+
+        first = template.resolve_tools(["mcp__custom__a", "mcp__custom__b"])
+        second = template.resolve_tools(["mcp__custom__b", "mcp__custom__a"])
+
+        assert first is second
+
+    def test_build_merges_request_fields(self):
+        """リクエストごとの値をマージしたオプションを作成すること"""
+        template = ClaudeCodeCLIOptions.from_settings(
+            "claude-haiku-4-5", max_turns=3, permission_mode="plan"
+        )
+
+        options = template.build(
+            system_prompt="sys",
+            mcp_servers={"custom": {"type": "sdk"}},
+            custom_tool_names=["mcp__custom__a"],
+            extra_args={"strict-mcp-config": None},
+        )
+
+        assert options.model == "claude-haiku-4-5"
+        assert options.max_turns == 3
+        assert options.permission_mode == "plan"
+        assert options.system_prompt == "sys"
+        assert options.mcp_servers == {"custom": {"type": "sdk"}}
+        assert options.allowed_tools == ["mcp__custom__a"]
+        assert options.extra_args == {"strict-mcp-config": None}
+
+    def test_build_returns_independent_lists(self):
+        """作成したオプションを変更してもテンプレートに影響しないこと"""
+        template = ClaudeCodeCLIOptions.from_settings("claude-haiku-4-5")
+
+        options = template.build(custom_tool_names=["mcp__custom__a"])
+        options.allowed_tools.append("Bash")
+        options.disallowed_tools.clear()
+
+        again = template.build(custom_tool_names=["mcp__custom__a"])
+        assert again.allowed_tools == ["mcp__custom__a"]
+        assert again.disallowed_tools == list(DEFAULT_DISALLOWED_TOOLS)
+
+    def test_model_compiles_template_once(self):
+        """モデルが作成時にテンプレートを計算すること"""
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5", tool_preset="safe", disallowed_tools=["Read"]
+        )
+
+        assert model.options_template == ClaudeCodeCLIOptions.from_settings(
+            "claude-haiku-4-5", tool_preset="safe", disallowed_tools=["Read"]
+        )
@@ -0,0 +1,148 @@
+"""テスト: provider モジュール（CLI検出のキャッシュ）"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from pydantic_claude_cli import provider as provider_module
+from pydantic_claude_cli.exceptions import ClaudeCLINotFoundError
+from pydantic_claude_cli.provider import (
+    DISCOVERY_CACHE_ENV,
+    ClaudeCodeCLIProvider,
+    clear_discovery_cache,
+)
+
+
+@pytest.fixture
+def cli_dir(tmp_path, monkeypatch):
+    """PATHに偽のclaudeを1つだけ置いた環境"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    cli = bin_dir / "claude"
+    cli.write_text("#!/bin/sh\n")
+    cli.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv(DISCOVERY_CACHE_ENV, raising=False)
+    clear_discovery_cache()
+    yield bin_dir
+    clear_discovery_cache()
+
+
+@pytest.fixture
+def which_calls(monkeypatch):
+    """shutil.whichの呼び出し回数を数える"""
+    calls = []
+    real_which = shutil.which
+
+    def counting_which(cmd, *args, **kwargs):
+        calls.append(cmd)
+        return real_which(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(provider_module.shutil, "which", counting_which)
+    return calls
+
+
+class TestDiscoveryCache:
+    """プロセス内のCLI検出キャッシュのテスト"""
+
+    def test_discovery_is_cached_across_providers(self, cli_dir, which_calls):
+        """2つ目以降のプロバイダーはCLIを検索しないこと"""
+        paths = {ClaudeCodeCLIProvider().cli_path for _ in range(100)}
+
+        assert paths == {str(cli_dir / "claude")}
+        assert len(which_calls) == 1
+
+    def test_replaced_binary_is_rediscovered(self, cli_dir, which_calls):
+        """バイナリが置き換えられると再検索すること"""
+        ClaudeCodeCLIProvider()
+        cli = cli_dir / "claude"
+        replacement = cli_dir / "claude.new"
+        replacement.write_text("#!/bin/sh\n# v2\n")
+        replacement.chmod(0o755)
+        os.replace(replacement, cli)
+
+        assert ClaudeCodeCLIProvider().cli_path == str(cli)
+        assert len(which_calls) == 2
+
+    def test_removed_binary_is_not_returned(self, cli_dir, monkeypatch):
+        """キャッシュ済みのバイナリが削除されるとキャッシュを使わないこと"""
+        ClaudeCodeCLIProvider()
+        (cli_dir / "claude").unlink()
+        monkeypatch.setattr(provider_module.Path, "exists", lambda self: False)
+
+        with pytest.raises(ClaudeCLINotFoundError):
+            ClaudeCodeCLIProvider()
+
+    def test_path_change_is_a_different_key(self, cli_dir, tmp_path, monkeypatch):
+        """PATHが変わると別のエントリとして検索すること"""
+        ClaudeCodeCLIProvider()
+        other = tmp_path / "other"
+        other.mkdir()
+        (other / "claude").write_text("#!/bin/sh\n")
+        (other / "claude").chmod(0o755)
+        monkeypatch.setenv("PATH", str(other))
+
+        assert ClaudeCodeCLIProvider().cli_path == str(other / "claude")
+
+    def test_explicit_cli_path_is_not_cached(self, cli_dir, tmp_path):
+        """明示的なcli_pathはキャッシュを経由しないこと"""
+        custom = tmp_path / "custom-claude"
+        custom.write_text("#!/bin/sh\n")
+
+        assert ClaudeCodeCLIProvider(cli_path=custom).cli_path == str(custom)
+        assert provider_module._discovery_cache == {}
+
+
+class TestDiskDiscoveryCache:
+    """ディスク上のCLI検出キャッシュのテスト"""
+
+    def test_disk_cache_is_shared_between_processes(
+        self, cli_dir, tmp_path, which_calls
+    ):
+        """プロセス内キャッシュが空でもディスクキャッシュから復元すること"""
+        cache_file = tmp_path / "cache" / "discovery.json"
+        ClaudeCodeCLIProvider(discovery_cache=cache_file)
+        clear_discovery_cache()  # 別プロセスを模擬
+
+        provider = ClaudeCodeCLIProvider(discovery_cache=cache_file)
+
+        assert provider.cli_path == str(cli_dir / "claude")
+        assert len(which_calls) == 1
+        entries = json.loads(cache_file.read_text())["entries"]
+        assert [e["path"] for e in entries.values()] == [str(cli_dir / "claude")]
+
+    def test_stale_disk_entry_is_ignored(self, cli_dir, tmp_path, which_calls):
+        """inode/mtimeが一致しないディスクのエントリは使わないこと"""
+        cache_file = tmp_path / "discovery.json"
+        ClaudeCodeCLIProvider(discovery_cache=cache_file)
+        clear_discovery_cache()
+        data = json.loads(cache_file.read_text())
+        for entry in data["entries"].values():
+            entry["mtime_ns"] -= 1
+        cache_file.write_text(json.dumps(data))
+
+        ClaudeCodeCLIProvider(discovery_cache=cache_file)
+
+        assert len(which_calls) == 2
+
+    def test_corrupt_disk_cache_is_ignored(self, cli_dir, tmp_path):
+        """壊れたキャッシュファイルは無視して上書きすること"""
+        cache_file = tmp_path / "discovery.json"
+        cache_file.write_text("not json")
+
+        provider = ClaudeCodeCLIProvider(discovery_cache=cache_file)
+
+        assert provider.cli_path == str(cli_dir / "claude")
+        assert json.loads(cache_file.read_text())["v"] == 1
+
+    def test_environment_variable(self, cli_dir, tmp_path, monkeypatch):
+        """環境変数でディスクキャッシュを指定できること"""
+        cache_file = tmp_path / "env-discovery.json"
+        monkeypatch.setenv(DISCOVERY_CACHE_ENV, str(cache_file))
+
+        ClaudeCodeCLIProvider()
+
+        assert cache_file.exists()
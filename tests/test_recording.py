@@ -0,0 +1,187 @@
+"""テスト: recording モジュール"""
+
+import time
+
+import pytest
+from pydantic_ai import Agent
+
+from pydantic_claude_cli import ClaudeCodeCLIModel, MessageRecorder, MessageReplayer
+from pydantic_claude_cli.exceptions import ClaudeCLIProcessError
+from pydantic_claude_cli.recording import Recording
+
+
+def _tool_call_recording(delay: float = 0.0) -> Recording:
+    """addツールを1回呼び出す記録"""
+    return Recording(
+        messages=[
+            (
+                0.0,
+                {
+                    "type": "control_request",
+                    "request_id": "req_tool",
+                    "request": {
+                        "subtype": "mcp_message",
+                        "server_name": "custom",
+                        "message": {
+                            "jsonrpc": "2.0",
+                            "id": 1,
+                            "method": "tools/call",
+                            "params": {"name": "add", "arguments": {"x": 17, "y": 25}},
+                        },
+                    },
+                },
+            ),
+            (
+                delay,
+                {
+                    "type": "assistant",
+                    "message": {
+                        "model": "claude-haiku-4-5",
+                        "content": [{"type": "text", "text": "42"}],
+                    },
+                },
+            ),
+            (
+                0.0,
+                {
+                    "type": "result",
+                    "subtype": "success",
+                    "duration_ms": 10,
+                    "duration_api_ms": 10,
+                    "is_error": False,
+                    "num_turns": 2,
+                    "session_id": "s",
+                    "usage": {"input_tokens": 3, "output_tokens": 1},
+                },
+            ),
+        ]
+    )
+
+
+def _write(path, *recordings: Recording) -> None:
+    path.write_text("".join(r.to_json() + "\n" for r in recordings))
+
+
+def _agent(calls: list, **kwargs) -> Agent:
+    model = ClaudeCodeCLIModel("claude-haiku-4-5", **kwargs)
+    agent = Agent(model)
+    model.set_agent_toolsets(agent._function_toolset)
+
+    @agent.tool_plain
+    def add(x: int, y: int) -> int:
+        """Add two numbers"""
+        calls.append((x, y))
+        return x + y
+
+    return agent
+
+
+class TestRecording:
+    """Recordingのシリアライズのテスト"""
+
+    def test_json_round_trip(self) -> None:
+        """JSONの1行に往復変換できる"""
+        recording = _tool_call_recording(0.5)
+
+        restored = Recording.from_json(recording.to_json())
+
+        assert restored == recording
+        assert "\n" not in recording.to_json()
+
+    def test_rejects_unknown_version(self) -> None:
+        """未知のフォーマットバージョンはエラー"""
+        with pytest.raises(ValueError):
+            Recording.from_json('{"v": 999, "messages": []}')
+
+
+class TestReplay:
+    """再生のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_replay_executes_tools(self, tmp_path) -> None:
+        """記録を同じrequestのコードパスで再生し、ツールも実行する"""
+        path = tmp_path / "run.jsonl"
+        _write(path, _tool_call_recording())
+        calls: list = []
+
+        result = await _agent(calls, replayer=MessageReplayer(path)).run("add")
+
+        assert result.output == "42"
+        assert calls == [(17, 25)]
+        assert result.usage().input_tokens == 3
+
+    @pytest.mark.asyncio
+    async def test_realtime_replay_keeps_timing(self, tmp_path) -> None:
+        """realtime=Trueでは記録時の間隔を再現する"""
+        path = tmp_path / "run.jsonl"
+        _write(path, _tool_call_recording(delay=0.4))
+        calls: list = []
+        agent = _agent(calls, replayer=MessageReplayer(path, realtime=True, speed=2))
+
+        start = time.perf_counter()
+        await agent.run("add")
+
+        assert time.perf_counter() - start >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_exhausted_without_loop(self, tmp_path) -> None:
+        """loop=Falseで記録を使い切るとエラー"""
+        path = tmp_path / "run.jsonl"
+        _write(path, _tool_call_recording())
+        agent = _agent([], replayer=MessageReplayer(path, loop=False))
+
+        await agent.run("add")
+        with pytest.raises(ClaudeCLIProcessError):
+            await agent.run("add")
+
+    def test_empty_file_is_rejected(self, tmp_path) -> None:
+        """記録のないファイルはエラー"""
+        path = tmp_path / "empty.jsonl"
+        path.write_text("")
+
+        with pytest.raises(ValueError):
+            MessageReplayer(path)
+
+
+class TestRecorder:
+    """記録のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_records_replayed_stream(self, tmp_path) -> None:
+        """トランスポートを流れたメッセージをgzipファイルに記録する"""
+        source = tmp_path / "source.jsonl"
+        _write(source, _tool_call_recording())
+        recorder = MessageRecorder(tmp_path / "copy.jsonl.gz")
+        agent = _agent([], replayer=MessageReplayer(source), recorder=recorder)
+
+        await agent.run("add")
+
+        copied = MessageReplayer(recorder.path).recordings
+        assert recorder.count == 1
+        assert [m for _, m in copied[0].messages] == [
+            m for _, m in _tool_call_recording().messages
+        ]
+
+    @pytest.mark.asyncio
+    async def test_save_runs_in_worker_thread(self, tmp_path, monkeypatch) -> None:
+        """記録ファイルの書き込みはイベントループのスレッドで行わない"""
+        import threading
+
+        source = tmp_path / "source.jsonl"
+        _write(source, _tool_call_recording())
+        recorder = MessageRecorder(tmp_path / "copy.jsonl")
+        threads = []
+        save = recorder.save
+
+        def record(recording):
+            threads.append(threading.current_thread())
+            save(recording)
+
+        monkeypatch.setattr(recorder, "save", record)
+        agent = _agent([], replayer=MessageReplayer(source), recorder=recorder)
+
+        await agent.run("add")
+
+        assert recorder.count == 1
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
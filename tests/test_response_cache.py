@@ -0,0 +1,253 @@
+"""テスト: response_cache モジュール"""
+
+import pytest
+from claude_code_sdk.types import AssistantMessage, ResultMessage, TextBlock
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.usage import RequestUsage
+
+import pydantic_claude_cli.model as model_module
+from pydantic_claude_cli import ClaudeCodeCLIModel, ResponseCache
+from pydantic_claude_cli.response_cache import make_cache_key
+
+
+def _response(text: str = "ok") -> ModelResponse:
+    return ModelResponse(
+        parts=[TextPart(content=text)],
+        usage=RequestUsage(input_tokens=10, output_tokens=2),
+        model_name="claude-haiku-4-5",
+    )
+
+
+def _key(prompt: str = "Hi", **kwargs) -> str:
+    return make_cache_key(
+        model_name="claude-haiku-4-5", system_prompt=None, prompt=prompt, **kwargs
+    )
+
+
+class TestMakeCacheKey:
+    """キャッシュキー生成のテスト"""
+
+    def test_same_request_same_key(self) -> None:
+        """同一リクエストは同一キー"""
+        assert _key() == _key()
+
+    def test_key_covers_prompt_and_settings(self) -> None:
+        """プロンプトや設定が変わるとキーも変わる"""
+        assert _key("Hi") != _key("Hello")
+        assert _key(settings={"max_turns": 1}) != _key(settings={"max_turns": 2})
+
+    def test_settings_order_does_not_matter(self) -> None:
+        """設定の順序はキーに影響しない"""
+        assert _key(settings={"a": 1, "b": 2}) == _key(settings={"b": 2, "a": 1})
+
+
+class TestResponseCache:
+    """ResponseCacheのテスト"""
+
+    def test_hit_and_miss(self) -> None:
+        """ヒット/ミスを記録し、ヒット時は使用量を0にする"""
+        cache = ResponseCache()
+
+        assert cache.get("k") is None
+        cache.put("k", _response())
+        cached = cache.get("k")
+
+        assert cached is not None
+        assert cached.parts == [TextPart(content="ok")]
+        assert cached.usage == RequestUsage()
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert cache.stats.hit_rate == 0.5
+
+    def test_lru_eviction(self) -> None:
+        """最も古く使われたエントリから破棄する"""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", _response("a"))
+        cache.put("b", _response("b"))
+        cache.get("a")
+        cache.put("c", _response("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats.evictions == 1
+
+    def test_ttl_expiration(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """TTLを過ぎたエントリは返さない"""
+        now = 1000.0
+        monkeypatch.setattr("pydantic_claude_cli.response_cache.time.time", lambda: now)
+        cache = ResponseCache(ttl=10)
+        cache.put("k", _response())
+
+        now += 11
+
+        assert cache.get("k") is None
+        assert cache.stats.expirations == 1
+
+    def test_disk_tier_survives_new_instance(self, tmp_path) -> None:
+        """ディスク層はインスタンスをまたいで共有される"""
+        path = tmp_path / "cache.sqlite"
+        first = ResponseCache(disk_path=path)
+        first.put("k", _response("persisted"))
+        first.close()
+
+        second = ResponseCache(disk_path=path)
+        cached = second.get("k")
+
+        assert cached is not None
+        assert cached.parts == [TextPart(content="persisted")]
+        assert second.stats.disk_hits == 1
+        assert len(second) == 1
+
+    def test_invalid_arguments(self) -> None:
+        """不正な引数はValueError"""
+        with pytest.raises(ValueError):
+            ResponseCache(max_entries=0)
+        with pytest.raises(ValueError):
+            ResponseCache(ttl=0)
+
+
+class _FakeClient:
+    """CLIを起動せずに固定レスポンスを返すClaudeCLIClient"""
+
+    calls = 0
+
+    def __init__(self, options, **kwargs) -> None:
+        self.options = options
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def query(self, prompt) -> None:
+        type(self).calls += 1
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="positive")], model="m")
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            usage={"input_tokens": 5, "output_tokens": 1},
+        )
+
+
+class TestModelResponseCache:
+    """ClaudeCodeCLIModelとの統合テスト"""
+
+    @pytest.mark.asyncio
+    async def test_identical_request_skips_cli(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """同一リクエストの2回目はCLIを実行しない"""
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        _FakeClient.calls = 0
+        cache = ResponseCache()
+        agent = Agent(
+            ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=cache),
+            instructions="Classify sentiment",
+        )
+
+        first = await agent.run("great product")
+        second = await agent.run("great product")
+        await agent.run("terrible product")
+
+        assert first.output == second.output == "positive"
+        assert _FakeClient.calls == 2
+        assert cache.stats.hits == 1
+        assert second.usage().input_tokens == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_write_error_keeps_response(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """キャッシュへの書き込みに失敗してもレスポンスを返す"""
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        cache = ResponseCache()
+
+        def broken_put(key, response) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(cache, "put", broken_put)
+        agent = Agent(ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=cache))
+
+        result = await agent.run("great product")
+
+        assert result.output == "positive"
+
+    @pytest.mark.asyncio
+    async def test_unreadable_disk_tier_is_a_miss(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path, caplog
+    ) -> None:
+        """ディスク層が破損して読み書きできなくても、ミスとしてCLIを実行する"""
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        _FakeClient.calls = 0
+        path = tmp_path / "cache.sqlite"
+        cache = ResponseCache(disk_path=path)
+        path.write_bytes(b"not a sqlite database" * 512)
+        agent = Agent(ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=cache))
+
+        result = await agent.run("great product")
+
+        assert result.output == "positive"
+        assert _FakeClient.calls == 1
+        assert "Response cache lookup failed" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_runs_in_worker_thread(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path
+    ) -> None:
+        """ディスク層の読み書きはイベントループのスレッドで行わない"""
+        import threading
+
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        cache = ResponseCache(disk_path=tmp_path / "cache.sqlite")
+        threads = []
+        for name in ("get", "put"):
+            method = getattr(cache, name)
+
+            def record(*args, _method=method):
+                threads.append(threading.current_thread())
+                return _method(*args)
+
+            monkeypatch.setattr(cache, name, record)
+        agent = Agent(ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=cache))
+
+        await agent.run("great product")
+        await agent.run("great product")
+
+        assert len(threads) == 3
+        assert threading.current_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_hit_does_not_create_mcp_server(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """キャッシュヒット時はカスタムツールのMCPサーバーを作成しない"""
+        import pydantic_claude_cli.tool_converter as tool_converter
+
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        created = []
+        original = tool_converter.create_mcp_from_tools
+
+        def counting_create(*args, **kwargs):
+            created.append(1)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(tool_converter, "create_mcp_from_tools", counting_create)
+        model = ClaudeCodeCLIModel("claude-haiku-4-5", response_cache=ResponseCache())
+        agent = Agent(model)
+        model.set_agent_toolsets(agent._function_toolset)
+
+        @agent.tool_plain
+        def lookup(query: str) -> str:
+            return query
+
+        await agent.run("great product")
+        await agent.run("great product")
+
+        assert len(created) == 1
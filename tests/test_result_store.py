@@ -0,0 +1,218 @@
+"""テスト: result_store モジュール（大きなツール結果の退避）"""
+
+import pytest
+
+from pydantic_claude_cli.result_store import READ_RESULT_TOOL_NAME, ToolResultStore
+
+# 索引の境界をまたぐマルチバイト文字を含むテキスト
+TEXT = "".join(f"{i:05d}あ🙂\n" for i in range(3000))
+
+
+class TestToolResultStore:
+    """退避と読み出しのテスト"""
+
+    def test_read_slices_match_original(self, tmp_path):
+        """任意の範囲を元のテキストと同じ内容で読み出せること"""
+        store = ToolResultStore(10, page_chars=5000, directory=tmp_path)
+        handle = store.spill("search", TEXT)
+
+        for offset, limit in [(0, 10), (4090, 20), (12345, 5000), (len(TEXT) - 3, 10)]:
+            assert store.read(handle, offset, limit) == TEXT[offset : offset + limit]
+
+    def test_limit_is_capped_by_page_size(self, tmp_path):
+        """1度に読み出せるのはpage_chars文字まで"""
+        store = ToolResultStore(10, page_chars=100, directory=tmp_path)
+        handle = store.spill("search", TEXT)
+
+        assert len(store.read(handle, 0, 10_000)) == 100
+
+    def test_read_page_footer(self, tmp_path):
+        """続きの位置と終端を案内すること"""
+        store = ToolResultStore(10, page_chars=100, directory=tmp_path)
+        handle = store.spill("search", "x" * 150)
+
+        first = store.read_page(handle, 0)
+        last = store.read_page(handle, 100)
+
+        assert first.endswith(
+            f"[characters 0-100 of 150; call {READ_RESULT_TOOL_NAME} "
+            "with offset=100 to continue]"
+        )
+        assert last == "x" * 50 + "\n[characters 100-150 of 150; end of result]"
+
+    def test_read_page_past_end(self, tmp_path):
+        """終端以降のoffsetは範囲外であることを案内すること"""
+        store = ToolResultStore(10, page_chars=100, directory=tmp_path)
+        handle = store.spill("search", "x" * 150)
+
+        for offset in (150, 1000):
+            assert store.read_page(handle, offset) == (
+                f"[offset {offset} is past the end of the result (150 characters); "
+                f"call {READ_RESULT_TOOL_NAME} with an offset below 150]"
+            )
+
+    def test_unknown_handle(self, tmp_path):
+        """存在しないハンドルは利用可能なハンドルを案内すること"""
+        store = ToolResultStore(10, directory=tmp_path)
+        store.spill("search", TEXT)
+
+        assert store.read_page("nope") == (
+            "Unknown result handle 'nope'. Available handles: search-1."
+        )
+
+    def test_small_results_are_not_spilled(self, tmp_path):
+        """閾値以下の結果とエラー結果はそのまま返すこと"""
+        store = ToolResultStore(100, directory=tmp_path)
+        small = {"content": [{"type": "text", "text": "ok"}]}
+        error = {"content": [{"type": "text", "text": "e" * 500}], "is_error": True}
+
+        assert store.maybe_spill("search", small) is small
+        assert store.maybe_spill("search", error) is error
+        assert len(store) == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_large_result_is_replaced_with_handle(self, tmp_path):
+        """閾値を超える結果はプレビューとハンドルに置き換えること"""
+        store = ToolResultStore(100, directory=tmp_path)
+
+        result = store.maybe_spill(
+            "search", {"content": [{"type": "text", "text": TEXT}]}
+        )
+
+        summary = result["content"][0]["text"]
+        assert "handle 'search-1'" in summary
+        assert f"({len(TEXT)} characters)" in summary
+        assert len(summary) < 3000
+        assert store.read("search-1", 0, len(TEXT)) == TEXT[: store.page_chars]
+
+    def test_close_removes_files(self, tmp_path):
+        """close()で退避したファイルを削除すること"""
+        with ToolResultStore(10, directory=tmp_path) as store:
+            store.spill("search", TEXT)
+            assert list(tmp_path.iterdir())
+
+        assert list(tmp_path.iterdir()) == []
+        assert len(store) == 0
+
+    def test_least_recently_used_results_are_evicted(self, tmp_path):
+        """max_resultsを超えると最近読み出していない結果のファイルを削除すること"""
+        store = ToolResultStore(10, directory=tmp_path, max_results=2)
+        first = store.spill("search", "a" * 20)
+        second = store.spill("search", "b" * 20)
+        store.read(first)
+        third = store.spill("search", "c" * 20)
+
+        assert len(store) == 2
+        assert store.read(first) == "a" * 20
+        assert store.read(third) == "c" * 20
+        with pytest.raises(KeyError):
+            store.read(second)
+        # 削除した結果の番号は再利用しない
+        assert third == "search-3"
+        assert len(list(next(tmp_path.iterdir()).iterdir())) == 2
+
+    def test_expired_results_are_evicted(self, tmp_path, monkeypatch):
+        """ttlを過ぎた結果のファイルを削除すること"""
+        from pydantic_claude_cli import result_store as result_store_module
+
+        now = [1000.0]
+        monkeypatch.setattr(result_store_module.time, "monotonic", lambda: now[0])
+        store = ToolResultStore(10, directory=tmp_path, ttl=60)
+        old = store.spill("search", "a" * 20)
+        now[0] += 30
+        recent = store.spill("search", "b" * 20)
+        now[0] += 40
+
+        assert store.read_page(old) == (
+            f"Unknown result handle '{old}'. Available handles: {recent}."
+        )
+        assert store.read(recent) == "b" * 20
+        assert len(list(next(tmp_path.iterdir()).iterdir())) == 1
+
+    def test_private_handles(self, tmp_path):
+        """private_handlesではハンドルを推測・列挙できないこと"""
+        store = ToolResultStore(10, directory=tmp_path, private_handles=True)
+        handle = store.spill("search", TEXT)
+
+        assert handle.startswith("search-1-")
+        assert store.read(handle, 0, 10) == TEXT[:10]
+        assert store.read_page("search-1") == (
+            "Unknown or expired result handle 'search-1'."
+        )
+
+    def test_invalid_threshold(self):
+        """正でない閾値はエラー"""
+        with pytest.raises(ValueError):
+            ToolResultStore(0)
+
+    @pytest.mark.parametrize("kwargs", [{"max_results": 0}, {"ttl": 0}])
+    def test_invalid_retention(self, kwargs):
+        """正でない保持数・期間はエラー"""
+        with pytest.raises(ValueError):
+            ToolResultStore(10, **kwargs)
+
+
+def dump() -> str:
+    return TEXT
+
+
+class TestPaginationTool:
+    """MCPサーバーへのread_tool_resultツールの登録のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_spill_and_read_through_mcp(self, tmp_path, tool_server, call_tool):
+        """大きな結果を退避し、read_tool_resultで読み出せること"""
+        store = ToolResultStore(1000, page_chars=500, directory=tmp_path)
+        server = tool_server(dump, result_store=store)
+
+        summary = (await call_tool(server, "dump")).content[0].text
+        page = await call_tool(
+            server, READ_RESULT_TOOL_NAME, {"handle": "dump-1", "offset": 1000}
+        )
+        page = page.content[0].text
+
+        assert "handle 'dump-1'" in summary
+        assert page.startswith(TEXT[1000:1500])
+        assert "offset=1500" in page
+
+    @pytest.mark.asyncio
+    async def test_file_io_runs_in_worker_thread(
+        self, tmp_path, monkeypatch, tool_server, call_tool
+    ):
+        """退避と読み出しのファイルIOはイベントループのスレッドで行わないこと"""
+        import threading
+
+        store = ToolResultStore(1000, page_chars=500, directory=tmp_path)
+        server = tool_server(dump, result_store=store)
+        threads = []
+        for name in ("maybe_spill", "read_page"):
+            method = getattr(store, name)
+
+            def record(*args, _method=method):
+                threads.append(threading.current_thread())
+                return _method(*args)
+
+            monkeypatch.setattr(store, name, record)
+
+        await call_tool(server, "dump")
+        await call_tool(server, READ_RESULT_TOOL_NAME, {"handle": "dump-1"})
+
+        assert len(threads) == 2
+        assert threading.current_thread() not in threads
+
+    def test_model_does_not_spill_by_default(self):
+        """モデルの既定では結果を退避しないこと"""
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        assert ClaudeCodeCLIModel("claude-haiku-4-5")._max_tool_result_chars is None
+
+    @pytest.mark.asyncio
+    async def test_not_registered_without_store(
+        self, tool_server, call_tool, list_tools
+    ):
+        """ストアを指定しない場合は登録せず、結果もそのまま返すこと"""
+        server = tool_server(dump, result_store=None)
+        tools = await list_tools(server)
+
+        assert [tool.name for tool in tools] == ["dump"]
+        assert (await call_tool(server, "dump")).content[0].text == TEXT
@@ -0,0 +1,157 @@
+"""テスト: single_flight モジュール（同一呼び出しの集約）"""
+
+import anyio
+import pytest
+
+from pydantic_claude_cli.single_flight import SINGLE_FLIGHT, SingleFlight
+from pydantic_claude_cli.tool_options import ToolOptions
+
+
+class TestSingleFlight:
+    """SingleFlightのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """同じキーの並行呼び出しは1回だけ実行すること"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await anyio.sleep(0.05)
+            return "rate"
+
+        results = []
+
+        async def call():
+            results.append(await flight.do("usd", fetch))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(10):
+                tg.start_soon(call)
+
+        assert results == ["rate"] * 10
+        assert calls == [1]
+        assert (flight.stats.executions, flight.stats.coalesced) == (1, 9)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """キーが異なる呼び出しは集約しないこと"""
+        flight = SingleFlight()
+
+        async def fetch():
+            await anyio.sleep(0.01)
+            return 1
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(flight.do, "a", fetch)
+            tg.start_soon(flight.do, "b", fetch)
+
+        assert flight.stats.executions == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_memoized(self):
+        """完了した結果は保持しないこと"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("k", fetch) == 1
+        assert await flight.do("k", fetch) == 2
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared(self):
+        """実行中の呼び出しの例外を待機側にも送出すること"""
+        flight = SingleFlight()
+        errors = []
+
+        async def fail():
+            await anyio.sleep(0.02)
+            raise RuntimeError("backend down")
+
+        async def call():
+            try:
+                await flight.do("k", fail)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(call)
+
+        assert errors == ["backend down"] * 3
+        assert flight.stats.executions == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_retries_when_leader_is_cancelled(self):
+        """実行側がキャンセルされた場合、待機側が実行し直すこと"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await anyio.sleep(0.05)
+            return "ok"
+
+        results = []
+
+        async def waiter():
+            await anyio.sleep(0.01)
+            results.append(await flight.do("k", fetch))
+
+        async with anyio.create_task_group() as tg:
+            with anyio.move_on_after(0.02):
+                async with anyio.create_task_group() as leader:
+                    leader.start_soon(flight.do, "k", fetch)
+                    tg.start_soon(waiter)
+                    await anyio.sleep(1)
+
+        assert results == ["ok"]
+        assert len(calls) == 2
+
+
+CURRENCY_SCHEMA = {
+    "type": "object",
+    "properties": {"currency": {"type": "string"}},
+    "required": ["currency"],
+}
+
+
+class TestSingleFlightTools:
+    """MCPツール呼び出しでの集約のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_coalesced_across_servers(self, tool_server, call_tool):
+        """別々のMCPサーバー（エージェントの実行）からの同じ呼び出しを集約すること"""
+        calls = []
+
+        async def get_exchange_rate(currency: str) -> str:
+            calls.append(currency)
+            await anyio.sleep(0.05)
+            return f"{currency}=1.0"
+
+        options = ToolOptions(single_flight=True)
+        servers = [
+            tool_server(get_exchange_rate, CURRENCY_SCHEMA, options=options)
+            for _ in range(5)
+        ]
+        results = []
+
+        async def call(server, currency):
+            result = await call_tool(
+                server, "get_exchange_rate", {"currency": currency}
+            )
+            results.append(result.content[0].text)
+
+        async with anyio.create_task_group() as tg:
+            for server in servers:
+                tg.start_soon(call, server, "USD")
+            tg.start_soon(call, servers[0], "EUR")
+
+        assert sorted(calls) == ["EUR", "USD"]
+        assert sorted(results) == ["EUR=1.0"] + ["USD=1.0"] * 5
+        assert len(SINGLE_FLIGHT) == 0
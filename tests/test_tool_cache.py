@@ -0,0 +1,183 @@
+"""テスト: tool_cache モジュール（ツール結果のメモ化）"""
+
+import pytest
+
+from pydantic_claude_cli import tool_cache as tool_cache_module
+from pydantic_claude_cli.tool_cache import ToolResultCache, make_tool_cache_key
+from pydantic_claude_cli.tool_options import ToolOptions
+
+
+def _result(text):
+    return {"content": [{"type": "text", "text": text}]}
+
+
+class TestMakeToolCacheKey:
+    """キャッシュキーのテスト"""
+
+    def test_argument_order_is_ignored(self):
+        """引数の順序が異なっても同じキーになること"""
+        assert make_tool_cache_key("t", {"a": 1, "b": [1, 2]}) == make_tool_cache_key(
+            "t", {"b": [1, 2], "a": 1}
+        )
+
+    def test_tool_name_and_deps_are_part_of_key(self):
+        """ツール名・依存性が異なれば別のキーになること"""
+        base = make_tool_cache_key("t", {"a": 1})
+
+        assert make_tool_cache_key("u", {"a": 1}) != base
+        assert make_tool_cache_key("t", {"a": 1}, deps_fingerprint='{"x":1}') != base
+
+    def test_models_are_canonicalized(self):
+        """Pydanticモデルの引数はフィールドの値でキーになること"""
+        from pydantic import BaseModel
+
+        class Query(BaseModel):
+            text: str
+
+        assert make_tool_cache_key("t", {"q": Query(text="a")}) == make_tool_cache_key(
+            "t", {"q": {"text": "a"}}
+        )
+
+
+class TestToolResultCache:
+    """LRU・TTL・統計のテスト"""
+
+    def test_hit_and_miss(self):
+        """保存した結果を返し、統計を記録すること"""
+        cache = ToolResultCache()
+
+        assert cache.get("k") is None
+        cache.put("k", _result("v"))
+
+        assert cache.get("k") == _result("v")
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert cache.stats.hit_rate == 0.5
+
+    def test_returns_copy(self):
+        """取得した結果を変更してもキャッシュに影響しないこと"""
+        cache = ToolResultCache()
+        cache.put("k", _result("v"))
+
+        cache.get("k")["content"][0]["text"] = "changed"
+
+        assert cache.get("k") == _result("v")
+
+    def test_lru_eviction(self):
+        """上限を超えると最も古く使われたエントリを破棄すること"""
+        cache = ToolResultCache(max_entries=2)
+        cache.put("a", _result("a"))
+        cache.put("b", _result("b"))
+        cache.get("a")
+        cache.put("c", _result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats.evictions == 1
+
+    def test_ttl_expiration(self, monkeypatch):
+        """有効期間を過ぎたエントリは返さないこと"""
+        now = [1000.0]
+        monkeypatch.setattr(tool_cache_module.time, "monotonic", lambda: now[0])
+        cache = ToolResultCache(ttl=10)
+        cache.put("k", _result("v"))
+
+        now[0] += 11
+
+        assert cache.get("k") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+    @pytest.mark.parametrize("kwargs", [{"max_entries": 0}, {"ttl": 0}])
+    def test_invalid_arguments(self, kwargs):
+        """不正な設定はエラー"""
+        with pytest.raises(ValueError):
+            ToolResultCache(**kwargs)
+
+
+KEY_SCHEMA = {
+    "type": "object",
+    "properties": {"key": {"type": "integer"}},
+    "required": ["key"],
+}
+
+
+class TestCachedToolCalls:
+    """MCPツール呼び出しでのキャッシュのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_is_served_from_cache(self, tool_server, call_tool):
+        """同じ引数の2回目以降はツールを実行しないこと"""
+        calls = []
+
+        def lookup(key: int) -> str:
+            calls.append(key)
+            return f"value-{key}"
+
+        cache = ToolResultCache()
+        server = tool_server(lookup, KEY_SCHEMA, options=ToolOptions(cache=cache))
+
+        first = await call_tool(server, "lookup", {"key": 1})
+        second = await call_tool(server, "lookup", {"key": 1})
+        await call_tool(server, "lookup", {"key": 2})
+
+        assert first.content[0].text == second.content[0].text == "value-1"
+        assert calls == [1, 2]
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_shared_across_servers(self, tool_server, call_tool):
+        """キャッシュは実行（MCPサーバー）をまたいで共有されること"""
+        calls = []
+
+        def lookup(key: int) -> str:
+            calls.append(key)
+            return "v"
+
+        options = ToolOptions(cache=ToolResultCache())
+        for _ in range(2):
+            server = tool_server(lookup, KEY_SCHEMA, options=options)
+            await call_tool(server, "lookup", {"key": 1})
+
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, tool_server, call_tool):
+        """エラー結果はキャッシュしないこと"""
+        calls = []
+
+        def lookup(key: int) -> str:
+            calls.append(key)
+            raise RuntimeError("temporary")
+
+        server = tool_server(
+            lookup, KEY_SCHEMA, options=ToolOptions(cache=ToolResultCache())
+        )
+        await call_tool(server, "lookup", {"key": 1})
+        result = await call_tool(server, "lookup", {"key": 1})
+
+        assert result.isError
+        assert calls == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_deps_are_part_of_key(self, tool_server, call_tool):
+        """RunContext依存のツールは依存性が異なれば再実行すること"""
+        from pydantic_ai.tools import RunContext
+
+        calls = []
+
+        def lookup(ctx: RunContext[str], key: int) -> str:
+            calls.append(ctx.deps)
+            return f"{ctx.deps}-{key}"
+
+        cache = ToolResultCache()
+        for deps in ('"a"', '"a"', '"b"'):
+            server = tool_server(
+                lookup,
+                KEY_SCHEMA,
+                options=ToolOptions(cache=cache),
+                deps_data=deps,
+                deps_type=str,
+            )
+            await call_tool(server, "lookup", {"key": 1})
+
+        assert calls == ["a", "b"]
@@ -3,6 +3,8 @@
 Article 3 (テストファースト) に従って、実装前にテストを作成。
 """
 
+from typing import Any
+
 import pytest
 
 from pydantic_claude_cli.tool_converter import (
@@ -145,6 +147,54 @@ class TestFormatToolResult:
         # assert result["content"][0]["text"] == "None"
 
 
+class TestFormatStructuredResult:
+    """構造化・バイナリ結果の変換のテスト"""
+
+    def test_model_is_serialized_as_json(self) -> None:
+        """PydanticモデルはreprではなくJSONになる"""
+        from pydantic import BaseModel
+
+        class Item(BaseModel):
+            name: str
+            price: float
+
+        result = format_tool_result([Item(name="a", price=1.5)])
+
+        assert result == {
+            "content": [{"type": "text", "text": '[{"name":"a","price":1.5}]'}]
+        }
+
+    def test_unserializable_value_falls_back_to_str(self) -> None:
+        """JSONに変換できない値はstr()になる"""
+
+        class Opaque:
+            def __str__(self) -> str:
+                return "opaque"
+
+        result = format_tool_result({"value": Opaque()})
+
+        assert result["content"][0]["text"] == '{"value":"opaque"}'
+
+    def test_image_binary_content(self) -> None:
+        """画像のBinaryContentはimageブロックになる"""
+        from pydantic_ai.messages import BinaryContent
+
+        result = format_tool_result(BinaryContent(b"\x89PNG", media_type="image/png"))
+
+        assert result == {
+            "content": [{"type": "image", "data": "iVBORw==", "mimeType": "image/png"}]
+        }
+
+    def test_bytes_become_embedded_resource(self) -> None:
+        """bytes（memoryviewを含む）は埋め込みリソースになる"""
+        result = format_tool_result(memoryview(b"abc"))
+
+        (block,) = result["content"]
+        assert block["type"] == "resource"
+        assert block["resource"]["blob"] == "YWJj"
+        assert block["resource"]["mimeType"] == "application/octet-stream"
+
+
 class TestCreateMcpFromTools:
     """MCPサーバー作成のテスト"""
 
@@ -246,6 +296,289 @@ class TestCreateMcpFromTools:
         pytest.skip("Covered by integration test")
 
 
+# 可変長位置引数を持つ関数には引数の検証器を作成しないため、
+# 引数はJSON Schemaで検証される
+def search(*_: Any, mode: str, address: dict, limit: int = 10) -> str:
+    return f"{mode}:{address['city']}:{limit}"
+
+
+class TestJsonSchemaPassThrough:
+    """MCPツール定義へのJSON Schemaの受け渡しのテスト"""
+
+    SCHEMA = {
+        "$defs": {
+            "Address": {
+                "properties": {
+                    "city": {"type": "string"},
+                    "zip": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+                },
+                "required": ["city"],
+                "type": "object",
+            }
+        },
+        "additionalProperties": False,
+        "properties": {
+            "mode": {"enum": ["fast", "slow"], "type": "string"},
+            "address": {"$ref": "#/$defs/Address"},
+            "limit": {"default": 10, "description": "Max items", "type": "integer"},
+        },
+        "required": ["mode", "address"],
+        "type": "object",
+    }
+
+    @pytest.fixture
+    def server(self, tool_server):
+        return tool_server(search, self.SCHEMA, description="Search")
+
+    @pytest.mark.asyncio
+    async def test_schema_is_unchanged(self, server, list_tools) -> None:
+        """enum、ネスト、デフォルト値、説明、必須項目を保持する"""
+        tools = await list_tools(server)
+
+        assert len(tools) == 1
+        assert tools[0].inputSchema == self.SCHEMA
+
+    @pytest.mark.asyncio
+    async def test_list_tools_is_precomputed(self, server, list_tools) -> None:
+        """ツール一覧はサーバー作成時に計算済みである"""
+        first = await list_tools(server)
+        second = await list_tools(server)
+
+        assert first[0] is second[0]
+
+    @pytest.mark.asyncio
+    async def test_optional_parameter_with_default(self, server, call_tool) -> None:
+        """デフォルト値のある引数は省略できる"""
+        result = await call_tool(
+            server, "search", {"mode": "fast", "address": {"city": "Tokyo"}}
+        )
+
+        assert not result.isError
+        assert result.content[0].text == "fast:Tokyo:10"
+
+    @pytest.mark.asyncio
+    async def test_enum_violation_is_rejected(self, server, call_tool) -> None:
+        """enumに含まれない値はスキーマ検証でエラーになる"""
+        result = await call_tool(
+            server, "search", {"mode": "bad", "address": {"city": "Tokyo"}}
+        )
+
+        assert result.isError
+        assert "fast" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_nested_violation_is_rejected(self, server, call_tool) -> None:
+        """$refで参照されるネストしたオブジェクトも検証する"""
+        result = await call_tool(
+            server, "search", {"mode": "fast", "address": {"zip": "1"}}
+        )
+
+        assert result.isError
+        assert result.content[0].text == (
+            "Invalid arguments for tool 'search':\n"
+            "- address: 'city' is a required property\n"
+            "Fix the errors and try again."
+        )
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool(self, server, call_tool) -> None:
+        """存在しないツールはエラーになる"""
+        result = await call_tool(server, "missing", {})
+
+        assert result.isError
+        assert "missing" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_schema_error_is_error_result(self, call_tool) -> None:
+        """スキーマ検証のエラーはプロトコルエラーではなくisErrorの結果として返る"""
+        from claude_code_sdk import SdkMcpTool
+        from mcp import types
+        from pydantic_claude_cli.mcp_server_fixed import create_fixed_sdk_mcp_server
+
+        calls = []
+
+        async def handler(args):
+            calls.append(args)
+            return {"content": []}
+
+        server = create_fixed_sdk_mcp_server(
+            "test", tools=[SdkMcpTool("search", "Search", self.SCHEMA, handler)]
+        )
+        result = await call_tool(server, "search", {"mode": "bad"})
+
+        assert isinstance(result, types.CallToolResult)
+        assert result.isError
+        assert result.content[0].text == (
+            "Invalid arguments for tool 'search':\n"
+            "- (arguments): 'address' is a required property\n"
+            "- mode: 'bad' is not one of ['fast', 'slow']\n"
+            "Fix the errors and try again."
+        )
+        assert calls == []
+
+    def test_dispatch_table_is_read_only(self) -> None:
+        """ディスパッチテーブルは作成後に変更できない"""
+        from claude_code_sdk import SdkMcpTool
+        from pydantic_claude_cli.mcp_server_fixed import _build_dispatch
+
+        async def handler(args):
+            return {"content": []}
+
+        dispatch = _build_dispatch(
+            [SdkMcpTool("search", "Search", self.SCHEMA, handler)]
+        )
+
+        assert dispatch["search"].tool.inputSchema == self.SCHEMA
+        with pytest.raises(TypeError):
+            dispatch["other"] = dispatch["search"]  # type: ignore[index]
+
+    def test_empty_schema_becomes_object(self) -> None:
+        """空のスキーマは引数なしのオブジェクトになる"""
+        from pydantic_claude_cli.mcp_server_fixed import to_json_schema
+
+        assert to_json_schema({}) == {"type": "object", "properties": {}}
+
+    def test_type_mapping_is_converted(self) -> None:
+        """型マッピングは全パラメータ必須のJSON Schemaに変換する"""
+        from pydantic_claude_cli.mcp_server_fixed import to_json_schema
+
+        assert to_json_schema({"x": int, "name": str}) == {
+            "type": "object",
+            "properties": {"x": {"type": "integer"}, "name": {"type": "string"}},
+            "required": ["x", "name"],
+        }
+
+
+class TestArgumentValidation:
+    """ツール関数のシグネチャによる引数の検証・変換のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_nested_model_is_passed_as_instance(
+        self, tool_server, call_tool
+    ) -> None:
+        """ネストしたモデルはdictではなくモデルのインスタンスとして渡される"""
+        from pydantic import BaseModel, TypeAdapter
+
+        class Address(BaseModel):
+            city: str
+
+        def locate(address: Address, zoom: int = 1) -> str:
+            return f"{type(address).__name__}:{address.city}:{zoom}"
+
+        # pydantic-aiと同様に、スキーマは関数のシグネチャから作成する
+        server = tool_server(locate, TypeAdapter(locate).json_schema())
+        result = await call_tool(
+            server, "locate", {"address": {"city": "Tokyo"}, "zoom": 3}
+        )
+
+        assert not result.isError
+        assert result.content[0].text == "Address:Tokyo:3"
+
+    @pytest.mark.asyncio
+    async def test_arguments_are_coerced_not_rejected_by_schema(
+        self, tool_server, call_tool
+    ) -> None:
+        """検証器のあるツールはJSON Schemaで拒否せず、pydanticで変換する"""
+        from pydantic import TypeAdapter
+
+        def echo(x: int) -> str:
+            return f"{type(x).__name__}:{x}"
+
+        # スキーマはx: integer、additionalProperties: false
+        server = tool_server(echo, TypeAdapter(echo).json_schema())
+        result = await call_tool(server, "echo", {"x": "5", "unexpected": True})
+
+        assert not result.isError
+        assert result.content[0].text == "int:5"
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments_do_not_call_tool(
+        self, tool_server, call_tool
+    ) -> None:
+        """シグネチャに合わない引数ではツールを実行せず再試行メッセージを返す"""
+        calls = []
+
+        def ratio(x: int, y: int) -> float:
+            calls.append((x, y))
+            return x / y
+
+        # シグネチャと異なる（緩い）スキーマで登録する
+        result = await call_tool(tool_server(ratio), "ratio", {"x": "ten"})
+
+        assert result.isError
+        assert result.content[0].text == (
+            "Invalid arguments for tool 'ratio':\n"
+            "- x: Input should be a valid integer, unable to parse string as an "
+            "integer (got 'ten')\n"
+            "- y: Field required\n"
+            "Fix the errors and try again."
+        )
+        assert calls == []
+
+
+class TestToolResultForwarding:
+    """MCPサーバーとCLIへの結果の転送のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_image_is_returned_as_image_content(
+        self, tool_server, call_tool
+    ) -> None:
+        """画像はImageContentとして返る"""
+        from pydantic_ai.messages import BinaryContent
+
+        def snapshot() -> BinaryContent:
+            return BinaryContent(b"GIF89a", media_type="image/gif")
+
+        result = await call_tool(tool_server(snapshot), "snapshot")
+
+        assert result.content[0].type == "image"
+        assert result.content[0].mimeType == "image/gif"
+
+    @pytest.mark.asyncio
+    async def test_cli_receives_resource_and_error_flag(self, tool_server) -> None:
+        """CLIへの応答に埋め込みリソースとisErrorが含まれる"""
+        from pydantic_claude_cli.sdk_client import _Query
+
+        def export() -> bytes:
+            return b"\x00\x01"
+
+        def fail() -> str:
+            raise RuntimeError("boom")
+
+        query = _Query(
+            transport=None,
+            is_streaming_mode=True,
+            sdk_mcp_servers={
+                "custom": tool_server(export)["instance"],
+                "fail": tool_server(fail)["instance"],
+            },
+        )
+
+        ok = await query._handle_sdk_mcp_request(
+            "custom",
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "tools/call",
+                "params": {"name": "export"},
+            },
+        )
+        error = await query._handle_sdk_mcp_request(
+            "fail",
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "tools/call",
+                "params": {"name": "fail"},
+            },
+        )
+
+        assert ok["result"]["content"][0]["resource"]["blob"] == "AAE="
+        assert ok["result"]["isError"] is False
+        assert error["result"]["isError"] is True
+        assert "boom" in error["result"]["content"][0]["text"]
+
+
 class TestMakeAsync:
     """同期関数のasyncラップのテスト"""
 
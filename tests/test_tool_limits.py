@@ -0,0 +1,185 @@
+"""テスト: tool_limits モジュール（同時実行数とレートの制限）"""
+
+import time
+
+import anyio
+import pytest
+
+from pydantic_claude_cli.tool_limits import TokenBucket, ToolLimiter, get_tool_limiter
+from pydantic_claude_cli.tool_options import ToolOptions
+
+
+class TestTokenBucket:
+    """TokenBucketのテスト"""
+
+    def test_burst_then_wait(self):
+        """バースト分は待機せず、以降は補充を待つこと"""
+        bucket = TokenBucket(rate=10, burst=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        # 予約済みのトークンの後ろに並ぶ
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_refund(self):
+        """返却したトークンは後続の呼び出しで使えること"""
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.reserve()
+        bucket.refund()
+        assert bucket.reserve() == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_spaces_calls(self):
+        """取得の間隔がレートに従うこと"""
+        bucket = TokenBucket(rate=20)
+        start = time.perf_counter()
+        for _ in range(4):
+            await bucket.acquire()
+        assert time.perf_counter() - start >= 0.14
+
+    def test_invalid_rate(self):
+        """正でないレートはエラーになること"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestToolLimiter:
+    """ToolLimiterのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency(self):
+        """同時実行数を超える呼び出しが待機すること"""
+        limiter = ToolLimiter(max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await anyio.sleep(0.02)
+                running -= 1
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(6):
+                tg.start_soon(call)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_same_task_can_hold_multiple_slots(self):
+        """同じタスクでも呼び出しごとに実行枠を確保できること"""
+        limiter = ToolLimiter(max_concurrency=2)
+        async with limiter.acquire():
+            async with limiter.acquire():
+                assert limiter.waiting == 0
+
+    def test_shared_per_function_and_settings(self):
+        """同じ関数・設定では同じ制限を共有すること"""
+
+        def search(query: str) -> str:
+            return query
+
+        limiter = get_tool_limiter(search, 2, None)
+        assert get_tool_limiter(search, 2, None) is limiter
+        assert get_tool_limiter(search, 3, None) is not limiter
+        assert get_tool_limiter(search, None, None) is None
+
+    def test_invalid_options(self):
+        """正でない制限はエラーになること"""
+        with pytest.raises(ValueError, match="max_concurrency"):
+            ToolOptions(max_concurrency=0)
+        with pytest.raises(ValueError, match="rate_limit"):
+            ToolOptions(rate_limit=-1)
+        with pytest.raises(ValueError, match="rate_burst"):
+            ToolOptions(rate_limit=1, rate_burst=0)
+
+
+QUERY_SCHEMA = {
+    "type": "object",
+    "properties": {"query": {"type": "string"}},
+    "required": ["query"],
+}
+
+
+class TestLimitedTools:
+    """MCPツール呼び出しでの制限のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_shared_across_servers(self, tool_server, call_tool):
+        """別々のMCPサーバーからの呼び出しにも同時実行数を適用すること"""
+        running = 0
+        peak = 0
+
+        async def search_api(query: str) -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await anyio.sleep(0.02)
+            running -= 1
+            return query
+
+        options = ToolOptions(max_concurrency=2)
+        servers = [
+            tool_server(search_api, QUERY_SCHEMA, options=options) for _ in range(3)
+        ]
+        results = []
+
+        async def call(server, i):
+            result = await call_tool(server, "search_api", {"query": str(i)})
+            results.append(result.content[0].text)
+
+        async with anyio.create_task_group() as tg:
+            for i in range(9):
+                tg.start_soon(call, servers[i % 3], i)
+
+        assert peak == 2
+        assert sorted(results) == [str(i) for i in range(9)]
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_calls_are_queued(self, tool_server, call_tool):
+        """レートを超える呼び出しはエラーにならず待機すること"""
+        called_at = []
+
+        async def quote_api(query: str) -> str:
+            called_at.append(time.perf_counter())
+            return query
+
+        server = tool_server(
+            quote_api, QUERY_SCHEMA, options=ToolOptions(rate_limit=20)
+        )
+        results = []
+
+        async def call(i):
+            results.append(await call_tool(server, "quote_api", {"query": str(i)}))
+
+        async with anyio.create_task_group() as tg:
+            for i in range(4):
+                tg.start_soon(call, i)
+
+        assert not any(result.isError for result in results)
+        assert called_at[-1] - called_at[0] >= 0.14
+
+    @pytest.mark.asyncio
+    async def test_queue_time_excluded_from_timeout(self, tool_server, call_tool):
+        """待機時間はタイムアウトに含めないこと"""
+
+        async def slow_api(query: str) -> str:
+            await anyio.sleep(0.05)
+            return query
+
+        server = tool_server(
+            slow_api, QUERY_SCHEMA, options=ToolOptions(max_concurrency=1, timeout=0.08)
+        )
+        results = []
+
+        async def call(i):
+            results.append(await call_tool(server, "slow_api", {"query": str(i)}))
+
+        async with anyio.create_task_group() as tg:
+            for i in range(3):
+                tg.start_soon(call, i)
+
+        assert not any(result.isError for result in results)
@@ -0,0 +1,287 @@
+"""テスト: tool_server モジュール（共有MCPツールサーバー）"""
+
+import socket
+
+import anyio
+import httpx
+import pytest
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.models.test import TestModel
+
+from pydantic_claude_cli.tool_options import ToolOptions
+from pydantic_claude_cli.tool_server import (
+    agent_tools,
+    create_tool_server_app,
+    serve_tools,
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _agent() -> Agent:
+    agent = Agent(TestModel())
+
+    @agent.tool_plain
+    def add(x: int, y: int) -> int:
+        """Add two numbers."""
+        return x + y
+
+    @agent.tool_plain
+    async def greet(name: str) -> str:
+        """Greet someone."""
+        return f"Hello, {name}!"
+
+    return agent
+
+
+async def _wait_until_ready(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(url)
+                return
+            except httpx.ConnectError:
+                await anyio.sleep(0.05)
+    raise TimeoutError(url)
+
+
+class TestAgentTools:
+    """agent_toolsのテスト"""
+
+    def test_extracts_tools_by_name(self):
+        """Agentのツールを名前順に取り出すこと"""
+        tools = agent_tools(_agent())
+
+        assert [tool_def.name for tool_def, _ in tools] == ["add", "greet"]
+        assert tools[0][1](x=1, y=2) == 3
+
+    def test_rejects_run_context_tools(self):
+        """RunContextに依存するツールは共有できないこと"""
+        agent = Agent(TestModel(), deps_type=str)
+
+        @agent.tool
+        def whoami(ctx: RunContext[str]) -> str:
+            return ctx.deps
+
+        with pytest.raises(ValueError, match="whoami"):
+            create_tool_server_app(agent)
+
+
+class TestSharedToolServer:
+    """Streamable HTTPで公開したツールの呼び出しのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_list_and_call_tools(self):
+        """MCPクライアントからツールの一覧取得と呼び出しができること"""
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamablehttp_client
+
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: serve_tools(
+                    _agent(),
+                    port=port,
+                    tool_options={"add": ToolOptions(max_concurrency=1)},
+                )
+            )
+            await _wait_until_ready(f"{base_url}/metrics")
+
+            async with streamablehttp_client(f"{base_url}/mcp") as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    listed = await session.list_tools()
+                    added = await session.call_tool("add", {"x": 2, "y": 3})
+                    invalid = await session.call_tool("add", {"x": "a", "y": 3})
+                    greeted = await session.call_tool("greet", {"name": "Alice"})
+
+            async with httpx.AsyncClient() as client:
+                metrics = (await client.get(f"{base_url}/metrics")).text
+
+            tg.cancel_scope.cancel()
+
+        assert [tool.name for tool in listed.tools] == ["add", "greet"]
+        assert added.content[0].text == "5"
+        assert not added.isError
+        assert invalid.isError
+        assert greeted.content[0].text == "Hello, Alice!"
+        # 引数の検証エラーもエラーとして記録される
+        assert 'pydantic_claude_cli_tool_calls_total{tool="add"} 2' in metrics
+        assert 'pydantic_claude_cli_tool_errors_total{tool="add"} 1' in metrics
+        assert 'pydantic_claude_cli_tool_calls_total{tool="greet"} 1' in metrics
+
+    @pytest.mark.asyncio
+    async def test_stored_results_are_bounded_and_private(self):
+        """退避した結果は上限を超えると削除され、ハンドルは推測・列挙できないこと"""
+        import re
+
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamablehttp_client
+
+        from pydantic_claude_cli.result_store import READ_RESULT_TOOL_NAME
+
+        agent = Agent(TestModel())
+
+        @agent.tool_plain
+        def dump(n: int) -> str:
+            """Dump a large text."""
+            return str(n) * 500
+
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+
+        async def read(session, handle):
+            result = await session.call_tool(READ_RESULT_TOOL_NAME, {"handle": handle})
+            return result.content[0].text
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: serve_tools(
+                    agent, port=port, max_tool_result_chars=100, max_stored_results=1
+                )
+            )
+            await _wait_until_ready(f"{base_url}/metrics")
+
+            async with streamablehttp_client(f"{base_url}/mcp") as (r, w, _):
+                async with ClientSession(r, w) as session:
+                    await session.initialize()
+                    handles = []
+                    for n in (1, 2):
+                        summary = await session.call_tool("dump", {"n": n})
+                        text = summary.content[0].text
+                        handles.append(re.search(r"handle '([^']+)'", text)[1])
+                    evicted = await read(session, handles[0])
+                    latest = await read(session, handles[1])
+                    guessed = await read(session, "dump-2")
+
+            tg.cancel_scope.cancel()
+
+        assert re.fullmatch(r"dump-1-[0-9a-f]{16}", handles[0])
+        assert evicted == f"Unknown or expired result handle '{handles[0]}'."
+        assert latest.startswith("2" * 500)
+        assert guessed == "Unknown or expired result handle 'dump-2'."
+
+
+class TestBindAddress:
+    """待ち受けアドレスの制限のテスト"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("host", ["0.0.0.0", "192.168.1.10", "::", "tools.local"])
+    async def test_refuses_non_loopback_host(self, host):
+        """認証がないため、ループバック以外では明示的に許可しない限り起動しないこと"""
+        with pytest.raises(ValueError, match="allow_remote"):
+            await serve_tools(_agent(), host=host)
+
+    @pytest.mark.parametrize(
+        ("host", "expected"),
+        [
+            ("127.0.0.1", True),
+            ("127.0.0.2", True),
+            ("::1", True),
+            ("localhost", True),
+            ("0.0.0.0", False),
+            ("example.com", False),
+        ],
+    )
+    def test_is_loopback(self, host, expected):
+        """ループバックのアドレスを判定できること"""
+        from pydantic_claude_cli.tool_server import _is_loopback
+
+        assert _is_loopback(host) is expected
+
+
+class TestModelOption:
+    """ClaudeCodeCLIModelのshared_tool_serverオプションのテスト"""
+
+    @staticmethod
+    async def _allowed_tools(monkeypatch, **kwargs):
+        """共有サーバーを使うモデルがCLIに渡す許可ツール"""
+        from claude_code_sdk.types import AssistantMessage, ResultMessage, TextBlock
+
+        import pydantic_claude_cli.model as model_module
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        captured = []
+
+        class _FakeClient:
+            """CLIを起動せずに渡されたオプションを記録するClaudeCLIClient"""
+
+            def __init__(self, options, **kw) -> None:
+                captured.append(options)
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args) -> None:
+                pass
+
+            async def query(self, prompt) -> None:
+                pass
+
+            async def receive_response(self):
+                yield AssistantMessage(content=[TextBlock(text="ok")], model="m")
+                yield ResultMessage(
+                    subtype="success",
+                    duration_ms=1,
+                    duration_api_ms=1,
+                    is_error=False,
+                    num_turns=1,
+                    session_id="s",
+                )
+
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _FakeClient)
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5", shared_tool_server="http://127.0.0.1:8765/mcp", **kwargs
+        )
+        await _agent().run("hi", model=model)
+        return set(captured[0].allowed_tools)
+
+    @pytest.mark.asyncio
+    async def test_read_result_tool_is_opt_in(self, monkeypatch):
+        """読み出しツールはmax_tool_result_charsを指定した場合のみ許可すること"""
+        default = await self._allowed_tools(monkeypatch)
+        spilling = await self._allowed_tools(monkeypatch, max_tool_result_chars=100_000)
+
+        assert {"mcp__custom__add", "mcp__custom__greet"} <= default
+        assert "mcp__custom__read_tool_result" not in default
+        assert "mcp__custom__read_tool_result" in spilling
+
+    @pytest.mark.asyncio
+    async def test_rejects_run_context_tools(self, monkeypatch):
+        """RunContextに依存するツールはサーバーと同じくモデル側でもエラーになること"""
+        import pydantic_claude_cli.model as model_module
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        def _unexpected_client(*args, **kwargs):
+            raise AssertionError("the CLI must not be started")
+
+        monkeypatch.setattr(model_module, "ClaudeCLIClient", _unexpected_client)
+        agent = Agent(TestModel(), deps_type=str)
+
+        @agent.tool
+        def whoami(ctx: RunContext[str]) -> str:
+            """Return the current user."""
+            return ctx.deps
+
+        model = ClaudeCodeCLIModel(
+            "claude-haiku-4-5", shared_tool_server="http://127.0.0.1:8765/mcp"
+        )
+        model.set_agent_toolsets(agent._function_toolset)
+
+        with pytest.raises(ValueError, match="RunContext.*whoami"):
+            await agent.run("hi", model=model, deps="alice")
+
+    def test_rejects_non_http_url(self):
+        """http(s)以外のURLはエラーになること"""
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        with pytest.raises(ValueError, match="shared_tool_server"):
+            ClaudeCodeCLIModel(
+                "claude-haiku-4-5", shared_tool_server="unix:///tmp/tools.sock"
+            )
@@ -0,0 +1,213 @@
+"""テスト: tool_stats モジュール（ツールの実行統計）"""
+
+import anyio
+import pytest
+
+from pydantic_claude_cli.tool_cache import ToolResultCache
+from pydantic_claude_cli.tool_options import ToolOptions
+from pydantic_claude_cli.tool_stats import (
+    LATENCY_BUCKETS,
+    ToolStatsRegistry,
+    format_prometheus,
+)
+
+
+class TestToolCallStats:
+    """ToolCallStatsの集計のテスト"""
+
+    def test_record_call(self):
+        """呼び出し数・エラー数・サイズ・レイテンシを集計すること"""
+        registry = ToolStatsRegistry()
+        registry.record_call("search", 0.02, request_bytes=10, response_bytes=100)
+        registry.record_call("search", 0.04, error=True, request_bytes=12)
+
+        stats = registry.snapshot()["search"]
+        assert (stats.calls, stats.errors) == (2, 1)
+        assert (stats.request_bytes, stats.response_bytes) == (22, 100)
+        assert stats.mean_latency == pytest.approx(0.03)
+        assert stats.latency_max == 0.04
+        assert sum(stats.latency_buckets) == 2
+
+    def test_quantiles(self):
+        """ヒストグラムから分位数を推定すること"""
+        registry = ToolStatsRegistry()
+        for _ in range(98):
+            registry.record_call("search", 0.003)
+        registry.record_call("search", 0.7)
+        registry.record_call("search", 0.8)
+
+        stats = registry.snapshot()["search"]
+        assert 0.0025 <= stats.p50 <= 0.005
+        assert 0.5 <= stats.p99 <= 0.8
+
+    def test_quantile_capped_by_max(self):
+        """+Infのバケットの分位数は最大値を超えないこと"""
+        registry = ToolStatsRegistry()
+        registry.record_call("crawl", 120.0)
+
+        stats = registry.snapshot()["crawl"]
+        assert stats.latency_buckets[-1] == 1
+        assert LATENCY_BUCKETS[-1] <= stats.p99 <= 120.0
+
+    def test_empty_quantile(self):
+        """呼び出しがない場合は0を返すこと"""
+        registry = ToolStatsRegistry()
+        registry.record_cache_hit("search")
+        assert registry.snapshot()["search"].p50 == 0.0
+
+    def test_snapshot_reset(self):
+        """reset=Trueはスナップショットを返した後に統計を破棄すること"""
+        registry = ToolStatsRegistry()
+        registry.record_call("search", 0.01)
+
+        snapshot = registry.snapshot(reset=True)
+        registry.record_call("other", 0.01)
+
+        assert list(snapshot) == ["search"]
+        assert snapshot["search"].latency_buckets is not None
+        assert list(registry.snapshot()) == ["other"]
+
+
+class TestFormatPrometheus:
+    """format_prometheusのテスト"""
+
+    def test_exposition_format(self):
+        """カウンターとヒストグラムを出力すること"""
+        registry = ToolStatsRegistry()
+        registry.record_call("search", 0.02, request_bytes=10, response_bytes=100)
+        registry.record_call("search", 2.0, error=True)
+        registry.record_timeout("search")
+
+        text = format_prometheus(registry.snapshot())
+
+        assert "# TYPE pydantic_claude_cli_tool_calls_total counter" in text
+        assert 'pydantic_claude_cli_tool_calls_total{tool="search"} 2' in text
+        assert 'pydantic_claude_cli_tool_errors_total{tool="search"} 1' in text
+        assert 'pydantic_claude_cli_tool_timeouts_total{tool="search"} 1' in text
+        assert 'pydantic_claude_cli_tool_response_bytes_total{tool="search"} 100' in (
+            text
+        )
+        assert "# TYPE pydantic_claude_cli_tool_duration_seconds histogram" in text
+        assert (
+            'pydantic_claude_cli_tool_duration_seconds_bucket{tool="search",le="0.025"} 1'
+            in text
+        )
+        assert (
+            'pydantic_claude_cli_tool_duration_seconds_bucket{tool="search",le="+Inf"} 2'
+            in text
+        )
+        assert 'pydantic_claude_cli_tool_duration_seconds_count{tool="search"} 2' in (
+            text
+        )
+        assert text.endswith("\n")
+
+    def test_label_escaping_and_prefix(self):
+        """ラベルの値をエスケープし、接頭辞を変更できること"""
+        registry = ToolStatsRegistry()
+        registry.record_call('we"ird\\name', 0.01)
+
+        text = format_prometheus(registry.snapshot(), prefix="app_tool")
+
+        assert 'app_tool_calls_total{tool="we\\"ird\\\\name"} 1' in text
+
+
+QUERY_SCHEMA = {
+    "type": "object",
+    "properties": {"query": {"type": "string"}},
+    "required": ["query"],
+}
+
+
+class TestInstrumentedTools:
+    """MCPツール呼び出しでの記録のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_calls_errors_and_sizes(self, tool_server, call_tool):
+        """成功・例外の呼び出しを記録すること"""
+
+        async def search(query: str) -> str:
+            if query == "boom":
+                raise RuntimeError("backend down")
+            await anyio.sleep(0.01)
+            return "日本" + query
+
+        stats = ToolStatsRegistry()
+        server = tool_server(search, QUERY_SCHEMA, stats=stats)
+
+        await call_tool(server, "search", {"query": "abc"})
+        await call_tool(server, "search", {"query": "boom"})
+
+        snapshot = stats.snapshot()["search"]
+        assert snapshot.calls == 2
+        assert snapshot.errors == 1
+        assert snapshot.request_bytes == len(b'{"query":"abc"}{"query":"boom"}')
+        assert snapshot.response_bytes > len("日本abc".encode())
+        assert snapshot.latency_max >= 0.01
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments_are_errors(self, tool_server, call_tool):
+        """引数の検証で拒否した呼び出しもエラーとして記録すること"""
+        calls = []
+
+        async def search(query: str) -> str:
+            calls.append(query)
+            return query
+
+        stats = ToolStatsRegistry()
+        server = tool_server(search, QUERY_SCHEMA, stats=stats)
+
+        result = await call_tool(server, "search", {"query": ["not", "a", "str"]})
+
+        assert result.isError
+        assert calls == []
+        snapshot = stats.snapshot()["search"]
+        assert (snapshot.calls, snapshot.errors) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_schema_rejected_calls_are_errors(self, tmp_path, call_tool):
+        """JSON Schemaの検証で拒否した呼び出しもエラーとして記録すること"""
+        from pydantic_claude_cli.result_store import (
+            READ_RESULT_TOOL_NAME,
+            ToolResultStore,
+        )
+        from pydantic_claude_cli.tool_converter import create_mcp_from_tools
+
+        stats = ToolStatsRegistry()
+        with ToolResultStore(10, directory=tmp_path) as store:
+            server = create_mcp_from_tools([], result_store=store, stats=stats)
+            rejected = await call_tool(server, READ_RESULT_TOOL_NAME, {"offset": -1})
+            unknown = await call_tool(server, READ_RESULT_TOOL_NAME, {"handle": "x"})
+
+        assert rejected.isError
+        assert not unknown.isError
+        snapshot = stats.snapshot()[READ_RESULT_TOOL_NAME]
+        assert (snapshot.calls, snapshot.errors) == (2, 1)
+        assert snapshot.request_bytes == len(b'{"offset":-1}{"handle":"x"}')
+
+    @pytest.mark.asyncio
+    async def test_cache_hits(self, tool_server, call_tool):
+        """キャッシュヒットも呼び出しとして記録すること"""
+
+        async def lookup(query: str) -> str:
+            return query
+
+        stats = ToolStatsRegistry()
+        server = tool_server(
+            lookup,
+            QUERY_SCHEMA,
+            options=ToolOptions(cache=ToolResultCache()),
+            stats=stats,
+        )
+
+        for _ in range(3):
+            await call_tool(server, "lookup", {"query": "x"})
+
+        snapshot = stats.snapshot()["lookup"]
+        assert (snapshot.calls, snapshot.cache_hits, snapshot.errors) == (3, 2, 0)
+
+    def test_model_tool_stats_snapshot(self):
+        """モデルのtool_stats()がスナップショットを返すこと"""
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        model = ClaudeCodeCLIModel("claude-haiku-4-5")
+        assert model.tool_stats() == {}
@@ -0,0 +1,203 @@
+"""テスト: カスタムツールのタイムアウトとキャンセル"""
+
+import threading
+import time
+
+import anyio
+import pytest
+
+from pydantic_claude_cli.tool_options import ToolOptions
+from pydantic_claude_cli.tool_stats import ToolStatsRegistry
+
+
+class TestToolTimeouts:
+    """ツール実行のタイムアウトのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_async_tool_is_cancelled(self, tool_server, call_tool):
+        """タイムアウトした非同期ツールをキャンセルし、エラー結果を返すこと"""
+        cancelled = []
+
+        async def slow_search() -> str:
+            try:
+                await anyio.sleep(10)
+            except anyio.get_cancelled_exc_class():
+                cancelled.append(True)
+                raise
+            return "done"
+
+        stats = ToolStatsRegistry()
+        server = tool_server(
+            slow_search, options=ToolOptions(timeout=0.05), stats=stats
+        )
+
+        start = time.perf_counter()
+        result = await call_tool(server, "slow_search")
+
+        assert time.perf_counter() - start < 1
+        assert result.isError
+        assert result.content[0].text == (
+            "Tool 'slow_search' timed out after 0.05 seconds and was cancelled."
+        )
+        assert cancelled == [True]
+        assert stats.snapshot()["slow_search"].timeouts == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_tool_is_abandoned(self, tool_server, call_tool):
+        """タイムアウトした同期ツールはスレッドの完了を待たずに結果を返すこと"""
+        release = threading.Event()
+
+        def blocking_fetch() -> str:
+            release.wait(5)
+            return "done"
+
+        server = tool_server(blocking_fetch, default_timeout=0.05)
+        try:
+            start = time.perf_counter()
+            result = await call_tool(server, "blocking_fetch")
+            assert time.perf_counter() - start < 1
+            assert result.isError
+            assert "timed out" in result.content[0].text
+        finally:
+            release.set()
+
+    @pytest.mark.asyncio
+    async def test_abandoned_thread_returns_its_token(self, tool_server, call_tool):
+        """打ち切ったスレッドが実行中でも、ツール用のリミッターのトークンは返却されること"""
+        from pydantic_claude_cli.tool_converter import _get_tool_thread_limiter
+
+        release = threading.Event()
+
+        def blocking_fetch() -> str:
+            release.wait(5)
+            return "done"
+
+        limiter = _get_tool_thread_limiter()
+        server = tool_server(blocking_fetch, default_timeout=0.05)
+        try:
+            await call_tool(server, "blocking_fetch")
+            assert limiter.borrowed_tokens == 0
+        finally:
+            release.set()
+
+    @pytest.mark.asyncio
+    async def test_blocked_tool_does_not_starve_default_thread_pool(
+        self, tool_server, call_tool
+    ):
+        """実行中の同期ツールがanyioの既定のスレッド数の上限を消費しないこと"""
+        release = threading.Event()
+
+        def blocking_fetch() -> str:
+            release.wait(5)
+            return "done"
+
+        # 結果の退避などのファイルIOと共有する既定のリミッターを1スレッドに絞る
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 1
+        server = tool_server(blocking_fetch, default_timeout=5)
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call_tool, server, "blocking_fetch")
+                await anyio.sleep(0.05)
+                with anyio.fail_after(1):
+                    assert await anyio.to_thread.run_sync(lambda: "io") == "io"
+                release.set()
+        finally:
+            release.set()
+
+    @pytest.mark.asyncio
+    async def test_sync_tool_with_timeout_does_not_block_event_loop(
+        self, tool_server, call_tool
+    ):
+        """タイムアウトを適用する同期ツールの実行中も他のタスクが進むこと"""
+        ticks = []
+
+        def blocking_fetch() -> str:
+            time.sleep(0.1)
+            return "done"
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(1)
+                await anyio.sleep(0.01)
+
+        server = tool_server(blocking_fetch, default_timeout=5)
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(ticker)
+            result = await call_tool(server, "blocking_fetch")
+
+        assert result.content[0].text == "done"
+        assert len(ticks) == 3
+
+    @pytest.mark.asyncio
+    async def test_sync_tool_without_timeout_runs_inline(self, tool_server, call_tool):
+        """タイムアウトを適用しない同期ツールはイベントループ上で直接呼び出すこと"""
+        threads = []
+
+        def where() -> str:
+            threads.append(threading.current_thread())
+            return "done"
+
+        result = await call_tool(tool_server(where), "where")
+
+        assert result.content[0].text == "done"
+        assert threads == [threading.current_thread()]
+
+    @pytest.mark.asyncio
+    async def test_per_tool_timeout_overrides_default(self, tool_server, call_tool):
+        """ツールごとのタイムアウトがモデルの既定値より優先されること"""
+
+        async def slow() -> str:
+            await anyio.sleep(0.1)
+            return "done"
+
+        server = tool_server(slow, options=ToolOptions(timeout=1), default_timeout=0.01)
+        result = await call_tool(server, "slow")
+
+        assert not result.isError
+        assert result.content[0].text == "done"
+
+    @pytest.mark.asyncio
+    async def test_fast_tool_is_not_affected(self, tool_server, call_tool):
+        """タイムアウト内に完了したツールはタイムアウトとして記録しないこと"""
+
+        async def fast() -> str:
+            return "done"
+
+        stats = ToolStatsRegistry()
+        server = tool_server(fast, default_timeout=1, stats=stats)
+        result = await call_tool(server, "fast")
+
+        assert result.content[0].text == "done"
+        assert stats.snapshot()["fast"].timeouts == 0
+
+    def test_non_positive_timeout_rejected(self):
+        """正でないタイムアウトはエラーになること"""
+        with pytest.raises(ValueError, match="timeout must be positive"):
+            ToolOptions(timeout=0)
+
+    def test_model_rejects_non_positive_timeout(self):
+        """モデルのtool_timeoutも正でない場合はエラーになること"""
+        from pydantic_claude_cli import ClaudeCodeCLIModel
+
+        with pytest.raises(ValueError, match="tool_timeout"):
+            ClaudeCodeCLIModel("claude-haiku-4-5", tool_timeout=-1)
+
+
+class TestToolStatsRegistry:
+    """ToolStatsRegistryのテスト"""
+
+    def test_snapshot_is_copy(self):
+        """snapshotは統計のコピーを返すこと"""
+        stats = ToolStatsRegistry()
+        stats.record_timeout("b")
+        stats.record_timeout("a")
+        stats.record_timeout("a")
+
+        snapshot = stats.snapshot()
+        stats.record_timeout("a")
+
+        assert list(snapshot) == ["a", "b"]
+        assert snapshot["a"].timeouts == 2
+
+        stats.reset()
+        assert len(stats) == 0
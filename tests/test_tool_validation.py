@@ -0,0 +1,143 @@
+"""テスト: tool_validation モジュール（ツール引数の検証器）"""
+
+from dataclasses import dataclass
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from pydantic_ai.tools import RunContext
+
+from pydantic_claude_cli.tool_validation import (
+    build_args_validator,
+    format_argument_errors,
+    format_validation_error,
+    get_args_validator,
+)
+
+
+class Address(BaseModel):
+    city: str
+    zip: str | None = None
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+def search(
+    ctx: RunContext[str],
+    mode: Literal["fast", "slow"],
+    address: Address,
+    limit: int = 10,
+) -> str:
+    return f"{mode}:{address.city}:{limit}"
+
+
+class TestBuildArgsValidator:
+    """検証器の作成と検証のテスト"""
+
+    def test_coerces_arguments(self):
+        """引数をシグネチャの型に変換すること"""
+        validator = build_args_validator(search)
+
+        args = validator.validate(
+            {"mode": "fast", "address": {"city": "Tokyo"}, "limit": "5"}
+        )
+
+        assert args == {"mode": "fast", "address": Address(city="Tokyo"), "limit": 5}
+
+    def test_run_context_is_excluded(self):
+        """RunContextのパラメータは引数に含めないこと"""
+        validator = build_args_validator(search)
+
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate({})
+
+        locations = {error["loc"] for error in exc_info.value.errors()}
+        assert locations == {("mode",), ("address",)}
+
+    def test_omitted_default_is_not_filled(self):
+        """省略された引数は関数のデフォルト値に任せること"""
+        validator = build_args_validator(search)
+
+        args = validator.validate({"mode": "slow", "address": {"city": "Osaka"}})
+
+        assert "limit" not in args
+
+    def test_unknown_arguments_are_ignored(self):
+        """定義にない引数は無視すること"""
+
+        def add(x: int, y: int) -> int:
+            return x + y
+
+        assert build_args_validator(add).validate({"x": 1, "y": 2, "z": 3}) == {
+            "x": 1,
+            "y": 2,
+        }
+
+    def test_var_kwargs_are_passed_through(self):
+        """**kwargsがある場合は定義にない引数も渡すこと"""
+
+        def tag(name: str, **labels: str) -> str:
+            return name
+
+        assert build_args_validator(tag).validate({"name": "a", "env": "prod"}) == {
+            "name": "a",
+            "env": "prod",
+        }
+
+    def test_single_model_argument(self):
+        """モデル的な型1つだけのパラメータは引数全体をその型として検証すること"""
+
+        def plot(point: Point) -> str:
+            return f"{point.x},{point.y}"
+
+        assert build_args_validator(plot).validate({"x": "1", "y": 2}) == {
+            "point": Point(x=1, y=2)
+        }
+
+    def test_positional_only_is_not_supported(self):
+        """位置専用引数を持つ関数はNoneを返すこと"""
+
+        def add(x: int, /, y: int) -> int:
+            return x + y
+
+        assert build_args_validator(add) is None
+
+    def test_validator_is_cached_per_function(self):
+        """同じ関数の検証器は再利用すること"""
+        assert get_args_validator(search) is get_args_validator(search)
+
+
+class TestFormatErrors:
+    """再試行メッセージのテスト"""
+
+    def test_format_validation_error(self):
+        """エラー箇所・メッセージ・入力値を1行ずつ並べること"""
+        validator = build_args_validator(search)
+
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate({"mode": "bad", "address": {"zip": "1"}})
+
+        assert format_validation_error("search", exc_info.value) == (
+            "Invalid arguments for tool 'search':\n"
+            "- mode: Input should be 'fast' or 'slow' (got 'bad')\n"
+            "- address.city: Field required\n"
+            "Fix the errors and try again."
+        )
+
+    def test_error_count_is_limited(self):
+        """エラーが多い場合は件数だけを示すこと"""
+        errors = [(f"arg{i}", "Field required") for i in range(8)]
+
+        message = format_argument_errors("tool", errors, max_errors=3)
+
+        assert message.splitlines()[1:] == [
+            "- arg0: Field required",
+            "- arg1: Field required",
+            "- arg2: Field required",
+            "- ... and 5 more errors",
+            "Fix the errors and try again.",
+        ]